@@ -0,0 +1,175 @@
+# Month-by-month amortisation schedules for the mortgages priced by mortgage_payment(): how much of each repayment is
+# interest and how much pays off the loan, and the balance left after it.
+# Every month is computed directly from the closed-form balance of a repayment mortgage, with no month-to-month loop,
+# so schedules for a whole batch of loans are a handful of NumPy operations. Large batches are written out to CSV or
+# Parquet a chunk of loans at a time, so the full set of schedules never has to be held in memory.
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from finance_arrays import mortgage_payment_array
+
+# Columns of a schedule, one row per loan per month
+SCHEDULE_COLUMNS = ["Loan", "Month", "Payment (£)", "Interest (£)", "Principal (£)", "Balance (£)"]
+
+
+def _loan_terms(present_dwelling_value, annual_interest, monthly_interest, years_repaying, months_repaying) -> dict:
+    # Broadcast the loans' inputs together as mortgage_payment_array() does, flattened to one entry per loan
+    results = mortgage_payment_array(
+        present_dwelling_value, annual_interest, monthly_interest, years_repaying, months_repaying, as_frame=False
+    )
+    rate = np.where(
+        results["Monthly Interest (%)"] == 0, results["Annual Interest (%)"] / 12, results["Monthly Interest (%)"]
+    ) / 100
+    return {
+        "principal": np.ravel(results["Dwelling Value (£)"]),
+        "rate": np.ravel(rate),
+        "payment": np.ravel(results["Monthly Repayment (£)"]),
+        "months": np.ravel(results["Repayment Duration (years)"] * 12 + results["Repayment Duration (additional months)"]),
+    }
+
+
+def _schedule_rows(terms: dict, first: int, last: int) -> dict:
+    # Schedules of loans first to last - 1, as flat columns with one entry per loan per month
+    months = terms["months"][first:last]
+    loan = np.repeat(np.arange(first, last), months)
+    # Month number of each row: a running count that restarts at 1 for each loan
+    starts = np.cumsum(months) - months
+    month = np.arange(len(loan)) - np.repeat(starts, months) + 1
+
+    principal = terms["principal"][loan]
+    rate = terms["rate"][loan]
+    payment = terms["payment"][loan]
+
+    # Balance before each month's payment, from the closed form P(1 + r)^k - A((1 + r)^k - 1) / r after k payments,
+    # which is P - A k when there is no interest
+    growth = np.power(1 + rate, month - 1)
+    paid = np.divide(growth - 1, rate, out=(month - 1).astype(np.float64), where=rate != 0)
+    opening_balance = principal * growth - payment * paid
+
+    interest = rate * opening_balance
+    principal_repaid = payment - interest
+    balance = opening_balance - principal_repaid
+    # The closed form can leave a rounding error of a fraction of a penny after the last payment
+    balance[month == np.repeat(months, months)] = 0
+
+    return {
+        "Loan": loan,
+        "Month": month,
+        "Payment (£)": payment,
+        "Interest (£)": interest,
+        "Principal (£)": principal_repaid,
+        "Balance (£)": balance,
+    }
+
+
+def amortization_schedule(
+    present_dwelling_value,
+    annual_interest=0,
+    monthly_interest=0,
+    years_repaying=0,
+    months_repaying=0,
+) -> pd.DataFrame:
+    """
+    Calculate the month-by-month amortisation schedule of one mortgage, or of a batch of them.
+    Arguments are the same as mortgage_payment()'s, and can be arrays, broadcast together as in
+    mortgage_payment_array().
+
+    Parameters:
+        - present_dwelling_value (float | np.ndarray): The current values of the properties.
+        - annual_interest (float | np.ndarray): The annual interest rates, as percentages. Used
+        where no monthly interest rate is given.
+        - monthly_interest (float | np.ndarray): The monthly interest rates, as percentages. Take
+        precedence over the annual interest rates where non-zero.
+        - years_repaying (int | np.ndarray): The numbers of full years over which the loans are
+        repaid.
+        - months_repaying (int | np.ndarray): The additional months over which the loans are
+        repaid, on top of the full years.
+
+    Returns:
+        - pd.DataFrame: One row per loan per month, with the loan's number (its position in the
+        flattened inputs), the month number from 1, the repayment, its split into interest and
+        principal, and the balance left after it.
+
+    Example:
+        >>> amortization_schedule(1000, 5, 0, 0, 2)
+           Loan  Month  Payment (£)  Interest (£)  Principal (£)  Balance (£)
+        0     0      1   503.127166      4.166667     498.960499   501.039501
+        1     0      2   503.127166      2.087665     501.039501     0.000000
+    """
+    terms = _loan_terms(present_dwelling_value, annual_interest, monthly_interest, years_repaying, months_repaying)
+    return pd.DataFrame(_schedule_rows(terms, 0, len(terms["months"])), columns=SCHEDULE_COLUMNS)
+
+
+def write_amortization_schedules(
+    output_path: str,
+    present_dwelling_value,
+    annual_interest=0,
+    monthly_interest=0,
+    years_repaying=0,
+    months_repaying=0,
+    rows_per_chunk: int = 2_000_000,
+) -> dict:
+    """
+    Writes the amortisation schedules of a batch of mortgages to a CSV or Parquet file, a chunk of
+    loans at a time, so only about rows_per_chunk rows are ever in memory, however many loans there
+    are. The file has the columns of amortization_schedule().
+
+    Parameters:
+        - output_path (str): Path of the file to write. Written as Parquet if it ends in ".parquet",
+        otherwise as CSV.
+        - present_dwelling_value (float | np.ndarray): The current values of the properties.
+        - annual_interest (float | np.ndarray): The annual interest rates, as percentages.
+        - monthly_interest (float | np.ndarray): The monthly interest rates, as percentages.
+        - years_repaying (int | np.ndarray): The numbers of full years over which the loans are
+        repaid.
+        - months_repaying (int | np.ndarray): The additional months over which the loans are
+        repaid, on top of the full years.
+        - rows_per_chunk (int): Roughly how many rows to compute and write at a time. A chunk always
+        holds whole loans, so a loan with a longer schedule than this makes a chunk of its own.
+
+    Returns:
+        - dict: Labelled counts of the loans, rows and chunks written, and the seconds taken.
+    """
+    started = time.perf_counter()
+    terms = _loan_terms(present_dwelling_value, annual_interest, monthly_interest, years_repaying, months_repaying)
+    loans = len(terms["months"])
+
+    # Split the loans where the running total of their schedule lengths passes each multiple of rows_per_chunk
+    rows_before = np.cumsum(terms["months"]) - terms["months"]
+    boundaries = np.searchsorted(rows_before, np.arange(rows_per_chunk, rows_before[-1] + 1 if loans else 0, rows_per_chunk))
+    boundaries = np.unique(np.concatenate([[0], boundaries, [loans]]))
+
+    parquet = output_path.endswith(".parquet")
+    writer = None
+    rows = 0
+    chunks = 0
+    if not parquet and os.path.exists(output_path):
+        os.remove(output_path)
+    try:
+        for first, last in zip(boundaries[:-1], boundaries[1:]):
+            chunk = pd.DataFrame(_schedule_rows(terms, first, last), columns=SCHEDULE_COLUMNS)
+            if parquet:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(output_path, mode="a", header=chunks == 0, index=False)
+            rows += len(chunk)
+            chunks += 1
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return {
+        "Loans": loans,
+        "Rows": rows,
+        "Chunks": chunks,
+        "Seconds": time.perf_counter() - started,
+    }
@@ -10,6 +10,9 @@ from reportlab.graphics.shapes import Drawing
 from datetime import datetime  # Get current date/time for PDF name
 import webbrowser  # Opens PDF in user's default PDF application
 from multiprocessing import Pool, cpu_count  # Parallel processing
+from collections import deque  # Bounded queue of in-flight chunks when streaming
+from itertools import islice  # Cutting chunks off a stream of texts
+from typing import Iterable, Iterator
 
 
 # Preprocess text data by stripping and removing stop words from the reviews column in a batch, parallel processing pipeline. Use spaCy is_stop to exclude stop words
@@ -33,15 +36,44 @@ def preprocess_texts(texts: list[str], nlp: spacy.language.Language) -> list[str
         >>> print(processed_texts)
         ['first review', 'another review']
     """
-    processed_texts = []
+    # Collect the streamed results into a list, which will be used to form a cleaned text column of the reviews
+    return list(stream_preprocessed_texts(texts, nlp))
 
+
+# Generator version of preprocess_texts, so that reviews can be cleaned as they are read rather than all at once
+def stream_preprocessed_texts(
+    texts: Iterable[str],
+    nlp: spacy.language.Language,
+    batch_size: int = 400,
+    n_process: int = -1,
+) -> Iterator[str]:
+    """
+    Streaming equivalent of preprocess_texts(). Accepts any iterable of already lowercased texts (a list, a generator, a column being read from a CSV in chunks, etc.) and yields each cleaned text in the same order as the input, as soon as its batch has been processed by spaCy.
+
+    Memory stays bounded because spaCy's .pipe() only pulls as many texts from the input iterable as it needs to fill the batches currently being worked on, so a slow consumer of this generator holds back the reading of further input (back-pressure). Nothing downstream has to wait for the whole corpus to be processed.
+
+    The pipeline has all components except the tokeniser disabled for as long as the generator is being consumed. nlp is restored to full functionality once the generator is exhausted or closed.
+
+    Parameters:
+        - texts (Iterable[str]): Lowercase raw texts from product reviews to be processed, one string per review. Can be lazily produced.
+        - nlp (spacy.language.Language): Instance of nlp text-processing pipeline from loading selected spaCy language model elsewhere in the script.
+        - batch_size (int): Number of texts spaCy processes together in one batch. Defaults to 400, which is reasonable for shorter texts like product reviews.
+        - n_process (int): Number of processes spaCy spreads the batches across. Defaults to -1, meaning all available CPU cores.
+
+    Yields:
+        - str: The cleaned text of each review, with stop words and punctuation removed, in input order.
+
+    Example usage:
+        >>> nlp = spacy.load("en_core_web_sm")
+        >>> texts = (line.lower() for line in open("reviews.txt"))
+        >>> for processed_text in stream_preprocessed_texts(texts, nlp):
+        ...     print(processed_text)
+    """
     # The only component of spaCy required is the tokeniser, allowing to check a token for being a stop word, so enable only that component and disable the rest. nlp will be restored to full functionality at the end of the with block.
     with nlp.select_pipes(enable="tokenizer"):
 
-        # Process texts as a stream using nlp.pipe, which is more efficient for batch processing, along with using n_process parameter to parallelise the processing across all the CPU cores available
-        # Batch size chosen is reasonable for shorter texts like product reviews
-
-        for doc in nlp.pipe(texts, batch_size=400, n_process=-1):
+        # Process texts as a stream using nlp.pipe, which is more efficient for batch processing, along with using n_process parameter to parallelise the processing across the CPU cores available
+        for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
 
             # Filter out stop words, lowercase the tokens, remove punctuation, and strip whitespace
             tokens = [
@@ -51,12 +83,7 @@ def preprocess_texts(texts: list[str], nlp: spacy.language.Language) -> list[str
             ]
 
             # Join the meaningful (i.e., non-stop and non-punctuation) words in the sentence back with single spaces between words
-            processed_text = " ".join(tokens)
-
-            # Append to the output list, which will be used to form a cleaned text column of the reviews
-            processed_texts.append(processed_text)
-
-    return processed_texts
+            yield " ".join(tokens)
 
 
 # Function for batch processing sentiment analysis using spacytextblob pipe methods
@@ -99,12 +126,158 @@ def get_sentiments(texts: list[str]) -> list[str]:
     return results
 
 
+# Generator version of get_sentiments, so sentiment labels can be consumed (e.g. written to file) while later reviews are still being analysed
+def stream_sentiments(
+    texts: Iterable[str],
+    chunk_size: int = 500,
+    n_cores: int | None = None,
+    max_pending_chunks: int | None = None,
+) -> Iterator[str]:
+    """
+    Streaming equivalent of get_sentiments(). Accepts any iterable of preprocessed, lowercased texts, cuts it into chunks of chunk_size texts, and analyses the chunks in a Pool of worker processes. Sentiment labels are yielded one at a time in the same order as the input texts, as soon as the chunk they belong to has completed.
+
+    Back-pressure: at most max_pending_chunks chunks are submitted to the Pool at any moment. A new chunk is only read from the input once the oldest chunk has been handed on to the consumer, so memory use is bounded by chunk_size * max_pending_chunks texts, however long the input stream is.
+
+    Each worker process loads its spaCy/spacytextblob pipeline once, when the Pool starts, rather than once per chunk, since there are many more chunks here than in get_sentiments().
+
+    Parameters:
+        - texts (Iterable[str]): Preprocessed, lowercased review texts to be analysed for sentiment. Can be lazily produced, e.g. by stream_preprocessed_texts().
+        - chunk_size (int): Number of texts sent to a worker process at a time. Defaults to 500.
+        - n_cores (int | None): Number of worker processes. Defaults to cpu_count().
+        - max_pending_chunks (int | None): Maximum number of chunks being worked on or waiting to be consumed. Defaults to twice the number of worker processes, which keeps every worker busy while the consumer catches up.
+
+    Yields:
+        - str: Sentiment label of each review, "Positive", "Negative", or "Neutral", in input order.
+
+    Example usage:
+        >>> texts = ["i love this product", "this was a terrible purchase"]
+        >>> for sentiment in stream_sentiments(texts):
+        ...     print(sentiment)
+        Positive
+        Negative
+    """
+    if n_cores is None:
+        n_cores = cpu_count()
+    if max_pending_chunks is None:
+        max_pending_chunks = 2 * n_cores
+
+    texts = iter(texts)
+    # Results of submitted chunks, oldest first, so labels are yielded in input order
+    pending = deque()
+
+    with Pool(n_cores, initializer=init_sentiment_worker) as pool:
+        while True:
+            # Top up the Pool with new chunks until the in-flight limit is reached or the input runs out
+            while len(pending) < max_pending_chunks:
+                chunk = list(islice(texts, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.apply_async(chunk_sentiment_worker, (chunk,)))
+
+            if not pending:
+                break
+
+            # Wait for the oldest chunk only, then free its slot for the next chunk of input
+            yield from pending.popleft().get()
+
+
+# Stream reviews from a CSV through preprocessing and sentiment analysis, writing the results in chunks as they are produced
+def write_sentiments_csv(
+    input_csv: str,
+    output_csv: str,
+    nlp: spacy.language.Language,
+    text_column: str = "reviews.text",
+    chunksize: int = 5000,
+) -> int:
+    """
+    Runs the CSV reader, the preprocessing stage, the sentiment stage and a CSV writer as one pipeline of generators. Only a few chunks of reviews are held in memory at any time, so the input file can be much larger than the available RAM.
+
+    Parameters:
+        - input_csv (str): Path of the CSV file containing product reviews.
+        - output_csv (str): Path of the CSV file to write. Columns are the original review text, the cleaned text and the sentiment label.
+        - nlp (spacy.language.Language): Instance of nlp text-processing pipeline, used for preprocessing.
+        - text_column (str): Name of the column holding the review text. Defaults to "reviews.text".
+        - chunksize (int): Number of rows read from the input and written to the output at a time. Defaults to 5000.
+
+    Returns:
+        - int: The number of reviews written to output_csv.
+    """
+    # Original review texts are kept back until their results arrive, so they can be written alongside them
+    originals = deque()
+
+    def read_reviews() -> Iterator[str]:
+        for chunk in pd.read_csv(input_csv, usecols=[text_column], chunksize=chunksize):
+            # Same cleaning of empty reviews as main(), chunk by chunk
+            reviews = chunk[text_column].dropna()
+            reviews = reviews[reviews.str.strip() != ""]
+            for review in reviews:
+                originals.append(review)
+                yield review.lower()
+
+    # The cleaned texts are needed twice (as output and as sentiment input), so tee them through a second bounded queue
+    cleaned_texts = deque()
+
+    def clean_reviews() -> Iterator[str]:
+        for cleaned_text in stream_preprocessed_texts(read_reviews(), nlp):
+            cleaned_texts.append(cleaned_text)
+            yield cleaned_text
+
+    written = 0
+    rows = []
+    for sentiment in stream_sentiments(clean_reviews()):
+        rows.append((originals.popleft(), cleaned_texts.popleft(), sentiment))
+        if len(rows) == chunksize:
+            pd.DataFrame(rows, columns=[text_column, "cleaned_text", "sentiment"]).to_csv(
+                output_csv, mode="a" if written else "w", header=not written, index=False
+            )
+            written += len(rows)
+            rows = []
+
+    if rows or not written:
+        pd.DataFrame(rows, columns=[text_column, "cleaned_text", "sentiment"]).to_csv(
+            output_csv, mode="a" if written else "w", header=not written, index=False
+        )
+        written += len(rows)
+
+    return written
+
+
+# Pool initializer for stream_sentiments(), so each worker process loads its own pipeline only once
+def init_sentiment_worker() -> None:
+    """
+    Loads the spaCy pipeline with the spacytextblob component into the worker_nlp global of the current worker process. chunk_sentiment_worker() will then reuse it for every chunk that process is given, instead of loading a new one per chunk.
+
+    NOTE: This function is not meant to be run directly by the user, but rather as the initializer of the Pool in stream_sentiments().
+    """
+    global worker_nlp
+    worker_nlp = load_sentiment_nlp()
+
+
+# Load en_core_web_sm spaCy model with the TextBlob component, as used by the sentiment workers
+def load_sentiment_nlp() -> spacy.language.Language:
+    """
+    Instantiates spaCy nlp with the spacytextblob pipe enabled.
+
+    Returns:
+        - spacy.language.Language: The en_core_web_sm pipeline with a spacytextblob component added.
+    """
+    # Load en_core_web_sm spaCy model to enable natural language processing, classification and sentiment analysis of the product reviews
+    sentiment_nlp = spacy.load("en_core_web_sm")
+    # Add TextBlob component to the pipeline
+    sentiment_nlp.add_pipe("spacytextblob")
+    return sentiment_nlp
+
+
+# Pipeline loaded once per worker process by init_sentiment_worker(). Stays None in processes started by get_sentiments(), where each chunk_sentiment_worker() call loads its own
+worker_nlp = None
+
+
 # Worker function which spawns NLP instances from spaCy each time it is called, reducing run time of processing
 def chunk_sentiment_worker(texts_chunk: list[str]) -> list[str]:
     """
     Worker function, to be spawned when parallel processing for sentiment analysis at reduced time of execution. Given a chunk of a larger list of strings, this function will use spacytextblob-generated sentiment attributes to convert polarity score (in the range -1 to 1) to a human-understandable descriptive text label string. Batch processing pipeline methods of spaCy are utilised.
 
-    Important: This function will create a new spaCy NLP instance with the required spacytextblob component, each time it is called. This is important to allow parallel processing through reducing competition for access to the NLP instance between parallel threads. This approach favours speed of processing over memory-saving tactics, and will use the CPU maximally to minimise the time taken to analyse sentiments.
+    Important: This function will create a new spaCy NLP instance with the required spacytextblob component, each time it is called, unless the worker process already holds one loaded by init_sentiment_worker(). This is important to allow parallel processing through reducing competition for access to the NLP instance between parallel threads. This approach favours speed of processing over memory-saving tactics, and will use the CPU maximally to minimise the time taken to analyse sentiments.
 
     Parameters:
         - texts_chunk (list[str]): A list of lowercase raw texts from product reviews to be processed. Each element in the list is a string representing a single review's text.
@@ -112,7 +285,7 @@ def chunk_sentiment_worker(texts_chunk: list[str]) -> list[str]:
     Returns:
         - list[str]: Sentiment labels of "Positive", "Negative", or "Neutral", in a list of strings.
 
-    NOTE: This function is not meant to be run directly by the user, but rather as a subprocess of the get_sentiments() function.
+    NOTE: This function is not meant to be run directly by the user, but rather as a subprocess of the get_sentiments() or stream_sentiments() functions.
     Example usage:
         >>> texts = ["i love this product", "this was a terrible purchase"]
         >>> sentiments = chunk_sentiment_worker(texts)
@@ -122,16 +295,13 @@ def chunk_sentiment_worker(texts_chunk: list[str]) -> list[str]:
     # Initialise output list
     sentiments = []
 
-    # Instantiate spaCy nlp with spacytextblob pipe enabled
-    # Load en_core_web_sm spaCy model to enable natural language processing, classification and sentiment analysis of the product reviews
-    worker_nlp = spacy.load("en_core_web_sm")
-    # Add TextBlob component to the pipeline
-    worker_nlp.add_pipe("spacytextblob")
+    # Instantiate spaCy nlp with spacytextblob pipe enabled, unless this worker process has one already
+    chunk_nlp = worker_nlp if worker_nlp is not None else load_sentiment_nlp()
 
     # Disable components of the nlp pipe callable which aren't directly related to spacytextblob, to save processing time. nlp will be restored to full functionality at the end of the with block.
-    with worker_nlp.select_pipes(enable=["spacytextblob"]):
+    with chunk_nlp.select_pipes(enable=["spacytextblob"]):
         # Batch size of 50 is reasonable in the context of product review texts
-        for doc in worker_nlp.pipe(texts_chunk, batch_size=50):
+        for doc in chunk_nlp.pipe(texts_chunk, batch_size=50):
             # The polarity score from TextBlob is accessed through spaCy's token extension (._.blob.polarity.sentiment)
             pol = doc._.blob.sentiment.polarity
             # Polarity is a float between -1 and 1. Positive polarity is close to 1, negative to -1, and neutral is at 0: here being close to 0 is used as a proxy for being mostly neutral
@@ -1,7 +1,14 @@
+import time
+
+# Start of the script, for reporting the time taken to reach a result
+_process_started = time.perf_counter()
+
+import argparse
 from datetime import datetime
+from functools import cache
+import io
 import math
 import os
-import time
 import webbrowser
 
 # Rich python library imports for visual design
@@ -227,10 +234,14 @@ def mortgage_payment(
     # Calculation with mortgage repayment formula
     denominator = 1 - math.pow((1 + monthly_interest), -total_repayment_months)
     # Catch where total repayment months is 0 because this will give 1-1 =
+    # The same happens with no interest, when the loan is instead repaid in equal parts over the months
     try:
         monthly_repayment = (monthly_interest * present_dwelling_value) / denominator
     except ZeroDivisionError:
-        monthly_repayment = 0
+        if total_repayment_months == 0:
+            monthly_repayment = 0
+        else:
+            monthly_repayment = present_dwelling_value / total_repayment_months
 
     total_repayment = monthly_repayment * total_repayment_months
 
@@ -270,15 +281,15 @@ def print_calculation_summary_table(
 
     Parameters:
         - calc_choice (str): Identifier for the calculation type chosen by the user. Accepts "si" for
-        simple interest, "ci" for compound interest, and "m" for mortgage payment,
-        which influences the table's title.
+        simple interest, "ci" for compound interest, "m" for mortgage payment, and "p" for a Monte
+        Carlo projection of compound interest, which influences the table's title.
         - inputs_dict (dict): A dictionary of the user's inputs where keys are descriptive labels and
         values are the corresponding inputs provided by the user.
         - final_results (dict): Dict with results of the calculation to be displayed in the table,
         including both a primary and secondary result, such as interest and total amount in the case of interest,
         or monthly and total repayments in the case of mortgage repayment cal.
-        - exporting_console (Console): Temporary Console instance to fill with just table results,
-        to ensure correct export to svg/html/text.
+        - exporting_console (Console): Console to print the table to: the live console, or the
+        console of a receipt being rendered by render_receipt().
 
     Returns:
         - No return value. This function outputs directly to the terminal.
@@ -287,6 +298,7 @@ def print_calculation_summary_table(
         "si": "Simple Interest Results",
         "ci": "Compound Interest Results",
         "m": "Mortgage Payment Results",
+        "p": "Projected Range of Compound Interest Totals",
     }
     title = table_title_map.get(calc_choice, "Results")
 
@@ -320,9 +332,239 @@ def print_calculation_summary_table(
     exporting_console.print(Align.center(table))
 
 
+def sensitivity_grid(
+    calc_choice: str,
+    inputs: dict,
+    rate_step: float = 0.5,
+    term_step: int | None = None,
+    rate_steps: int = 3,
+    term_steps: int = 2,
+) -> dict:
+    """
+    Calculate the headline result of a calculation over a grid of interest rates and terms around
+    the user's own, in one vectorised call: the monthly repayment for a mortgage, or the total
+    including interest for an investment.
+
+    Parameters:
+        - calc_choice (str): "si" for simple interest, "ci" for compound interest, or "m" for
+        mortgage payment.
+        - inputs (dict): The user's inputs, as returned by gather_user_input_values().
+        - rate_step (float): Difference between neighbouring annual interest rates of the grid, in
+        percentage points.
+        - term_step (int | None): Difference between neighbouring terms of the grid, in years.
+        Defaults to 5 years for mortgages and 2 years for investments.
+        - rate_steps (int): Number of rates either side of the user's own. Rates below 0 are left
+        out.
+        - term_steps (int): Number of terms either side of the user's own. Terms below 0 are left
+        out.
+
+    Returns:
+        - dict: "rates" (annual interest rates, as percentages), "terms" (years) and "values" (a
+        matrix of the result for each rate, by row, and term, by column), plus the "label" of the
+        result, and the user's own "rate" and "term".
+    """
+    # Imported here, so that calculations without the grid start without loading NumPy and pandas
+    import numpy as np
+
+    from finance_arrays import interest_calculator_array, mortgage_payment_array
+
+    if calc_choice == "m":
+        rate = inputs["Annual Interest (%)"]
+        term = inputs["Repayment Duration (years)"]
+        term_step = 5 if term_step is None else term_step
+    else:
+        rate = inputs["Annual Interest (%)"]
+        term = inputs["Investment Duration (years)"]
+        term_step = 2 if term_step is None else term_step
+
+    rates = rate + np.arange(-rate_steps, rate_steps + 1) * rate_step
+    rates = rates[rates >= 0]
+    terms = term + np.arange(-term_steps, term_steps + 1) * term_step
+    terms = terms[terms >= 0]
+
+    # A column of rates against a row of terms broadcasts to the whole grid
+    if calc_choice == "m":
+        label = "Monthly Repayment (£)"
+        values = mortgage_payment_array(
+            inputs["Dwelling Value (£)"],
+            rates[:, np.newaxis],
+            0,
+            terms[np.newaxis, :],
+            inputs["Repayment Duration (additional months)"],
+            as_frame=False,
+        )[label]
+    else:
+        label = "Total incl. Deposit and Interest (£)"
+        values = interest_calculator_array(
+            inputs["Deposit (£)"], rates[:, np.newaxis], terms[np.newaxis, :], calc_choice[0], as_frame=False
+        )[label]
+
+    return {"label": label, "rates": rates, "terms": terms, "values": values, "rate": rate, "term": term}
+
+
+def print_sensitivity_table(
+    calc_choice: str, inputs: dict, exporting_console: Console, grid: dict = None, plain_text: bool = False
+) -> None:
+    """
+    Display the grid of sensitivity_grid() as a table, with each result coloured from green for
+    the best outcome (lowest repayment, or highest total) to red for the worst, and the user's own
+    rate and term highlighted. Printed to the same console as the summary table, so it is included
+    in an exported receipt.
+
+    Parameters:
+        - calc_choice (str): "si" for simple interest, "ci" for compound interest, or "m" for
+        mortgage payment.
+        - inputs (dict): The user's inputs, as returned by gather_user_input_values().
+        - exporting_console (Console): Console the summary table was printed to.
+        - grid (dict): The grid of sensitivity_grid(), if already worked out. Calculated here if not
+        given.
+        - plain_text (bool): Whether the table ends up without colours or underlines, as on a text
+        receipt. The user's own rate and term are then marked with a "*" instead.
+
+    Returns:
+        - No return value. This function outputs directly to the terminal.
+    """
+    if grid is None:
+        grid = sensitivity_grid(calc_choice, inputs)
+    values = grid["values"]
+
+    # Position of each value between the best and worst outcome, 0 to 1
+    spread = values.max() - values.min()
+    scaled = (values - values.min()) / spread if spread > 0 else values * 0
+    if calc_choice != "m":
+        scaled = 1 - scaled
+    # Large amounts are shown to the pound so the grid fits the console; the summary table has them to the penny
+    decimals = 0 if values.max() >= 100_000 else 2
+
+    table = Table(
+        title=f"{grid['label']} by Annual Interest (%), down, and Term (years), across",
+        caption="Your own rate and term are marked *"
+        if plain_text
+        else "Green is the best outcome, red the worst. Your own rate and term are underlined",
+    )
+    table.add_column("Rate", style="cyan", no_wrap=True)
+    for term in grid["terms"]:
+        table.add_column(f"{term:,}", justify="right", no_wrap=True)
+
+    for row, rate in enumerate(grid["rates"]):
+        cells = []
+        for column, term in enumerate(grid["terms"]):
+            red, green = int(255 * scaled[row, column]), int(255 * (1 - scaled[row, column]))
+            style = f"bold rgb({red},{green},0)"
+            cell = f"{values[row, column]:,.{decimals}f}"
+            if rate == grid["rate"] and term == grid["term"]:
+                style += " underline"
+                if plain_text:
+                    cell = "*" + cell
+            cells.append(Text(cell, style=style))
+        table.add_row(f"{rate:,.2f}%", *cells)
+
+    exporting_console.print()  # Spacing line
+    exporting_console.print(Align.center(table))
+
+
+def get_projection_inputs(inputs: dict, volatility: float, n_paths: int = 100_000) -> dict:
+    """
+    Builds the labelled inputs of a Monte Carlo projection of a compound interest investment, as
+    shown in the table of print_projection_table().
+
+    Parameters:
+        - inputs (dict): The user's inputs for compound interest, as returned by
+        gather_user_input_values().
+        - volatility (float): Standard deviation of the annual return, as a percentage.
+        - n_paths (int): Number of paths to simulate.
+
+    Returns:
+        - dict: The deposit, mean annual return, return volatility, duration and number of paths.
+    """
+    return {
+        "Deposit (£)": inputs["Deposit (£)"],
+        "Mean Annual Return (%)": inputs["Annual Interest (%)"],
+        "Return Volatility (%)": volatility,
+        "Investment Duration (years)": inputs["Investment Duration (years)"],
+        "Simulated Paths": n_paths,
+    }
+
+
+def project_investment(
+    inputs: dict,
+    volatility: float,
+    n_paths: int = 100_000,
+    distribution: str = "normal",
+    seed: int = 0,
+    n_processes: int = 1,
+) -> dict:
+    """
+    Simulates the range of totals a compound interest investment could reach, as shown by
+    print_projection_table().
+
+    Parameters:
+        - inputs (dict): The user's inputs for compound interest, as returned by
+        gather_user_input_values().
+        - volatility (float): Standard deviation of the annual return, as a percentage.
+        - n_paths (int): Number of paths to simulate.
+        - distribution (str): Distribution of the annual returns, one of monte_carlo.DISTRIBUTIONS.
+        - seed (int): Seed of the simulation.
+        - n_processes (int): Number of worker processes to spread the paths across, -1 for all CPU
+        cores. Projections of up to 100,000 paths are always simulated in this process.
+
+    Returns:
+        - dict: The percentiles of monte_carlo.projection_percentiles().
+    """
+    # Imported here, so that calculations without a projection start without loading NumPy
+    from monte_carlo import projection_percentiles
+
+    return projection_percentiles(
+        *list(get_projection_inputs(inputs, volatility, n_paths).values()),
+        distribution=distribution,
+        seed=seed,
+        n_processes=n_processes,
+    )
+
+
+def print_projection_table(
+    inputs: dict,
+    volatility: float,
+    exporting_console: Console,
+    n_paths: int = 100_000,
+    distribution: str = "normal",
+    seed: int = 0,
+    projection: dict = None,
+    n_processes: int = 1,
+) -> None:
+    """
+    Display the range of totals a compound interest investment could reach if its annual return
+    varied from year to year around the user's rate, as percentile bands of a Monte Carlo
+    projection. Printed to the same console as the summary table, so it is included in an exported
+    receipt.
+
+    Parameters:
+        - inputs (dict): The user's inputs for compound interest, as returned by
+        gather_user_input_values().
+        - volatility (float): Standard deviation of the annual return, as a percentage.
+        - exporting_console (Console): Console the summary table was printed to.
+        - n_paths (int): Number of paths to simulate.
+        - distribution (str): Distribution of the annual returns, one of monte_carlo.DISTRIBUTIONS.
+        - seed (int): Seed of the simulation, so the same inputs always give the same receipt.
+        - projection (dict): The percentiles of project_investment(), if already worked out.
+        Simulated here if not given.
+        - n_processes (int): Number of worker processes of the simulation, as for
+        project_investment().
+
+    Returns:
+        - No return value. This function outputs directly to the terminal.
+    """
+    projection_inputs = get_projection_inputs(inputs, volatility, n_paths)
+    if projection is None:
+        projection = project_investment(inputs, volatility, n_paths, distribution, seed, n_processes)
+
+    exporting_console.print()  # Spacing line
+    print_calculation_summary_table("p", projection_inputs, projection, exporting_console)
+
+
 def clear_console_and_print_header(local_console: Console = None) -> None:
     """
-    Clears the console and prints the header bar which is defined outside the function scope,
+    Clears the console and prints the header bar built by get_header(),
     unless a specific console instance is passed (such as when exporting a receipt).
     A new line is printed to space the header out from the other rendered console contents.
 
@@ -340,218 +582,488 @@ def clear_console_and_print_header(local_console: Console = None) -> None:
         local_console = console  # Use global console
 
     local_console.clear()
-    local_console.print(header)
+    local_console.print(get_header())
     local_console.print()  # Spacing line
 
 
-def export_receipt(export_format: str, export_console: Console) -> None:
+def print_results(
+    calc_choice: str,
+    inputs: dict,
+    final_results: dict,
+    exporting_console: Console,
+    sensitivity: bool = True,
+    volatility: float = 0,
+    n_paths: int = 100_000,
+    distribution: str = "normal",
+    seed: int = 0,
+    grid: dict = None,
+    projection: dict = None,
+    n_processes: int = 1,
+    plain_text: bool = False,
+) -> None:
     """
-    Exports the table of user inputs plus the calculation result to a file, and opens the exported file.
+    Prints everything shown for a calculation after the header: the summary table, and optionally
+    the sensitivity grid and the Monte Carlo projection. The same function prints the results on
+    screen and on a receipt, so the two always match.
 
-    The function supports exporting to image (SVG), webpage (HTML), or text format.
-    After exporting, the file is automatically opened in the default application.
+    Parameters:
+        - calc_choice (str): "si" for simple interest, "ci" for compound interest, or "m" for
+        mortgage payment.
+        - inputs (dict): The user's inputs, as returned by gather_user_input_values().
+        - final_results (dict): The results of interest_calculator() or mortgage_payment().
+        - exporting_console (Console): Console to print to.
+        - sensitivity (bool): Whether to print the sensitivity grid of print_sensitivity_table().
+        - volatility (float): For compound interest, the volatility of the annual return (%) to
+        project with print_projection_table(). 0 for no projection.
+        - n_paths (int): Number of paths of the projection.
+        - distribution (str): Distribution of annual returns of the projection.
+        - seed (int): Seed of the projection.
+        - grid (dict): The sensitivity grid, if already worked out by calculate_extras().
+        - projection (dict): The projection, if already worked out by calculate_extras().
+        - n_processes (int): Number of worker processes of the projection, -1 for all CPU cores.
+        - plain_text (bool): Whether the output ends up without colours, as on a text receipt, for
+        print_sensitivity_table().
+
+    Returns:
+        - No return value. This function outputs directly to the console given.
+    """
+    print_calculation_summary_table(calc_choice, inputs, final_results, exporting_console)
+    if sensitivity:
+        print_sensitivity_table(calc_choice, inputs, exporting_console, grid, plain_text)
+    if calc_choice == "ci" and volatility:
+        print_projection_table(
+            inputs, volatility, exporting_console, n_paths, distribution, seed, projection, n_processes
+        )
+
+
+def calculate_extras(
+    calc_choice: str,
+    inputs: dict,
+    sensitivity: bool = True,
+    volatility: float = 0,
+    n_paths: int = 100_000,
+    distribution: str = "normal",
+    seed: int = 0,
+    n_processes: int = 1,
+) -> dict:
+    """
+    Works out the sensitivity grid and the Monte Carlo projection print_results() would show, with
+    the same options, so that results printed both on screen and on a receipt are only calculated
+    once.
 
     Parameters:
-        - export_format (str): The format for exporting the receipt. Choices are "image",
-        "webpage", "text".
-        - exporting_console (Console): Temporary Console to fill with just table results,
-        to ensure correct export to image (SVG)/webpage (HTML)/text.
+        - calc_choice (str): "si" for simple interest, "ci" for compound interest, or "m" for
+        mortgage payment.
+        - inputs (dict): The user's inputs, as returned by gather_user_input_values().
+        - sensitivity, volatility, n_paths, distribution, seed, n_processes: Options as for
+        print_results().
 
     Returns:
-        - No return value. This function will open the exported receipt in a new window.
+        - dict: The "grid" and "projection" options of print_results(), each None if not shown.
     """
-    filename_map = {
-        "image": "receipt.svg",
-        "webpage": "receipt.html",
-        "text": "receipt.txt",
+    return {
+        "grid": sensitivity_grid(calc_choice, inputs) if sensitivity else None,
+        "projection": project_investment(inputs, volatility, n_paths, distribution, seed, n_processes)
+        if calc_choice == "ci" and volatility
+        else None,
     }
-    filename = filename_map.get(export_format, "receipt.svg")
 
-    # Use the absolute path of the current working directory
-    absolute_file_path = os.path.join(os.getcwd(), filename)
 
+# File extension of each receipt format
+RECEIPT_EXTENSIONS = {
+    "image": ".svg",
+    "webpage": ".html",
+    "text": ".txt",
+}
+
+
+def render_receipt(
+    export_format: str,
+    output_path: str,
+    calc_choice: str,
+    inputs: dict,
+    final_results: dict,
+    width: int = 100,
+    **print_options,
+) -> str:
+    """
+    Writes a receipt of a calculation to a file, from the calculation's inputs and results alone.
+    The receipt is rendered on a recording Console of its own, which writes nothing to the terminal
+    and whose recording is cleared once the file is saved, so rendering many receipts doesn't hold
+    on to any of them.
+
+    Parameters:
+        - export_format (str): "image" (SVG), "webpage" (HTML) or "text".
+        - output_path (str): Path of the file to write.
+        - calc_choice (str): "si" for simple interest, "ci" for compound interest, or "m" for
+        mortgage payment.
+        - inputs (dict): The user's inputs, as returned by gather_user_input_values().
+        - final_results (dict): The results of interest_calculator() or mortgage_payment().
+        - width (int): Width of the receipt in characters.
+        - **print_options: Options of print_results(), such as sensitivity and volatility.
+
+    Returns:
+        - str: The path of the receipt written.
+    """
+    if export_format not in RECEIPT_EXTENSIONS:
+        raise ValueError(f"export_format must be one of {', '.join(RECEIPT_EXTENSIONS)}")
+
+    receipt_console = Console(record=True, file=io.StringIO(), width=width)
+    receipt_console.print(get_header())
+    receipt_console.print()  # Spacing line
+    # A text receipt keeps none of the colours or underlines
+    print_results(
+        calc_choice, inputs, final_results, receipt_console, plain_text=export_format == "text", **print_options
+    )
+
+    # Saving clears the recording
     if export_format == "image":
-        export_console.save_svg(
-            absolute_file_path, title="Finnegan Finance Calculators", theme=MONOKAI
-        )
+        receipt_console.save_svg(output_path, title="Finnegan Finance Calculators", theme=MONOKAI)
     elif export_format == "webpage":
-        export_console.save_html(absolute_file_path, theme=MONOKAI)
-    elif export_format == "text":
-        export_console.save_text(absolute_file_path)
+        receipt_console.save_html(output_path, theme=MONOKAI)
     else:
+        receipt_console.save_text(output_path)
+    return output_path
+
+
+def export_receipt(
+    export_format: str,
+    calc_choice: str,
+    inputs: dict,
+    final_results: dict,
+    open_file: bool = True,
+    **print_options,
+) -> None:
+    """
+    Exports the table of user inputs plus the calculation result to a file in the current
+    directory, with render_receipt(), and opens the exported file.
+
+    The function supports exporting to image (SVG), webpage (HTML), or text format.
+    After exporting, the file is automatically opened in the default application.
+
+    Parameters:
+        - export_format (str): The format for exporting the receipt. Choices are "image",
+        "webpage", "text".
+        - calc_choice (str): "si" for simple interest, "ci" for compound interest, or "m" for
+        mortgage payment.
+        - inputs (dict): The user's inputs, as returned by gather_user_input_values().
+        - final_results (dict): The results of interest_calculator() or mortgage_payment().
+        - open_file (bool): Whether to open the receipt once it is exported.
+        - **print_options: Options of print_results(), such as sensitivity and volatility.
+
+    Returns:
+        - No return value. This function will open the exported receipt in a new window.
+    """
+    if export_format not in RECEIPT_EXTENSIONS:
         console.print("Unsupported format. Defaulting to image export.")
-        export_console.save_svg(
-            absolute_file_path, title="Finnegan Finance Calculators", theme=MONOKAI
-        )
+        export_format = "image"
+
+    # Use the absolute path of the current working directory
+    absolute_file_path = os.path.join(os.getcwd(), "receipt" + RECEIPT_EXTENSIONS[export_format])
+    render_receipt(
+        export_format,
+        absolute_file_path,
+        calc_choice,
+        inputs,
+        final_results,
+        width=console.width,
+        **print_options,
+    )
 
     console.print()  # Spacing line
     console.print(
         f'[b]Exported your [u]{export_format}[/] receipt to [link={absolute_file_path}]"{absolute_file_path}".',
-        "[b]It should open now, else you can find it in your file explorer.",
+        "[b]It should open now, else you can find it in your file explorer."
+        if open_file
+        else "[b]You can find it in your file explorer.",
         sep="\n",
         justify="center",
     )
     console.print()  # Spacing line
 
     # Open the exported file
-    webbrowser.open(absolute_file_path)
+    if open_file:
+        webbrowser.open(absolute_file_path)
 
 
 # ----VISUAL INTERFACE CREATION SECTION----
-# Instantiate a Rich Python library Console object, record=True allows export of receipts at the end
-console = Console(record=True)
+# Instantiate a Rich Python library Console object. It doesn't record what it prints: receipts are rendered on
+# consoles of their own by render_receipt(), so a long session doesn't keep everything it has shown in memory
+console = Console()
+
+
+# The display panels and the progress bar below are only built the first time they are rendered, and then reused, so
+# importing this file or running a --quick calculation doesn't pay for UI that is never shown
 
 
 # ----HEADER BAR SECTION----
-# Make a grid to contain titles and the time
-grid = Table.grid(expand=True)
-grid.add_column(justify="left", ratio=1)
-grid.add_column(justify="center", ratio=2)
-grid.add_column(justify="right", ratio=1)
-
-# Fill in the content of the grid, use rich's inline BBCode-style markdown syntax to stylise the text
-# Use datetime's formatting options for a readable date
-grid.add_row(
-    "[i]Finnegan Finance",
-    "[b]Investment Interest and Mortgage Calculators",
-    datetime.now().strftime("%a %b %d, %Y, %I:%M%p"),
-)
-# Create panel for header with titles and clock
-header = Panel(grid, style="red on white")
+@cache
+def get_header() -> Panel:
+    # Make a grid to contain titles and the time
+    grid = Table.grid(expand=True)
+    grid.add_column(justify="left", ratio=1)
+    grid.add_column(justify="center", ratio=2)
+    grid.add_column(justify="right", ratio=1)
+
+    # Fill in the content of the grid, use rich's inline BBCode-style markdown syntax to stylise the text
+    # Use datetime's formatting options for a readable date
+    grid.add_row(
+        "[i]Finnegan Finance",
+        "[b]Investment Interest and Mortgage Calculators",
+        datetime.now().strftime("%a %b %d, %Y, %I:%M%p"),
+    )
+    # Create panel for header with titles and clock
+    return Panel(grid, style="red on white")
 
 
 # ----WELCOME and CALCULATOR CHOICE SECTION----
-# Display a centred welcome message
-welcome = Panel(
-    Text(
-        "We offer two calculators: Investment Interest Calculator, and Mortgage Payment Calculator",
-        style="blue",
-        justify="center",
-        overflow="fold",
-    ),
-    title="[i][green]Welcome",
-    title_align="left",
-    subtitle="[b][red]Make your choice below",
-    subtitle_align="right",
-)
+@cache
+def get_welcome() -> Panel:
+    # Display a centred welcome message
+    return Panel(
+        Text(
+            "We offer two calculators: Investment Interest Calculator, and Mortgage Payment Calculator",
+            style="blue",
+            justify="center",
+            overflow="fold",
+        ),
+        title="[i][green]Welcome",
+        title_align="left",
+        subtitle="[b][red]Make your choice below",
+        subtitle_align="right",
+    )
 
 
 # ----DESCRIBE THE CALCULATORS SECTION----
-explain_calcs = Columns(
-    [
-        Panel(
-            Text.from_markup(
-                """
+@cache
+def get_explain_calcs() -> Columns:
+    return Columns(
+        [
+            Panel(
+                Text.from_markup(
+                    """
 Calculate the amount of interest you'll earn in the future on your investment.
 
 • You can choose [u]simple[/] or [u]compound[/] interest.\n• You'll need:"""
-                """ [i]deposit amount, annual %interest rate, years invested
+                    """ [i]deposit amount, annual %interest rate, years invested
                 """
+                ),
+                style="cyan on deep_sky_blue4",
+                padding=(2, 3),
+                title="[b]Interest",
+                subtitle="[b]Type 'i' to select",
+                width=int((console.width - 4) / 2),
+                height=16,
             ),
-            style="cyan on deep_sky_blue4",
-            padding=(2, 3),
-            title="[b]Interest",
-            subtitle="[b]Type 'i' to select",
-            width=int((console.width - 4) / 2),
-            height=16,
-        ),
-        Panel(
-            Text.from_markup(
-                """
+            Panel(
+                Text.from_markup(
+                    """
 Calculate the monthly amount you'll have to repay for a mortgage.
 
 • You'll need: [i]present value of dwelling, annual %interest rate,"""
-                """ years and months over which your mortgage loan will be repaid
+                    """ years and months over which your mortgage loan will be repaid
                 """
+                ),
+                style="yellow on dark_green",
+                padding=(2, 3),
+                title="[b]Mortgage",
+                subtitle="[b]Type 'm' to select",
+                width=int((console.width - 4) / 2),
+                height=16,
             ),
-            style="yellow on dark_green",
-            padding=(2, 3),
-            title="[b]Mortgage",
-            subtitle="[b]Type 'm' to select",
-            width=int((console.width - 4) / 2),
-            height=16,
-        ),
-    ],
-    equal=True,
-    padding=3,
-    align="center",
-)
+        ],
+        equal=True,
+        padding=3,
+        align="center",
+    )
 
 
 # ----EXPLAIN DIFFERENCE BETWEEN SIMPLE OR COMPOUND INTEREST----
-explain_interests = Columns(
-    [
-        Panel(
-            """Simple interest is calculated on your initial loan value, and the interest remains"""
-            """ at the constant rate based on that principal sum""",
-            style="hot_pink3 on chartreuse1",
-            padding=(2, 3),
-            title="[b]Simple Interest",
-            subtitle="[b]Type 's' to select",
-            width=int((console.width - 4) / 2),
+@cache
+def get_explain_interests() -> Columns:
+    return Columns(
+        [
+            Panel(
+                """Simple interest is calculated on your initial loan value, and the interest remains"""
+                """ at the constant rate based on that principal sum""",
+                style="hot_pink3 on chartreuse1",
+                padding=(2, 3),
+                title="[b]Simple Interest",
+                subtitle="[b]Type 's' to select",
+                width=int((console.width - 4) / 2),
+            ),
+            Panel(
+                """Compound interest means that the interest rate at each billing period applies to"""
+                """ the principal plus interest accumulated""",
+                style="dark_violet on light_salmon1",
+                padding=(2, 3),
+                title="[b]Compound Interest",
+                subtitle="[b]Type 'c' to select",
+                width=int((console.width - 4) / 2),
+            ),
+        ],
+        equal=True,
+        padding=3,
+        align="center",
+    )
+
+
+# ----DEFINING A PROGRESS BAR TO SIMULATE WORK BEING DONE----
+@cache
+def get_progress() -> Progress:
+    return Progress(
+        SpinnerColumn(
+            spinner_name="runner",
+            finished_text="[green]:heavy_check_mark:",
+            table_column=Column(None),
         ),
-        Panel(
-            """Compound interest means that the interest rate at each billing period applies to"""
-            """ the principal plus interest accumulated""",
-            style="dark_violet on light_salmon1",
-            padding=(2, 3),
-            title="[b]Compound Interest",
-            subtitle="[b]Type 'c' to select",
-            width=int((console.width - 4) / 2),
+        SpinnerColumn(
+            spinner_name="monkey",
+            finished_text="[green]:heavy_check_mark:",
+            table_column=Column(None),
         ),
-    ],
-    equal=True,
-    padding=3,
-    align="center",
-)
+        SpinnerColumn(
+            spinner_name="earth",
+            finished_text="[green]:heavy_check_mark:",
+            table_column=Column(None),
+        ),
+        TextColumn("{task.description}", table_column=Column(ratio=2)),
+        BarColumn(bar_width=None, table_column=Column(ratio=5)),
+        TaskProgressColumn(table_column=Column(ratio=1)),
+        TimeRemainingColumn(table_column=Column(ratio=1)),
+        TimeElapsedColumn(table_column=Column(ratio=1)),
+        console=console,
+        expand=True,
+    )
 
 
-# ----DEFINING A PROGRESS BAR TO SIMULATE WORK BEING DONE----
-progress = Progress(
-    SpinnerColumn(
-        spinner_name="runner",
-        finished_text="[green]:heavy_check_mark:",
-        table_column=Column(None),
-    ),
-    SpinnerColumn(
-        spinner_name="monkey",
-        finished_text="[green]:heavy_check_mark:",
-        table_column=Column(None),
-    ),
-    SpinnerColumn(
-        spinner_name="earth",
-        finished_text="[green]:heavy_check_mark:",
-        table_column=Column(None),
-    ),
-    TextColumn("{task.description}", table_column=Column(ratio=2)),
-    BarColumn(bar_width=None, table_column=Column(ratio=5)),
-    TaskProgressColumn(table_column=Column(ratio=1)),
-    TimeRemainingColumn(table_column=Column(ratio=1)),
-    TimeElapsedColumn(table_column=Column(ratio=1)),
-    console=console,
-    expand=True,
-)
+# ----COMMAND LINE ARGUMENTS FOR FAST START----
+def parse_arguments() -> argparse.Namespace:
+    """
+    Reads the command line options. With --quick and the inputs of a calculation, the calculation
+    runs straight away with no prompts, panels or progress bar, e.g.:
+        python capstone_finance_calculators.py --quick m --amount 250000 --annual-interest 4.5 --years 25
+
+    Returns:
+        - argparse.Namespace: The options given. Inputs that are not given are 0.
+    """
+    parser = argparse.ArgumentParser(description="Finnegan Finance investment interest and mortgage calculators.")
+    parser.add_argument("--quick", choices=["s", "c", "m"], help="Calculate straight away without prompts: s for simple interest, c for compound interest, m for mortgage")
+    parser.add_argument("--amount", type=float, default=0, help="Deposit, or dwelling value for a mortgage (£)")
+    parser.add_argument("--annual-interest", type=float, default=0, help="Annual interest rate (%%)")
+    parser.add_argument("--monthly-interest", type=float, default=0, help="Monthly interest rate for a mortgage (%%), used instead of the annual rate")
+    parser.add_argument("--years", type=int, default=0, help="Years invested, or full years repaying a mortgage")
+    parser.add_argument("--months", type=int, default=0, help="Months repaying a mortgage on top of the full years")
+    parser.add_argument("--sensitivity", action="store_true", help="Also show the result over a grid of rates and terms around the inputs")
+    parser.add_argument("--volatility", type=float, default=0, help="With --quick c, also project the range of totals if the annual return varies by this much (%%, standard deviation)")
+    parser.add_argument("--paths", type=int, default=100_000, help="Number of paths of the --volatility projection")
+    parser.add_argument("--distribution", choices=["normal", "lognormal", "t"], default="normal", help="Distribution of annual returns in the --volatility projection")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the --volatility projection")
+    parser.add_argument("--n-process", type=int, default=-1, help="Processes to spread large --volatility projections across, -1 for all CPU cores")
+    parser.add_argument("--receipt", choices=["image", "webpage", "text"], help="Export a receipt of the result in this format")
+    parser.add_argument("--fast", action="store_true", help="Skip the simulated progress bar in the interactive calculators")
+    args = parser.parse_args()
+
+    # Same checks as the prompts in gather_user_input_values()
+    if not all(
+        math.isfinite(x) and x >= 0
+        for x in (args.amount, args.annual_interest, args.monthly_interest, args.years, args.months)
+    ):
+        parser.error("all values must be numbers of 0 or above")
+    if args.months >= 12:
+        parser.error("months should be less than 12")
+    if not (math.isfinite(args.volatility) and args.volatility >= 0) or args.paths < 1:
+        parser.error("--volatility must be 0 or above, and --paths 1 or above")
+    if args.n_process == 0 or args.n_process < -1:
+        parser.error("--n-process must be 1 or more, or -1 for all CPU cores")
+    if args.volatility and args.quick != "c":
+        parser.error("--volatility only applies to compound interest (--quick c)")
+    return args
+
+
+def quick_calculation(args: argparse.Namespace) -> None:
+    """
+    Runs one calculation from the command line options, printing the table of results and the time
+    taken from the start of the script, and exporting a receipt if one was asked for.
+
+    Parameters:
+        - args (argparse.Namespace): Options from parse_arguments(), with --quick given.
+
+    Returns:
+        - No return value. This function outputs directly to the terminal.
+    """
+    if args.quick == "m":
+        monthly_interest = args.monthly_interest
+        annual_interest = args.annual_interest
+        # Fill in whichever rate wasn't given from the other, as gather_user_input_values() does
+        if monthly_interest == 0:
+            monthly_interest = annual_interest / 12
+        else:
+            annual_interest = monthly_interest * 12
+
+        calc_choice = "m"
+        calc_components = {
+            "Dwelling Value (£)": args.amount,
+            "Annual Interest (%)": annual_interest,
+            "Monthly Interest (%)": monthly_interest,
+            "Repayment Duration (years)": args.years,
+            "Repayment Duration (additional months)": args.months,
+        }
+        calc_results = mortgage_payment(*list(calc_components.values()))
+    else:
+        calc_choice = args.quick + "i"
+        calc_components = {
+            "Deposit (£)": args.amount,
+            "Annual Interest (%)": args.annual_interest,
+            "Investment Duration (years)": args.years,
+        }
+        calc_results = interest_calculator(*list(calc_components.values()), compound_simple=args.quick)
+
+    # Just the header and the tables, as on the receipt
+    print_options = {
+        "sensitivity": args.sensitivity,
+        "volatility": args.volatility,
+        "n_paths": args.paths,
+        "distribution": args.distribution,
+        "seed": args.seed,
+        "n_processes": args.n_process,
+    }
+    # Worked out once for both the screen and the receipt
+    print_options.update(calculate_extras(calc_choice, calc_components, **print_options))
+    console.print(get_header())
+    console.print()  # Spacing line
+    print_results(calc_choice, calc_components, calc_results, console, **print_options)
+    console.print(f"[dim]Result in {time.perf_counter() - _process_started:.3f}s from start")
+
+    if args.receipt:
+        export_receipt(args.receipt, calc_choice, calc_components, calc_results, **print_options)
 
 
 # ----PRINTING ALL TO CONSOLE - main()----
 def main() -> None:
+    args = parse_arguments()
+    if args.quick:
+        quick_calculation(args)
+        return
+
     # Welcome messages in spread-out graphics
     clear_console_and_print_header()
 
-    console.print(welcome)
+    console.print(get_welcome())
     console.print()  # Spacing line
-    console.print(explain_calcs)
+    console.print(get_explain_calcs())
     console.print()  # Spacing line
 
     # First branch of user choice (investment or mortgage)
     calc_choice = Prompt.ask("[green]How can we help?", choices=["i", "m"])
+    volatility = 0
 
     # Investment interest calculator selected
     if calc_choice == "i":
         clear_console_and_print_header()
         console.print(Rule("[red][b]Interest Calculator", style="blue"))
         console.print()  # Spacing line
-        console.print(explain_interests)
+        console.print(get_explain_interests())
         console.print()  # Spacing line
 
         # Second branch of user choice will depend on this answer (simple or compound interest)
@@ -580,6 +1092,19 @@ def main() -> None:
         # "ci" or "si": This concatenated calc_choice will inform the title of the output table
         calc_choice = interest_type + calc_choice
 
+        # Compound interest can also be projected with a return that varies from year to year
+        if interest_type == "c" and Confirm.ask(
+            "Would you like to see the range of totals you could reach if the return varies from year to year?"
+        ):
+            volatility = FloatPrompt.ask(
+                "By how much could the annual return vary, as a percentage (e.g. 15)?"
+            )
+            while volatility < 0:
+                console.print("[b]Your answer must be 0 or above")
+                volatility = FloatPrompt.ask(
+                    "By how much could the annual return vary, as a percentage (e.g. 15)?"
+                )
+
     # Mortgage calculator selected
     elif calc_choice == "m":
         clear_console_and_print_header()
@@ -602,28 +1127,27 @@ def main() -> None:
             default="image",
         )
 
-    # Progress bar simulates work being done
-    with progress:
-        console.print()  # Spacing line
-        console.print(Rule())
-        simulate_work(progress)
-        time.sleep(
-            1
-        )  # Give users a little time to see that all is completed before displaying table
+    # Progress bar simulates work being done, unless skipped with --fast
+    if not args.fast:
+        progress = get_progress()
+        with progress:
+            console.print()  # Spacing line
+            console.print(Rule())
+            simulate_work(progress)
+            time.sleep(
+                1
+            )  # Give users a little time to see that all is completed before displaying table
 
-    # Create a temp console to only export the table and header
+    # Print table of results, and how they would change with other rates and terms
     clear_console_and_print_header()
-    temp_console = Console(record=True)
-    clear_console_and_print_header(temp_console)
-
-    # Print table of results
-    print_calculation_summary_table(
-        calc_choice, calc_components, calc_results, temp_console
-    )
+    print_options = {"volatility": volatility, "n_processes": args.n_process}
+    # Worked out once for both the screen and the receipt
+    print_options.update(calculate_extras(calc_choice, calc_components, **print_options))
+    print_results(calc_choice, calc_components, calc_results, console, **print_options)
 
-    # Export table, if user has requested this
+    # Export the same tables from the results, if user has requested this
     if save:
-        export_receipt(export_format, temp_console)
+        export_receipt(export_format, calc_choice, calc_components, calc_results, **print_options)
 
 
 # This file is meant to be run as a script so this is just cover against import (imagining that the functions could be imported, or display panels etc could be made into a class that could be exported for future use):
@@ -0,0 +1,171 @@
+# On-disk cache of parsed spaCy Docs, so that re-analysing the same sentences deserialises the Docs from the last run
+# instead of running the tagger, parser and NER over them again.
+# Docs are stored in spaCy DocBin shards, one directory per model name and version, since Docs parsed by one model must
+# never be served for another. Each batch of newly parsed Docs is written as a new shard, then recorded in an
+# append-only journal listing the text hash of every Doc in the shard, so a cache is never rewritten, only added to.
+
+import json
+import os
+import time
+from itertools import islice
+from typing import Iterable, Iterator
+
+import spacy
+from spacy.tokens import DocBin
+
+from model_registry import content_hash, model_name
+
+# Journal of the shards in a model's cache directory: one line per shard, with the hash of each text in it, in order
+JOURNAL_FILENAME = "shards.jsonl"
+SHARD_FILENAME = "shard-{number:05d}.spacy"
+
+
+def _read_journal(model_dir: str) -> tuple[dict, int, float, int]:
+    # Maps each cached text hash to its shard and position, and sums the recorded parse times
+    locations = {}
+    shards = 0
+    parse_seconds = 0.0
+    parsed = 0
+    journal_path = os.path.join(model_dir, JOURNAL_FILENAME)
+    if os.path.exists(journal_path):
+        with open(journal_path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                for position, text_hash in enumerate(entry["hashes"]):
+                    locations.setdefault(text_hash, (entry["shard"], position))
+                shards += 1
+                parse_seconds += entry["seconds"]
+                parsed += len(entry["hashes"])
+    return locations, shards, parse_seconds, parsed
+
+
+def cached_pipe(
+    texts: Iterable[str],
+    nlp: spacy.language.Language,
+    cache_dir: str,
+    batch_size: int = 1000,
+    n_process: int = 1,
+    chunk_size: int = 10000,
+    stats: dict | None = None,
+) -> Iterator[spacy.tokens.Doc]:
+    """
+    Processes texts like nlp.pipe(), but serves every text parsed on an earlier run from the cache
+    instead of parsing it again. Only texts not yet in the cache are sent to the pipeline, and their
+    Docs are added to the cache as a new shard. Texts are read chunk_size at a time, so a corpus of
+    any size streams through in bounded memory.
+
+    Parameters:
+        - texts (Iterable[str]): The texts to process.
+        - nlp (spacy.language.Language): Instance of nlp text-processing pipeline.
+        - cache_dir (str): Directory of the cache. Created if it does not exist.
+        - batch_size (int): Number of texts spaCy processes together in one batch.
+        - n_process (int): Number of processes spaCy spreads the batches across.
+        - chunk_size (int): Number of texts looked up in the cache, and parsed, at a time.
+        - stats (dict | None): If given, filled in with the cache statistics of cache_stats() once
+        all the texts have been processed.
+
+    Yields:
+        - spacy.tokens.Doc: The Doc of each text, in the order of texts.
+
+    Example:
+        >>> stats = {}
+        >>> docs = list(cached_pipe(sentences, nlp, "parse_cache", stats=stats))
+        >>> stats["Hit rate"]
+        1.0
+    """
+    model_dir = os.path.join(cache_dir, model_name(nlp))
+    os.makedirs(model_dir, exist_ok=True)
+    locations, shards, parse_seconds, parsed = _read_journal(model_dir)
+    run_parse_seconds = 0.0
+
+    hits = 0
+    misses = 0
+    load_seconds = 0.0
+    # Docs of the last shard read, as consecutive chunks of a rerun mostly come from the same shard
+    loaded_shard = None
+    loaded_docs = []
+
+    texts = iter(texts)
+    while chunk := list(islice(texts, chunk_size)):
+        hashes = [content_hash(text) for text in chunk]
+        docs = [None] * len(chunk)
+
+        # Parse the texts not in the cache, once each however often they repeat, and save them as a new shard
+        new_hashes = list(dict.fromkeys(text_hash for text_hash in hashes if text_hash not in locations))
+        if new_hashes:
+            new_texts = {}
+            for text, text_hash in zip(chunk, hashes):
+                new_texts.setdefault(text_hash, text)
+            started = time.perf_counter()
+            parsed_docs = nlp.pipe(
+                (new_texts[text_hash] for text_hash in new_hashes), batch_size=batch_size, n_process=n_process
+            )
+            new_docs = dict(zip(new_hashes, parsed_docs))
+            seconds = time.perf_counter() - started
+
+            shard = SHARD_FILENAME.format(number=shards)
+            DocBin(docs=new_docs.values()).to_disk(os.path.join(model_dir, shard))
+            # The journal line is only written once the shard is complete, so a cache interrupted mid-write is
+            # still consistent
+            with open(os.path.join(model_dir, JOURNAL_FILENAME), "a") as f:
+                f.write(json.dumps({"shard": shard, "hashes": new_hashes, "seconds": seconds}) + "\n")
+            for position, text_hash in enumerate(new_hashes):
+                locations[text_hash] = (shard, position)
+            shards += 1
+            run_parse_seconds += seconds
+            parse_seconds += seconds
+            parsed += len(new_hashes)
+
+            for i, text_hash in enumerate(hashes):
+                if text_hash in new_docs:
+                    docs[i] = new_docs[text_hash]
+                    misses += 1
+
+        # Deserialise the rest from their shards, one shard at a time
+        started = time.perf_counter()
+        cached = sorted((locations[text_hash], i) for i, text_hash in enumerate(hashes) if docs[i] is None)
+        for (shard, position), i in cached:
+            if shard != loaded_shard:
+                loaded_docs = list(DocBin().from_disk(os.path.join(model_dir, shard)).get_docs(nlp.vocab))
+                loaded_shard = shard
+            docs[i] = loaded_docs[position]
+        load_seconds += time.perf_counter() - started
+        hits += len(cached)
+
+        yield from docs
+
+    if stats is not None:
+        seconds_per_doc = parse_seconds / parsed if parsed else 0.0
+        stats.update(cache_stats(hits, misses, run_parse_seconds, load_seconds, seconds_per_doc))
+
+
+def cache_stats(
+    hits: int, misses: int, parse_seconds: float, load_seconds: float, seconds_per_doc: float
+) -> dict:
+    """
+    Summarises a run of cached_pipe(). The time saved is estimated as the time the pipeline would
+    have taken to parse the cache hits, at the average rate of every parse the cache has recorded,
+    minus the time spent loading them instead.
+
+    Parameters:
+        - hits (int): Number of texts served from the cache.
+        - misses (int): Number of texts that had to be parsed by the pipeline.
+        - parse_seconds (float): Seconds spent parsing in this run.
+        - load_seconds (float): Seconds spent deserialising cached Docs in this run.
+        - seconds_per_doc (float): Average seconds the pipeline takes to parse one text.
+
+    Returns:
+        - dict: Labelled statistics: texts processed, cache hits, hit rate, seconds spent parsing
+        and loading, and the estimated seconds saved.
+    """
+    total = hits + misses
+    return {
+        "Texts": total,
+        "Cache hits": hits,
+        "Hit rate": hits / total if total else 0.0,
+        "Parse time (s)": parse_seconds,
+        "Load time (s)": load_seconds,
+        "Time saved (s)": hits * seconds_per_doc - load_seconds,
+    }
@@ -0,0 +1,196 @@
+# Inverted index of the named entities found in analysed corpora, kept in a SQLite database, so entity mentions can be
+# queried later (e.g. all ORG mentions of Amazon, or sentences with both a GPE and a DATE) without parsing anything again.
+# The index is built as garden.py analyses a corpus and grows one corpus file at a time: adding a new file leaves the
+# files already indexed untouched, re-adding a changed file replaces its entries, and re-adding an unchanged file is
+# skipped.
+
+import hashlib
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sentences (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL REFERENCES sources(id),
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mentions (
+    sentence_id INTEGER NOT NULL REFERENCES sentences(id),
+    text TEXT NOT NULL,
+    label TEXT NOT NULL,
+    start_char INTEGER NOT NULL,
+    end_char INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mentions_by_label_text ON mentions (label, text);
+CREATE INDEX IF NOT EXISTS mentions_by_text ON mentions (text);
+CREATE INDEX IF NOT EXISTS mentions_by_sentence ON mentions (sentence_id);
+CREATE INDEX IF NOT EXISTS sentences_by_source ON sentences (source_id);
+"""
+
+
+def open_entity_index(db_path: str) -> sqlite3.Connection:
+    """
+    Opens an entity index database, creating its tables the first time.
+
+    Parameters:
+        - db_path (str): Path of the SQLite database file.
+
+    Returns:
+        - sqlite3.Connection: Connection to the index, returning rows that can be read by column name.
+    """
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def file_hash(path: str) -> str:
+    """
+    Hash of a corpus file's contents, used to tell whether a file has changed since it was indexed.
+
+    Parameters:
+        - path (str): Path of the file.
+
+    Returns:
+        - str: A 32 character hexadecimal digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def start_source(connection: sqlite3.Connection, path: str, source_hash: str) -> int | None:
+    """
+    Registers a corpus file before its sentences are added. If the file was indexed before with
+    different contents, its old sentences and mentions are deleted first.
+
+    Parameters:
+        - connection (sqlite3.Connection): Connection from open_entity_index().
+        - path (str): Path of the corpus file, which identifies it in the index.
+        - source_hash (str): Hash of the file's contents, from file_hash().
+
+    Returns:
+        - int | None: The id to add the file's sentences under, or None if the file is already
+        indexed with the same contents and nothing needs adding.
+    """
+    row = connection.execute("SELECT id, hash FROM sources WHERE path = ?", (path,)).fetchone()
+    if row is not None:
+        if row["hash"] == source_hash:
+            return None
+        connection.execute(
+            "DELETE FROM mentions WHERE sentence_id IN (SELECT id FROM sentences WHERE source_id = ?)", (row["id"],)
+        )
+        connection.execute("DELETE FROM sentences WHERE source_id = ?", (row["id"],))
+        connection.execute("UPDATE sources SET hash = ? WHERE id = ?", (source_hash, row["id"]))
+        return row["id"]
+    return connection.execute("INSERT INTO sources (path, hash) VALUES (?, ?)", (path, source_hash)).lastrowid
+
+
+def add_sentence(connection: sqlite3.Connection, source_id: int, position: int, analysis: dict) -> None:
+    """
+    Adds one analysed sentence and its entity mentions to the index. Changes are written when the
+    connection is committed, so a whole corpus file is added in one transaction.
+
+    Parameters:
+        - connection (sqlite3.Connection): Connection from open_entity_index().
+        - source_id (int): Id of the corpus file, from start_source().
+        - position (int): Position of the sentence in the corpus file, counting from 0.
+        - analysis (dict): The sentence's analysis from garden.analyse_doc().
+
+    Returns:
+        - No return value.
+    """
+    sentence_id = connection.execute(
+        "INSERT INTO sentences (source_id, position, text) VALUES (?, ?, ?)",
+        (source_id, position, analysis["text"]),
+    ).lastrowid
+    connection.executemany(
+        "INSERT INTO mentions (sentence_id, text, label, start_char, end_char) VALUES (?, ?, ?, ?, ?)",
+        [(sentence_id, *entity) for entity in analysis["entities"]],
+    )
+
+
+def find_mentions(connection: sqlite3.Connection, text: str | None = None, label: str | None = None) -> list[dict]:
+    """
+    Finds entity mentions by their text, their label, or both, e.g. all ORG mentions of Amazon.
+
+    Parameters:
+        - connection (sqlite3.Connection): Connection from open_entity_index().
+        - text (str | None): Exact text of the entity, or None for any.
+        - label (str | None): Entity label code, e.g. "ORG", or None for any.
+
+    Returns:
+        - list[dict]: One dict per mention, with the corpus file ("source"), the sentence's
+        "sentence_id", "position" and text ("sentence"), and the mention's "text", "label",
+        "start_char" and "end_char", in corpus order.
+
+    Example:
+        >>> find_mentions(connection, text="Amazon", label="ORG")
+        [{'source': 'sentences.txt', 'sentence_id': 9, 'position': 8, 'sentence': 'The Amazon that explorers discovered is vast.', 'text': 'Amazon', 'label': 'ORG', 'start_char': 4, 'end_char': 10}]
+    """
+    conditions = []
+    parameters = []
+    if text is not None:
+        conditions.append("mentions.text = ?")
+        parameters.append(text)
+    if label is not None:
+        conditions.append("mentions.label = ?")
+        parameters.append(label)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    rows = connection.execute(
+        f"""
+        SELECT sources.path AS source, sentences.id AS sentence_id, sentences.position, sentences.text AS sentence,
+               mentions.text, mentions.label, mentions.start_char, mentions.end_char
+        FROM mentions
+        JOIN sentences ON sentences.id = mentions.sentence_id
+        JOIN sources ON sources.id = sentences.source_id
+        {where}
+        ORDER BY sentences.id, mentions.start_char
+        """,
+        parameters,
+    )
+    return [dict(row) for row in rows]
+
+
+def sentences_with_labels(connection: sqlite3.Connection, labels: list[str]) -> list[dict]:
+    """
+    Finds the sentences that mention an entity of every one of the given labels, e.g. sentences
+    containing both a GPE and a DATE.
+
+    Parameters:
+        - connection (sqlite3.Connection): Connection from open_entity_index().
+        - labels (list[str]): Entity label codes that must all appear in a sentence.
+
+    Returns:
+        - list[dict]: One dict per sentence, with its corpus file ("source"), "sentence_id",
+        "position" and "text", in corpus order.
+    """
+    labels = sorted(set(labels))
+    if not labels:
+        return []
+
+    placeholders = ", ".join("?" * len(labels))
+    rows = connection.execute(
+        f"""
+        SELECT sources.path AS source, sentences.id AS sentence_id, sentences.position, sentences.text
+        FROM sentences
+        JOIN sources ON sources.id = sentences.source_id
+        WHERE sentences.id IN (
+            SELECT sentence_id FROM mentions
+            WHERE label IN ({placeholders})
+            GROUP BY sentence_id
+            HAVING COUNT(DISTINCT label) = ?
+        )
+        ORDER BY sentences.id
+        """,
+        [*labels, len(labels)],
+    )
+    return [dict(row) for row in rows]
@@ -0,0 +1,273 @@
+# Array versions of the interest and mortgage calculators in capstone_finance_calculators.py, for pricing many quotes
+# at once. Every argument can be a single number or a NumPy array, and arrays of different shapes are broadcast
+# together, so e.g. a column of deposits against a row of rates gives a grid of every combination.
+# The edge cases the scalar functions handle one at a time (zero rates, zero terms) are handled with masks over the
+# whole array.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _results(columns: dict, as_frame: bool):
+    # One row per quote, or the arrays in their broadcast shape
+    if as_frame:
+        return pd.DataFrame({label: np.ravel(values) for label, values in columns.items()})
+    return columns
+
+
+def _whole_numbers(values, name: str) -> np.ndarray:
+    # Terms as int64, refusing fractions rather than truncating them, which would silently differ from the scalar
+    # functions (they work with a fractional term)
+    values = np.asarray(values, dtype=np.float64)
+    if not np.all(np.isfinite(values) & (values == np.floor(values))):
+        raise ValueError(f"{name} must be whole numbers")
+    return values.astype(np.int64)
+
+
+def interest_calculator_array(
+    deposit, annual_interest, years, compound_simple, as_frame: bool = True
+):
+    """
+    Calculate the interest and the total after simple or compound interest accrues, for arrays of
+    deposits, rates and terms, as interest_calculator() does for one deposit.
+
+    Parameters:
+        - deposit (float | np.ndarray): The principal amounts deposited.
+        - annual_interest (float | np.ndarray): The annual interest rates as percentages (e.g., 4
+        for 4%).
+        - years (int | np.ndarray): The numbers of years of interest accrual. Must be whole
+        numbers, or a ValueError is raised.
+        - compound_simple (str | np.ndarray): "s" for simple or "c" for compound interest, either for
+        every quote or per quote.
+        - as_frame (bool): Whether to return a DataFrame with one row per quote, or a dict of arrays
+        in the broadcast shape of the inputs. Defaults to True.
+
+    Returns:
+        - pd.DataFrame | dict: The inputs broadcast together, then the accrued interest and the total
+        including the deposit, under the same descriptive labels as interest_calculator().
+
+    Example:
+        >>> interest_calculator_array([1000, 2000], 5, 5, "s")
+           Deposit (£)  Annual Interest (%)  Investment Duration (years)  Accrued Interest (£)  Total incl. Deposit and Interest (£)
+        0       1000.0                  5.0                            5                 250.0                                 1250.0
+        1       2000.0                  5.0                            5                 500.0                                 2500.0
+    """
+    deposit, annual_interest, years, compound_simple = np.broadcast_arrays(
+        np.asarray(deposit, dtype=np.float64),
+        np.asarray(annual_interest, dtype=np.float64),
+        _whole_numbers(years, "years"),
+        np.asarray(compound_simple),
+    )
+    compound = compound_simple == "c"
+    if not np.all(compound | (compound_simple == "s")):
+        raise ValueError('compound_simple must be "s" for simple or "c" for compound interest')
+
+    annual_interest_percentage = annual_interest / 100
+    simple_total = deposit + deposit * annual_interest_percentage * years
+    compound_total = deposit * np.power(1 + annual_interest_percentage, years)
+    total = np.where(compound, compound_total, simple_total)
+    interest = np.where(compound, compound_total - deposit, deposit * annual_interest_percentage * years)
+
+    return _results(
+        {
+            "Deposit (£)": deposit,
+            "Annual Interest (%)": annual_interest,
+            "Investment Duration (years)": years,
+            "Accrued Interest (£)": interest,
+            "Total incl. Deposit and Interest (£)": total,
+        },
+        as_frame,
+    )
+
+
+def mortgage_payment_array(
+    present_dwelling_value,
+    annual_interest=0,
+    monthly_interest=0,
+    years_repaying=0,
+    months_repaying=0,
+    as_frame: bool = True,
+):
+    """
+    Calculate the monthly and total repayments for arrays of mortgages, as mortgage_payment() does
+    for one mortgage. A loan with no interest is repaid in equal parts of its value, and a loan with
+    no repayment months has repayments of 0.
+
+    Parameters:
+        - present_dwelling_value (float | np.ndarray): The current values of the properties.
+        - annual_interest (float | np.ndarray): The annual interest rates, as percentages. Used
+        where no monthly interest rate is given.
+        - monthly_interest (float | np.ndarray): The monthly interest rates, as percentages. Take
+        precedence over the annual interest rates where non-zero.
+        - years_repaying (int | np.ndarray): The numbers of full years over which the loans are
+        repaid.
+        - months_repaying (int | np.ndarray): The additional months over which the loans are
+        repaid, on top of the full years. Years and months must be whole numbers, or a ValueError
+        is raised.
+        - as_frame (bool): Whether to return a DataFrame with one row per mortgage, or a dict of
+        arrays in the broadcast shape of the inputs. Defaults to True.
+
+    Returns:
+        - pd.DataFrame | dict: The inputs broadcast together, then the monthly and total repayments,
+        under the same descriptive labels as mortgage_payment().
+
+    Example:
+        >>> mortgage_payment_array(1000, annual_interest=[0, 5], years_repaying=5)["Monthly Repayment (£)"]
+        0    16.666667
+        1    18.871234
+        Name: Monthly Repayment (£), dtype: float64
+    """
+    present_dwelling_value, annual_interest, monthly_interest, years_repaying, months_repaying = np.broadcast_arrays(
+        np.asarray(present_dwelling_value, dtype=np.float64),
+        np.asarray(annual_interest, dtype=np.float64),
+        np.asarray(monthly_interest, dtype=np.float64),
+        _whole_numbers(years_repaying, "years_repaying"),
+        _whole_numbers(months_repaying, "months_repaying"),
+    )
+
+    # Tally up the repayment months, and use the annual rate where no monthly rate is given, as the scalar function does
+    total_repayment_months = years_repaying * 12 + months_repaying
+    rate = np.where(monthly_interest == 0, annual_interest / 12, monthly_interest) / 100
+
+    # The repayment formula only applies where its denominator is non-zero: a zero rate (or one too small to change
+    # 1 + rate) is split evenly over the months instead, and a zero term repays nothing
+    denominator = 1 - np.power(1 + rate, -total_repayment_months.astype(np.float64))
+    formula = (total_repayment_months != 0) & (denominator != 0)
+    no_interest = (total_repayment_months != 0) & (denominator == 0)
+
+    monthly_repayment = np.zeros(rate.shape)
+    np.divide(rate * present_dwelling_value, denominator, out=monthly_repayment, where=formula)
+    np.divide(present_dwelling_value, total_repayment_months, out=monthly_repayment, where=no_interest)
+    total_repayment = monthly_repayment * total_repayment_months
+
+    return _results(
+        {
+            "Dwelling Value (£)": present_dwelling_value,
+            "Annual Interest (%)": annual_interest,
+            "Monthly Interest (%)": monthly_interest,
+            "Repayment Duration (years)": years_repaying,
+            "Repayment Duration (additional months)": months_repaying,
+            "Monthly Repayment (£)": monthly_repayment,
+            "Total Repayment (£)": total_repayment,
+        },
+        as_frame,
+    )
+
+
+def random_quotes(n: int, seed: int = 0) -> dict:
+    """
+    Generates random inputs for both calculators, for parity checks and benchmarks. About a tenth
+    of each input is set to zero, so the zero-rate, zero-term and zero-value edge cases are always
+    covered, alongside ordinary values.
+
+    Parameters:
+        - n (int): Number of quotes to generate.
+        - seed (int): Seed of the random generator, so the same quotes can be generated again.
+
+    Returns:
+        - dict: Arrays of length n of every argument of the two calculators, keyed by argument name.
+    """
+    rng = np.random.default_rng(seed)
+
+    def with_zeros(values):
+        return np.where(rng.random(n) < 0.1, 0, values)
+
+    return {
+        "deposit": with_zeros(np.round(rng.uniform(0, 1_000_000, n), 2)),
+        "present_dwelling_value": with_zeros(np.round(rng.uniform(0, 2_000_000, n), 2)),
+        "annual_interest": with_zeros(np.round(rng.uniform(0, 20, n), 2)),
+        "monthly_interest": np.where(rng.random(n) < 0.7, 0, np.round(rng.uniform(0, 2, n), 3)),
+        "years": with_zeros(rng.integers(0, 51, n)),
+        "months_repaying": with_zeros(rng.integers(0, 12, n)),
+        "compound_simple": np.where(rng.random(n) < 0.5, "s", "c"),
+    }
+
+
+def check_parity(n: int = 100_000, seed: int = 0) -> dict:
+    """
+    Compares the array calculators with the scalar ones on random quotes from random_quotes(),
+    including the zero-rate and zero-term edge cases, and times both.
+
+    NumPy's vectorised power function can round the last bit of a result differently from
+    math.pow(), and the mortgage formula's 1 - (1 + rate) ** -months magnifies that for small rates
+    and short terms, so results are compared to within a relative tolerance of 1e-9, and the
+    largest difference found is reported. Results that don't go through a power (simple interest,
+    zero rates, zero terms) match exactly.
+
+    Parameters:
+        - n (int): Number of quotes to compare.
+        - seed (int): Seed of the random quotes.
+
+    Returns:
+        - dict: Labelled results: the number of quotes, the number that don't match, the largest
+        relative difference, and the times and speedup of the array calculators over the scalar
+        ones.
+    """
+    # Imported here, as capstone_finance_calculators imports this module for its sensitivity grid
+    from capstone_finance_calculators import interest_calculator, mortgage_payment
+
+    quotes = random_quotes(n, seed)
+
+    started = time.perf_counter()
+    scalar_interest = np.array(
+        [
+            list(interest_calculator(float(d), float(r), int(y), str(c)).values())
+            for d, r, y, c in zip(quotes["deposit"], quotes["annual_interest"], quotes["years"], quotes["compound_simple"])
+        ]
+    )
+    scalar_mortgage = np.array(
+        [
+            list(mortgage_payment(float(p), float(a), float(m), int(y), int(mo)).values())
+            for p, a, m, y, mo in zip(
+                quotes["present_dwelling_value"],
+                quotes["annual_interest"],
+                quotes["monthly_interest"],
+                quotes["years"],
+                quotes["months_repaying"],
+            )
+        ]
+    )
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    array_interest = interest_calculator_array(
+        quotes["deposit"], quotes["annual_interest"], quotes["years"], quotes["compound_simple"], as_frame=False
+    )
+    array_mortgage = mortgage_payment_array(
+        quotes["present_dwelling_value"],
+        quotes["annual_interest"],
+        quotes["monthly_interest"],
+        quotes["years"],
+        quotes["months_repaying"],
+        as_frame=False,
+    )
+    array_seconds = time.perf_counter() - started
+
+    expected = np.concatenate([scalar_interest, scalar_mortgage], axis=1)
+    actual = np.stack(
+        [
+            array_interest["Accrued Interest (£)"],
+            array_interest["Total incl. Deposit and Interest (£)"],
+            array_mortgage["Monthly Repayment (£)"],
+            array_mortgage["Total Repayment (£)"],
+        ],
+        axis=1,
+    )
+    scale = np.maximum(np.abs(expected), np.finfo(np.float64).tiny)
+    relative_difference = np.abs(actual - expected) / scale
+
+    return {
+        "Quotes": n,
+        "Mismatches": int(np.sum(np.any(~np.isclose(actual, expected, rtol=1e-9, atol=0), axis=1))),
+        "Max relative difference": float(relative_difference.max(initial=0)),
+        "Scalar (s)": scalar_seconds,
+        "Array (s)": array_seconds,
+        "Speedup (x)": scalar_seconds / array_seconds,
+    }
+
+
+if __name__ == "__main__":
+    for label, value in check_parity().items():
+        print(f"{label}: {value}")
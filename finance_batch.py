@@ -0,0 +1,251 @@
+# Headless batch mode for the finance calculators, for recalculating many requests without the interactive prompts of
+# capstone_finance_calculators.py, e.g. nightly over a whole customer base:
+#   python finance_batch.py requests.csv results.csv
+# Requests are read from a CSV or JSONL file a chunk at a time, validated with the same rules as the prompts but over
+# whole columns at once, calculated with the array versions of the calculators, and appended to a CSV or JSONL
+# results file, so files of any size stream through in bounded memory.
+# With --exact-pence, amounts are calculated in whole pence by money.py instead of in floats, so each mortgage's
+# repayments add up to its total repayment exactly. This works through every month of each chunk's longest term, so it
+# is a hundred or more times slower than the default closed-form calculation (see money.benchmark_money()).
+
+import argparse
+import time
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from finance_arrays import interest_calculator_array, mortgage_payment_array
+from money import interest_calculator_pence, mortgage_payment_pence, to_pounds
+
+# Columns of a request. "type" is "s" for simple interest, "c" for compound interest or "m" for a mortgage payment.
+# "amount" is the deposit of an investment or the dwelling value of a mortgage, and "years" the investment duration or
+# the full years repaying. Only mortgages use "monthly_interest" and "months". Missing numeric columns and empty values
+# count as 0
+REQUEST_COLUMNS = ["type", "amount", "annual_interest", "monthly_interest", "years", "months"]
+NUMERIC_COLUMNS = REQUEST_COLUMNS[1:]
+# Largest amount in pounds, of a request or a result, and largest number of years, a request can have. Amounts up to
+# this are exact to the penny in float64, and stay far inside int64 in pence in --exact-pence mode
+MAX_AMOUNT = 1e13
+MAX_YEARS = 1000
+RESULT_COLUMNS = [
+    "Accrued Interest (£)",
+    "Total incl. Deposit and Interest (£)",
+    "Monthly Repayment (£)",
+    "Total Repayment (£)",
+    "Error",
+]
+
+
+def read_requests(input_path: str, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    Reads a file of calculation requests a chunk at a time.
+
+    Parameters:
+        - input_path (str): Path of a CSV file, or of a JSONL file (ending in ".jsonl") with one
+        request object per line.
+        - chunksize (int): Number of requests per chunk.
+
+    Yields:
+        - pd.DataFrame: The next chunk of requests, with any columns besides REQUEST_COLUMNS (e.g.
+        a customer id) kept as they are.
+    """
+    if input_path.endswith(".jsonl"):
+        yield from pd.read_json(input_path, lines=True, chunksize=chunksize, dtype=False)
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunksize, dtype={"type": str})
+
+
+def validate_requests(requests: pd.DataFrame) -> pd.Series:
+    """
+    Checks a chunk of requests against the rules gather_user_input_values() enforces on the prompts,
+    for every row at once: a known calculation type, finite numbers of 0 or above, whole numbers of
+    years and months, and fewer than 12 additional months. Amounts above MAX_AMOUNT, more than
+    MAX_YEARS years, and requests whose results would be above MAX_AMOUNT are also rejected.
+
+    Parameters:
+        - requests (pd.DataFrame): A chunk of requests, with the columns of REQUEST_COLUMNS.
+
+    Returns:
+        - pd.Series: The reason each request is invalid, or an empty string for valid requests.
+    """
+    numbers = requests[NUMERIC_COLUMNS].to_numpy(dtype=np.float64)
+    amounts = requests["amount"].to_numpy(dtype=np.float64)
+    years = requests["years"].to_numpy(dtype=np.float64)
+    months = requests["months"].to_numpy(dtype=np.float64)
+
+    # The first rule a request breaks is the one reported
+    conditions = [
+        ~requests["type"].isin(["s", "c", "m"]).to_numpy(),
+        ~np.isfinite(numbers).all(axis=1),
+        (numbers < 0).any(axis=1),
+        (years != np.floor(years)) | (months != np.floor(months)),
+        months >= 12,
+        (amounts > MAX_AMOUNT) | (years > MAX_YEARS),
+    ]
+    reasons = [
+        'type must be "s", "c" or "m"',
+        "amounts, rates and durations must be finite numbers",
+        "amounts, rates and durations must be 0 or above",
+        "years and months must be whole numbers",
+        "months must be less than 12",
+        f"amounts must be at most {MAX_AMOUNT:,.0f} and years at most {MAX_YEARS}",
+    ]
+
+    # Inputs in range can still give results too large to hold, such as compound interest at a high rate for many
+    # years, so work out the float results of the requests passing every other rule
+    passing = ~np.any(conditions, axis=0)
+    too_large = np.zeros(len(requests), dtype=bool)
+    investment = passing & requests["type"].isin(["s", "c"]).to_numpy()
+    mortgage = passing & (requests["type"] == "m").to_numpy()
+    with np.errstate(over="ignore", invalid="ignore"):
+        if investment.any():
+            totals = interest_calculator_array(
+                amounts[investment],
+                requests["annual_interest"].to_numpy(dtype=np.float64)[investment],
+                years[investment].astype(np.int64),
+                requests["type"].to_numpy()[investment],
+                as_frame=False,
+            )["Total incl. Deposit and Interest (£)"]
+            too_large[investment] = ~(totals <= MAX_AMOUNT)
+        if mortgage.any():
+            totals = mortgage_payment_array(
+                amounts[mortgage],
+                requests["annual_interest"].to_numpy(dtype=np.float64)[mortgage],
+                requests["monthly_interest"].to_numpy(dtype=np.float64)[mortgage],
+                years[mortgage].astype(np.int64),
+                months[mortgage].astype(np.int64),
+                as_frame=False,
+            )["Total Repayment (£)"]
+            too_large[mortgage] = ~(totals <= MAX_AMOUNT)
+    conditions.append(too_large)
+    reasons.append(f"results would be above {MAX_AMOUNT:,.0f}")
+
+    return pd.Series(np.select(conditions, reasons, default=""), index=requests.index)
+
+
+def calculate_requests(requests: pd.DataFrame, exact_pence: bool = False) -> pd.DataFrame:
+    """
+    Validates and calculates a chunk of requests, investments and mortgages together.
+
+    Parameters:
+        - requests (pd.DataFrame): A chunk of requests from read_requests().
+        - exact_pence (bool): Whether to calculate in whole pence with money.py, rounding each
+        period's interest to the penny, rather than in floats. Mortgages then also get a "Final
+        Repayment (£)" column, the last repayment, which with the monthly repayments adds up to
+        the total repayment exactly.
+
+    Returns:
+        - pd.DataFrame: The requests with the columns of RESULT_COLUMNS added. Results that don't
+        apply to a request's type, and all results of invalid requests, are left empty, and
+        "Error" holds the reason a request is invalid.
+    """
+    requests = requests.copy()
+    for column in NUMERIC_COLUMNS:
+        if column not in requests:
+            requests[column] = 0
+        # Empty values count as 0, but values that aren't numbers are kept as NaN to be rejected
+        requests[column] = pd.to_numeric(requests[column], errors="coerce").where(requests[column].notna(), 0)
+    requests["type"] = requests["type"].astype(str).str.strip().str.lower()
+
+    errors = validate_requests(requests)
+    valid = (errors == "").to_numpy()
+    result_columns = RESULT_COLUMNS[:-1] + (["Final Repayment (£)"] if exact_pence else [])
+    results = pd.DataFrame(np.nan, index=requests.index, columns=result_columns)
+
+    investment = valid & requests["type"].isin(["s", "c"]).to_numpy()
+    if investment.any():
+        rows = requests[investment]
+        arguments = (
+            rows["amount"].to_numpy(),
+            rows["annual_interest"].to_numpy(),
+            rows["years"].to_numpy(dtype=np.int64),
+            rows["type"].to_numpy(),
+        )
+        if exact_pence:
+            interest = interest_calculator_pence(*arguments)
+            results.loc[investment, "Accrued Interest (£)"] = to_pounds(interest["Accrued Interest (p)"])
+            results.loc[investment, "Total incl. Deposit and Interest (£)"] = to_pounds(
+                interest["Total incl. Deposit and Interest (p)"]
+            )
+        else:
+            interest = interest_calculator_array(*arguments, as_frame=False)
+            results.loc[investment, "Accrued Interest (£)"] = interest["Accrued Interest (£)"]
+            results.loc[investment, "Total incl. Deposit and Interest (£)"] = interest[
+                "Total incl. Deposit and Interest (£)"
+            ]
+
+    mortgage = valid & (requests["type"] == "m").to_numpy()
+    if mortgage.any():
+        rows = requests[mortgage]
+        arguments = (
+            rows["amount"].to_numpy(),
+            rows["annual_interest"].to_numpy(),
+            rows["monthly_interest"].to_numpy(),
+            rows["years"].to_numpy(dtype=np.int64),
+            rows["months"].to_numpy(dtype=np.int64),
+        )
+        if exact_pence:
+            repayments = mortgage_payment_pence(*arguments)
+            results.loc[mortgage, "Monthly Repayment (£)"] = to_pounds(repayments["Monthly Repayment (p)"])
+            results.loc[mortgage, "Total Repayment (£)"] = to_pounds(repayments["Total Repayment (p)"])
+            results.loc[mortgage, "Final Repayment (£)"] = to_pounds(repayments["Final Repayment (p)"])
+        else:
+            repayments = mortgage_payment_array(*arguments, as_frame=False)
+            results.loc[mortgage, "Monthly Repayment (£)"] = repayments["Monthly Repayment (£)"]
+            results.loc[mortgage, "Total Repayment (£)"] = repayments["Total Repayment (£)"]
+
+    results["Error"] = errors
+    return pd.concat([requests, results], axis=1)
+
+
+def run_batch(input_path: str, output_path: str, chunksize: int = 100_000, exact_pence: bool = False) -> dict:
+    """
+    Calculates every request in a file and streams the results to another, a chunk at a time.
+
+    Parameters:
+        - input_path (str): Path of the CSV or JSONL file of requests.
+        - output_path (str): Path of the results file to write. Written as JSONL if it ends in
+        ".jsonl", otherwise as CSV.
+        - chunksize (int): Number of requests read, calculated and written at a time.
+        - exact_pence (bool): Whether to calculate in whole pence, as for calculate_requests().
+
+    Returns:
+        - dict: Labelled counts of the requests read, calculated and rejected as invalid, and the
+        seconds taken.
+    """
+    started = time.perf_counter()
+    rows = 0
+    invalid = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as output:
+        for chunk in read_requests(input_path, chunksize):
+            results = calculate_requests(chunk, exact_pence)
+            if output_path.endswith(".jsonl"):
+                results.to_json(output, orient="records", lines=True, force_ascii=False)
+            else:
+                results.to_csv(output, header=rows == 0, index=False)
+            rows += len(results)
+            invalid += int((results["Error"] != "").sum())
+
+    return {
+        "Requests": rows,
+        "Calculated": rows - invalid,
+        "Invalid": invalid,
+        "Seconds": time.perf_counter() - started,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calculate a file of interest and mortgage requests without prompts.")
+    parser.add_argument("input", help="CSV or JSONL file of requests, with columns " + ", ".join(REQUEST_COLUMNS))
+    parser.add_argument("output", help="CSV or JSONL file to write the results to")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Requests processed at a time")
+    parser.add_argument("--exact-pence", action="store_true", help="Calculate in whole pence, so repayments reconcile exactly (month by month, 100x or more slower)")
+    args = parser.parse_args()
+
+    for label, value in run_batch(args.input, args.output, args.chunksize, args.exact_pence).items():
+        print(f"{label}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# Benchmark and parity suite for the finance kernels. The same maths is implemented several times over:
+#   - finance_calculators.py: investment_interest_calculator() and bond_home_loan_calculator(), with rates as fractions
+#     (0.05 for 5%), "S"/"C" for simple or compound interest, and mortgages over a number of months at a monthly rate
+#   - capstone_finance_calculators.py: interest_calculator() and mortgage_payment(), with rates as percentages, "s"/"c",
+#     and mortgages over years and months at an annual or monthly rate
+#   - finance_batch.py: calculate_requests(), the batch mode, over a DataFrame of requests
+#   - finance_arrays.py: interest_calculator_array() and mortgage_payment_array(), vectorised over NumPy arrays
+# Every kernel is run over the same generated quotes, converted to its conventions, and compared with
+# capstone_finance_calculators.py, and its calls per second are reported. Results can be saved and compared with a
+# previous run, to catch speed regressions. Each kernel is timed as the best of several repeats, each running it for at
+# least a minimum time, so a kernel taking milliseconds isn't judged on a single noisy measurement:
+#   python finance_benchmarks.py --save benchmarks.json
+#   python finance_benchmarks.py --baseline benchmarks.json
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from capstone_finance_calculators import interest_calculator, mortgage_payment
+from finance_arrays import interest_calculator_array, mortgage_payment_array, random_quotes
+from finance_batch import calculate_requests
+from finance_calculators import bond_home_loan_calculator, investment_interest_calculator
+
+# Relative tolerance of the parity checks. Vectorised powers can differ from math.pow() in the last bit, which the
+# mortgage formula magnifies for small rates and short terms (see finance_arrays.check_parity())
+RTOL = 1e-9
+
+# Quotes covering the edge cases by name: zero rates, zero terms, zero amounts and combinations of them
+EDGE_CASES = {
+    "deposit": [1000, 1000, 0, 0, 1000, 1000, 0.01],
+    "present_dwelling_value": [100_000, 100_000, 0, 0, 100_000, 100_000, 0.01],
+    "annual_interest": [0, 5, 5, 0, 0, 5, 0.01],
+    "monthly_interest": [0, 0, 0, 0, 0, 0, 0],
+    "years": [10, 0, 10, 0, 0, 0, 1],
+    "months_repaying": [0, 0, 0, 0, 7, 7, 0],
+    "compound_simple": ["s", "c", "c", "s", "c", "s", "c"],
+}
+
+
+def _quotes_frame(quotes: dict) -> pd.DataFrame:
+    # Quotes from random_quotes() or EDGE_CASES as arrays, with every mortgage on the annual rate, the one rate both
+    # calculator modules accept
+    quotes = {name: np.asarray(values) for name, values in quotes.items()}
+    quotes["monthly_interest"] = np.zeros(len(quotes["deposit"]))
+    return pd.DataFrame(quotes)
+
+
+def _reference(quotes: pd.DataFrame) -> dict:
+    # Totals and monthly repayments from capstone_finance_calculators.py, which every kernel is compared with
+    return {
+        "Total incl. Deposit and Interest (£)": np.array(
+            [
+                interest_calculator(float(d), float(r), int(y), str(c))["Total incl. Deposit and Interest (£)"]
+                for d, r, y, c in zip(quotes["deposit"], quotes["annual_interest"], quotes["years"], quotes["compound_simple"])
+            ]
+        ),
+        "Monthly Repayment (£)": np.array(
+            [
+                mortgage_payment(float(p), float(r), 0, int(y), int(m))["Monthly Repayment (£)"]
+                for p, r, y, m in zip(
+                    quotes["present_dwelling_value"], quotes["annual_interest"], quotes["years"], quotes["months_repaying"]
+                )
+            ]
+        ),
+    }
+
+
+def _finance_calculators_scalar(quotes: pd.DataFrame) -> dict:
+    # finance_calculators.py takes fractions, upper-case choices, and a monthly rate over a number of months
+    return {
+        "Total incl. Deposit and Interest (£)": np.array(
+            [
+                investment_interest_calculator(float(d), float(r) / 100, int(y), str(c).upper())
+                for d, r, y, c in zip(quotes["deposit"], quotes["annual_interest"], quotes["years"], quotes["compound_simple"])
+            ]
+        ),
+        "Monthly Repayment (£)": np.array(
+            [
+                bond_home_loan_calculator(float(p), float(r) / 1200, int(y) * 12 + int(m))
+                for p, r, y, m in zip(
+                    quotes["present_dwelling_value"], quotes["annual_interest"], quotes["years"], quotes["months_repaying"]
+                )
+            ]
+        ),
+    }
+
+
+def _batched(quotes: pd.DataFrame) -> dict:
+    # finance_batch.py takes one request per row, so each quote becomes an investment request and a mortgage request
+    investments = pd.DataFrame(
+        {
+            "type": quotes["compound_simple"],
+            "amount": quotes["deposit"],
+            "annual_interest": quotes["annual_interest"],
+            "years": quotes["years"],
+        }
+    )
+    mortgages = pd.DataFrame(
+        {
+            "type": "m",
+            "amount": quotes["present_dwelling_value"],
+            "annual_interest": quotes["annual_interest"],
+            "years": quotes["years"],
+            "months": quotes["months_repaying"],
+        }
+    )
+    return {
+        "Total incl. Deposit and Interest (£)": calculate_requests(investments)[
+            "Total incl. Deposit and Interest (£)"
+        ].to_numpy(),
+        "Monthly Repayment (£)": calculate_requests(mortgages)["Monthly Repayment (£)"].to_numpy(),
+    }
+
+
+def _vectorised(quotes: pd.DataFrame) -> dict:
+    return {
+        "Total incl. Deposit and Interest (£)": interest_calculator_array(
+            quotes["deposit"].to_numpy(),
+            quotes["annual_interest"].to_numpy(),
+            quotes["years"].to_numpy(),
+            quotes["compound_simple"].to_numpy(),
+            as_frame=False,
+        )["Total incl. Deposit and Interest (£)"],
+        "Monthly Repayment (£)": mortgage_payment_array(
+            quotes["present_dwelling_value"].to_numpy(),
+            quotes["annual_interest"].to_numpy(),
+            0,
+            quotes["years"].to_numpy(),
+            quotes["months_repaying"].to_numpy(),
+            as_frame=False,
+        )["Monthly Repayment (£)"],
+    }
+
+
+# Kernels under test, by name, each taking a frame of quotes and returning totals and monthly repayments
+KERNELS = {
+    "capstone scalar": _reference,
+    "finance_calculators scalar": _finance_calculators_scalar,
+    "finance_batch batched": _batched,
+    "finance_arrays vectorised": _vectorised,
+}
+
+
+def _compare(actual: dict, expected: dict) -> tuple:
+    # Number of quotes whose results don't match within RTOL, and the largest relative difference
+    mismatches = np.zeros(len(expected["Monthly Repayment (£)"]), dtype=bool)
+    largest = 0.0
+    for label, values in expected.items():
+        mismatches |= ~np.isclose(actual[label], values, rtol=RTOL, atol=0)
+        scale = np.maximum(np.abs(values), np.finfo(np.float64).tiny)
+        largest = max(largest, float((np.abs(actual[label] - values) / scale).max(initial=0)))
+    return int(mismatches.sum()), largest
+
+
+def _time_kernel(kernel, quotes: pd.DataFrame, repeats: int, min_seconds: float) -> tuple:
+    # Results of a kernel and its best seconds per run, as timeit.Timer.repeat() would measure it: the number of runs
+    # per repeat is doubled until a repeat takes at least min_seconds, and the fastest of the repeats is kept. The
+    # first run, which also warms up caches and lazy imports, only sets the number of runs
+    started = time.perf_counter()
+    results = kernel(quotes)
+    seconds = max(time.perf_counter() - started, 1e-9)
+    runs = 1
+    while seconds * runs < min_seconds:
+        runs *= 2
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(runs):
+            kernel(quotes)
+        best = min(best, (time.perf_counter() - started) / runs)
+    return results, best
+
+
+def run_benchmarks(n: int = 200_000, seed: int = 0, repeats: int = 5, min_seconds: float = 0.2) -> pd.DataFrame:
+    """
+    Runs every kernel in KERNELS over n random quotes from random_quotes(), and over EDGE_CASES,
+    checks its results against capstone_finance_calculators.py, and times it.
+
+    Parameters:
+        - n (int): Number of random quotes. Each quote is one investment and one mortgage, so each
+        kernel makes 2n calculations.
+        - seed (int): Seed of the random quotes.
+        - repeats (int): Number of times each kernel is timed, of which the fastest is kept.
+        - min_seconds (float): Shortest time each repeat runs a kernel for, running it several
+        times over if it is quicker, so short timings aren't dominated by noise.
+
+    Returns:
+        - pd.DataFrame: One row per kernel, with the calculations per second, the best seconds per
+        run, the quotes that don't match within RTOL among the random quotes and among the edge
+        cases, and the largest relative difference found.
+    """
+    quotes = _quotes_frame(random_quotes(n, seed))
+    edge_cases = _quotes_frame(EDGE_CASES)
+    expected = _reference(quotes)
+    expected_edge_cases = _reference(edge_cases)
+
+    rows = []
+    for name, kernel in KERNELS.items():
+        actual, seconds = _time_kernel(kernel, quotes, repeats, min_seconds)
+        mismatches, largest = _compare(actual, expected)
+        edge_case_mismatches, edge_case_largest = _compare(kernel(edge_cases), expected_edge_cases)
+        rows.append(
+            {
+                "Kernel": name,
+                "Calls/s": 2 * n / seconds,
+                "Seconds": seconds,
+                "Mismatches": mismatches,
+                "Edge case mismatches": edge_case_mismatches,
+                "Max relative difference": max(largest, edge_case_largest),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def compare_with_baseline(results: pd.DataFrame, baseline_path: str, slowdown: float = 0.2) -> pd.DataFrame:
+    """
+    Compares the speed of each kernel with a previous run saved with --save.
+
+    Parameters:
+        - results (pd.DataFrame): Results of run_benchmarks().
+        - baseline_path (str): JSON file of an earlier run's results.
+        - slowdown (float): Fraction of the baseline's calls per second a kernel may lose before it
+        counts as a regression.
+
+    Returns:
+        - pd.DataFrame: The results with the baseline's calls per second, the change as a
+        percentage, and whether the kernel has regressed.
+    """
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = pd.DataFrame(json.load(file))[["Kernel", "Calls/s"]]
+    compared = results.merge(baseline, on="Kernel", how="left", suffixes=("", " (baseline)"))
+    compared["Change (%)"] = (compared["Calls/s"] / compared["Calls/s (baseline)"] - 1) * 100
+    compared["Regressed"] = compared["Calls/s"] < compared["Calls/s (baseline)"] * (1 - slowdown)
+    return compared
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the finance kernels and check they agree.")
+    parser.add_argument("--n", type=int, default=200_000, help="Number of random quotes")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random quotes")
+    parser.add_argument("--repeats", type=int, default=5, help="Times each kernel is timed, of which the fastest is kept")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="Shortest time each timing runs a kernel for")
+    parser.add_argument("--save", help="Save the results to this JSON file, as a baseline for later runs")
+    parser.add_argument("--baseline", help="Compare speeds with the results saved in this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.n, args.seed, args.repeats, args.min_seconds)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results.to_dict(orient="records"), file, indent=2)
+    if args.baseline:
+        results = compare_with_baseline(results, args.baseline)
+
+    print(results.to_string(index=False))
+    # A non-zero exit status lets a scheduled job flag a failed check
+    failed = (results["Mismatches"] > 0) | (results["Edge case mismatches"] > 0)
+    if "Regressed" in results:
+        failed |= results["Regressed"]
+    raise SystemExit(int(failed.any()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+# Inverse versions of the calculators in capstone_finance_calculators.py, for the questions users ask the other way
+# round: "what can I borrow for £X a month", "what rate is this repayment charging", "how long until my deposit reaches
+# £Y". Like finance_arrays.py, every argument can be a single number or a NumPy array, broadcast together, so whole
+# arrays of targets are solved at once.
+# Everything with a closed form is solved directly. The interest rate of a mortgage has none, so it is found with
+# Newton's method, falling back to bisection for any step that would leave the interval known to hold the rate.
+
+import time
+
+import numpy as np
+
+from finance_arrays import _results, _whole_numbers, interest_calculator_array, mortgage_payment_array
+
+
+def _monthly_rate(annual_interest, monthly_interest):
+    # Monthly rate as a fraction, from the annual rate where no monthly rate is given, as mortgage_payment() does
+    return np.where(monthly_interest == 0, annual_interest / 12, monthly_interest) / 100
+
+
+def affordable_dwelling_value(
+    monthly_repayment,
+    annual_interest=0,
+    monthly_interest=0,
+    years_repaying=0,
+    months_repaying=0,
+    as_frame: bool = True,
+):
+    """
+    Calculate the largest mortgage a monthly repayment pays off over a term: the inverse of
+    mortgage_payment() for the dwelling value.
+
+    Parameters:
+        - monthly_repayment (float | np.ndarray): The monthly repayments that can be afforded.
+        - annual_interest (float | np.ndarray): The annual interest rates, as percentages. Used
+        where no monthly interest rate is given.
+        - monthly_interest (float | np.ndarray): The monthly interest rates, as percentages. Take
+        precedence over the annual interest rates where non-zero.
+        - years_repaying (int | np.ndarray): The numbers of full years of repayments.
+        - months_repaying (int | np.ndarray): The additional months of repayments, on top of the
+        full years. Years and months must be whole numbers, or a ValueError is raised.
+        - as_frame (bool): Whether to return a DataFrame with one row per mortgage, or a dict of
+        arrays in the broadcast shape of the inputs. Defaults to True.
+
+    Returns:
+        - pd.DataFrame | dict: The inputs broadcast together, then the affordable dwelling value and
+        the total repayment.
+
+    Example:
+        >>> affordable_dwelling_value(18.871234, 5, 0, 5)["Dwelling Value (£)"]
+        0    1000.000019
+        Name: Dwelling Value (£), dtype: float64
+    """
+    monthly_repayment, annual_interest, monthly_interest, years_repaying, months_repaying = np.broadcast_arrays(
+        np.asarray(monthly_repayment, dtype=np.float64),
+        np.asarray(annual_interest, dtype=np.float64),
+        np.asarray(monthly_interest, dtype=np.float64),
+        _whole_numbers(years_repaying, "years_repaying"),
+        _whole_numbers(months_repaying, "months_repaying"),
+    )
+    total_repayment_months = years_repaying * 12 + months_repaying
+    rate = _monthly_rate(annual_interest, monthly_interest)
+
+    # The present value of the repayments, A (1 - (1 + r)^-n) / r, which is A n without interest, as in
+    # mortgage_payment_array()
+    denominator = 1 - np.power(1 + rate, -total_repayment_months.astype(np.float64))
+    dwelling_value = np.array(monthly_repayment * total_repayment_months)
+    np.divide(monthly_repayment * denominator, rate, out=dwelling_value, where=denominator != 0)
+
+    return _results(
+        {
+            "Monthly Repayment (£)": monthly_repayment,
+            "Annual Interest (%)": annual_interest,
+            "Monthly Interest (%)": monthly_interest,
+            "Repayment Duration (years)": years_repaying,
+            "Repayment Duration (additional months)": months_repaying,
+            "Dwelling Value (£)": dwelling_value,
+            "Total Repayment (£)": monthly_repayment * total_repayment_months,
+        },
+        as_frame,
+    )
+
+
+def required_mortgage_rate(
+    present_dwelling_value,
+    monthly_repayment,
+    years_repaying=0,
+    months_repaying=0,
+    tolerance: float = 1e-12,
+    max_iterations: int = 100,
+    as_frame: bool = True,
+):
+    """
+    Find the interest rate at which a monthly repayment pays off a mortgage over a term: the
+    inverse of mortgage_payment() for the rate.
+
+    The repayment rises with the rate, from the interest-free repayment at a rate of 0 to above
+    the dwelling value times the rate, so the monthly rate lies between 0 and the repayment over
+    the dwelling value. Newton's method is run on every mortgage at once from an estimate inside
+    that interval, narrowing the interval as it goes, and bisecting it instead of any Newton step
+    that would land outside it, until every step is below the tolerance.
+
+    Parameters:
+        - present_dwelling_value (float | np.ndarray): The values borrowed.
+        - monthly_repayment (float | np.ndarray): The monthly repayments.
+        - years_repaying (int | np.ndarray): The numbers of full years of repayments.
+        - months_repaying (int | np.ndarray): The additional months of repayments, on top of the
+        full years. Years and months must be whole numbers, or a ValueError is raised.
+        - tolerance (float): Largest change of the monthly rate, as a fraction, at which a rate
+        counts as found.
+        - max_iterations (int): Most steps to take before giving up on the rates not yet found,
+        which are returned as NaN.
+        - as_frame (bool): Whether to return a DataFrame with one row per mortgage, or a dict of
+        arrays in the broadcast shape of the inputs. Defaults to True.
+
+    Returns:
+        - pd.DataFrame | dict: The inputs broadcast together, then the monthly interest rate and
+        the annual rate (12 times the monthly rate, as gather_user_input_values() converts them),
+        both as percentages. Repayments too small to pay off the loan without interest, or a term
+        of 0, have no rate and give NaN.
+
+    Example:
+        >>> required_mortgage_rate(1000, 18.871234, 5)["Annual Interest (%)"]
+        0    5.000001
+        Name: Annual Interest (%), dtype: float64
+    """
+    present_dwelling_value, monthly_repayment, years_repaying, months_repaying = np.broadcast_arrays(
+        np.asarray(present_dwelling_value, dtype=np.float64),
+        np.asarray(monthly_repayment, dtype=np.float64),
+        _whole_numbers(years_repaying, "years_repaying"),
+        _whole_numbers(months_repaying, "months_repaying"),
+    )
+    months = (years_repaying * 12 + months_repaying).astype(np.float64)
+    rate = np.full(months.shape, np.nan)
+
+    # An interest-free loan is repaid in equal parts, so a repayment of exactly that is a rate of 0, and less is none
+    with np.errstate(divide="ignore", invalid="ignore"):
+        interest_free_repayment = present_dwelling_value / months
+    solvable = (months > 0) & (present_dwelling_value > 0) & (monthly_repayment >= interest_free_repayment)
+    rate[solvable & (monthly_repayment == interest_free_repayment)] = 0
+    unsolved = np.flatnonzero(solvable & (monthly_repayment > interest_free_repayment))
+
+    value = present_dwelling_value.ravel()[unsolved]
+    repayment = monthly_repayment.ravel()[unsolved]
+    n = months.ravel()[unsolved]
+    low = np.zeros(len(unsolved))
+    high = repayment / value
+    # Near 0 the repayment grows as P/n + P r (n + 1) / 2n, which is a close first estimate for ordinary rates
+    guess = np.clip(2 * (repayment - value / n) / (value * (n + 1) / n), 0, high)
+    guess = np.where(guess > 0, guess, high / 2)
+
+    for _ in range(max_iterations):
+        if not len(unsolved):
+            break
+        # Repayment at the current estimate, with (1 + r)^-n from log1p and expm1 to stay accurate for small rates
+        discount = -np.expm1(-n * np.log1p(guess))
+        error = value * guess / discount - repayment
+        slope = value * (discount - guess * n * np.exp(-(n + 1) * np.log1p(guess))) / discount**2
+
+        # The repayment rises with the rate, so the sign of the error says which side of the estimate the rate is on
+        low = np.where(error < 0, guess, low)
+        high = np.where(error > 0, guess, high)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = guess - error / slope
+        step = np.where((newton > low) & (newton < high), newton, (low + high) / 2)
+
+        converged = (np.abs(step - guess) <= tolerance) | (error == 0)
+        rate.ravel()[unsolved[converged]] = np.where(error == 0, guess, step)[converged]
+
+        keep = ~converged
+        unsolved, value, repayment, n = unsolved[keep], value[keep], repayment[keep], n[keep]
+        low, high, guess = low[keep], high[keep], step[keep]
+
+    monthly_interest = rate * 100
+    return _results(
+        {
+            "Dwelling Value (£)": present_dwelling_value,
+            "Monthly Repayment (£)": monthly_repayment,
+            "Repayment Duration (years)": years_repaying,
+            "Repayment Duration (additional months)": months_repaying,
+            "Annual Interest (%)": monthly_interest * 12,
+            "Monthly Interest (%)": monthly_interest,
+        },
+        as_frame,
+    )
+
+
+def required_mortgage_term(
+    present_dwelling_value,
+    monthly_repayment,
+    annual_interest=0,
+    monthly_interest=0,
+    as_frame: bool = True,
+):
+    """
+    Calculate how long a monthly repayment takes to pay off a mortgage, from the closed form
+    n = -log(1 - r P / A) / log(1 + r), or P / A without interest. The term is rounded up to whole
+    months, so the last repayment may be smaller than the others.
+
+    Parameters:
+        - present_dwelling_value (float | np.ndarray): The values borrowed.
+        - monthly_repayment (float | np.ndarray): The monthly repayments.
+        - annual_interest (float | np.ndarray): The annual interest rates, as percentages. Used
+        where no monthly interest rate is given.
+        - monthly_interest (float | np.ndarray): The monthly interest rates, as percentages. Take
+        precedence over the annual interest rates where non-zero.
+        - as_frame (bool): Whether to return a DataFrame with one row per mortgage, or a dict of
+        arrays in the broadcast shape of the inputs. Defaults to True.
+
+    Returns:
+        - pd.DataFrame | dict: The inputs broadcast together, then the term as full years and
+        additional months, under the labels of mortgage_payment()'s inputs. Repayments that never
+        pay off the loan, because they don't cover the interest, give NaN.
+
+    Example:
+        >>> required_mortgage_term(1000, 18.88, 5)[["Repayment Duration (years)", "Repayment Duration (additional months)"]]
+           Repayment Duration (years)  Repayment Duration (additional months)
+        0                         5.0                                     0.0
+    """
+    present_dwelling_value, monthly_repayment, annual_interest, monthly_interest = np.broadcast_arrays(
+        np.asarray(present_dwelling_value, dtype=np.float64),
+        np.asarray(monthly_repayment, dtype=np.float64),
+        np.asarray(annual_interest, dtype=np.float64),
+        np.asarray(monthly_interest, dtype=np.float64),
+    )
+    rate = _monthly_rate(annual_interest, monthly_interest)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Share of each repayment that goes on interest in the first month. At 1 or more the balance never falls
+        interest_share = rate * present_dwelling_value / monthly_repayment
+        months = np.where(
+            rate == 0,
+            present_dwelling_value / monthly_repayment,
+            -np.log1p(-interest_share) / np.log1p(rate),
+        )
+    months = np.where((present_dwelling_value == 0) | (monthly_repayment > 0) & (interest_share < 1), months, np.nan)
+    months = np.where(present_dwelling_value == 0, 0, months)
+    # Round up to whole months. The logarithms lose a few digits for small rates, so a term within a millionth of a month
+    # of a whole number is taken to be that number
+    months = np.array(np.ceil(months - 1e-6))
+
+    return _results(
+        {
+            "Dwelling Value (£)": present_dwelling_value,
+            "Monthly Repayment (£)": monthly_repayment,
+            "Annual Interest (%)": annual_interest,
+            "Monthly Interest (%)": monthly_interest,
+            "Repayment Duration (years)": months // 12,
+            "Repayment Duration (additional months)": months % 12,
+        },
+        as_frame,
+    )
+
+
+def required_investment_rate(deposit, target_total, years, compound_simple, as_frame: bool = True):
+    """
+    Calculate the annual interest rate at which a deposit grows to a target total over a number of
+    years: the inverse of interest_calculator() for the rate, in closed form.
+
+    Parameters:
+        - deposit (float | np.ndarray): The principal amounts deposited.
+        - target_total (float | np.ndarray): The totals, including the deposit, to reach.
+        - years (int | np.ndarray): The numbers of years of interest accrual. Must be whole
+        numbers, or a ValueError is raised.
+        - compound_simple (str | np.ndarray): "s" for simple or "c" for compound interest, either for
+        every quote or per quote.
+        - as_frame (bool): Whether to return a DataFrame with one row per quote, or a dict of arrays
+        in the broadcast shape of the inputs. Defaults to True.
+
+    Returns:
+        - pd.DataFrame | dict: The inputs broadcast together, then the annual interest rate as a
+        percentage. Targets below the deposit need a negative rate, which is returned as it is.
+        A deposit or term of 0 gives NaN, unless the target is the deposit, which gives 0.
+
+    Example:
+        >>> required_investment_rate(1000, 1250, 5, ["s", "c"])["Annual Interest (%)"]
+        0    5.000000
+        1    4.563955
+        Name: Annual Interest (%), dtype: float64
+    """
+    deposit, target_total, years, compound_simple = np.broadcast_arrays(
+        np.asarray(deposit, dtype=np.float64),
+        np.asarray(target_total, dtype=np.float64),
+        _whole_numbers(years, "years"),
+        np.asarray(compound_simple),
+    )
+    compound = compound_simple == "c"
+    if not np.all(compound | (compound_simple == "s")):
+        raise ValueError('compound_simple must be "s" for simple or "c" for compound interest')
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = target_total / deposit
+        rate = np.where(compound, np.expm1(np.log(growth) / years), (growth - 1) / years)
+    rate = np.where((deposit > 0) & (years > 0), rate, np.where(target_total == deposit, 0, np.nan))
+
+    return _results(
+        {
+            "Deposit (£)": deposit,
+            "Total incl. Deposit and Interest (£)": target_total,
+            "Investment Duration (years)": years,
+            "Annual Interest (%)": rate * 100,
+        },
+        as_frame,
+    )
+
+
+def required_investment_term(deposit, target_total, annual_interest, compound_simple, as_frame: bool = True):
+    """
+    Calculate how many whole years a deposit takes to grow to at least a target total: the inverse
+    of interest_calculator() for the term, in closed form.
+
+    Parameters:
+        - deposit (float | np.ndarray): The principal amounts deposited.
+        - target_total (float | np.ndarray): The totals, including the deposit, to reach.
+        - annual_interest (float | np.ndarray): The annual interest rates as percentages.
+        - compound_simple (str | np.ndarray): "s" for simple or "c" for compound interest, either for
+        every quote or per quote.
+        - as_frame (bool): Whether to return a DataFrame with one row per quote, or a dict of arrays
+        in the broadcast shape of the inputs. Defaults to True.
+
+    Returns:
+        - pd.DataFrame | dict: The inputs broadcast together, then the number of years, and the
+        total reached after them as interest_calculator() calculates it. Targets that are never
+        reached, without interest or from a deposit of 0, give NaN.
+
+    Example:
+        >>> required_investment_term(1000, 2000, 5, ["s", "c"])["Investment Duration (years)"]
+        0    20.0
+        1    15.0
+        Name: Investment Duration (years), dtype: float64
+    """
+    deposit, target_total, annual_interest, compound_simple = np.broadcast_arrays(
+        np.asarray(deposit, dtype=np.float64),
+        np.asarray(target_total, dtype=np.float64),
+        np.asarray(annual_interest, dtype=np.float64),
+        np.asarray(compound_simple),
+    )
+    compound = compound_simple == "c"
+    if not np.all(compound | (compound_simple == "s")):
+        raise ValueError('compound_simple must be "s" for simple or "c" for compound interest')
+
+    rate = annual_interest / 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = target_total / deposit
+        years = np.where(compound, np.log(growth) / np.log1p(rate), (growth - 1) / rate)
+    years = np.where(target_total <= deposit, 0, np.where((deposit > 0) & (rate > 0), np.ceil(years), np.nan))
+
+    # The logarithms can land a hair either side of a whole number of years, so check the years against the forward
+    # calculation and move by a year where it disagrees
+    reachable = np.isfinite(years)
+    whole_years = np.where(reachable, years, 0).astype(np.int64)
+    forward = interest_calculator_array(deposit, annual_interest, whole_years, compound_simple, as_frame=False)
+    short = reachable & (forward["Total incl. Deposit and Interest (£)"] < target_total)
+    earlier = interest_calculator_array(
+        deposit, annual_interest, np.maximum(whole_years - 1, 0), compound_simple, as_frame=False
+    )
+    early = reachable & (whole_years > 0) & (earlier["Total incl. Deposit and Interest (£)"] >= target_total)
+    years = years + short - early
+    total = np.where(
+        short,
+        interest_calculator_array(deposit, annual_interest, whole_years + 1, compound_simple, as_frame=False)[
+            "Total incl. Deposit and Interest (£)"
+        ],
+        np.where(early, earlier["Total incl. Deposit and Interest (£)"], forward["Total incl. Deposit and Interest (£)"]),
+    )
+
+    return _results(
+        {
+            "Deposit (£)": deposit,
+            "Annual Interest (%)": annual_interest,
+            "Target Total (£)": target_total,
+            "Investment Duration (years)": years,
+            "Total incl. Deposit and Interest (£)": np.where(reachable, total, np.nan),
+        },
+        as_frame,
+    )
+
+
+def check_solvers(n: int = 1_000_000, seed: int = 0) -> dict:
+    """
+    Checks each solver against the forward calculator it inverts, on random quotes, and times it.
+    Solved values are put back through mortgage_payment_array() or interest_calculator_array(),
+    which should give back the targets they were solved for.
+
+    Parameters:
+        - n (int): Number of quotes to solve for with each solver.
+        - seed (int): Seed of the random quotes.
+
+    Returns:
+        - dict: Labelled results: the largest relative error of each solver's round trip, the
+        number of investment terms that aren't the shortest reaching their target, and the number
+        of quotes each solver solves per second.
+    """
+    rng = np.random.default_rng(seed)
+    value = np.round(rng.uniform(10_000, 2_000_000, n), 2)
+    annual_interest = np.round(rng.uniform(0, 15, n), 2)
+    years = rng.integers(1, 41, n)
+    months = rng.integers(0, 12, n)
+    compound_simple = np.where(rng.random(n) < 0.5, "s", "c")
+    repayment = mortgage_payment_array(value, annual_interest, 0, years, months, as_frame=False)[
+        "Monthly Repayment (£)"
+    ]
+
+    def relative_error(actual, expected):
+        return float(np.max(np.abs(actual - expected) / np.abs(expected)))
+
+    results = {"Quotes": n}
+    seconds = {}
+
+    started = time.perf_counter()
+    price = affordable_dwelling_value(repayment, annual_interest, 0, years, months, as_frame=False)
+    seconds["Affordable value"] = time.perf_counter() - started
+    results["Affordable value max relative error"] = relative_error(price["Dwelling Value (£)"], value)
+
+    started = time.perf_counter()
+    rate = required_mortgage_rate(value, repayment, years, months, as_frame=False)
+    seconds["Mortgage rate"] = time.perf_counter() - started
+    round_trip = mortgage_payment_array(value, rate["Annual Interest (%)"], 0, years, months, as_frame=False)
+    results["Mortgage rate max relative error"] = relative_error(round_trip["Monthly Repayment (£)"], repayment)
+
+    started = time.perf_counter()
+    term = required_mortgage_term(value, repayment, annual_interest, as_frame=False)
+    seconds["Mortgage term"] = time.perf_counter() - started
+    term_months = term["Repayment Duration (years)"] * 12 + term["Repayment Duration (additional months)"]
+    results["Mortgage terms wrong"] = int(np.sum(term_months != years * 12 + months))
+
+    # Targets from the forward calculation, so every investment has a known rate and term to find
+    deposit = value / 10
+    total = interest_calculator_array(deposit, annual_interest, years, compound_simple, as_frame=False)[
+        "Total incl. Deposit and Interest (£)"
+    ]
+
+    started = time.perf_counter()
+    investment_rate = required_investment_rate(deposit, total, years, compound_simple, as_frame=False)
+    seconds["Investment rate"] = time.perf_counter() - started
+    round_trip = interest_calculator_array(
+        deposit, investment_rate["Annual Interest (%)"], years, compound_simple, as_frame=False
+    )
+    results["Investment rate max relative error"] = relative_error(
+        round_trip["Total incl. Deposit and Interest (£)"], total
+    )
+
+    started = time.perf_counter()
+    investment_term = required_investment_term(deposit, total * 0.999, annual_interest, compound_simple, as_frame=False)
+    seconds["Investment term"] = time.perf_counter() - started
+    solved_years = investment_term["Investment Duration (years)"]
+    reachable = annual_interest > 0
+    previous_years = np.maximum(np.nan_to_num(solved_years).astype(np.int64) - 1, 0)
+    earlier = interest_calculator_array(deposit, annual_interest, previous_years, compound_simple, as_frame=False)[
+        "Total incl. Deposit and Interest (£)"
+    ]
+    results["Investment terms not shortest"] = int(
+        np.sum(
+            reachable
+            & (
+                (investment_term["Total incl. Deposit and Interest (£)"] < total * 0.999)
+                | (solved_years > 0) & (earlier >= total * 0.999)
+            )
+        )
+    )
+
+    for label, taken in seconds.items():
+        results[f"{label} (solves/s)"] = n / taken
+    return results
+
+
+if __name__ == "__main__":
+    for label, value in check_solvers().items():
+        print(f"{label}: {value}")
@@ -6,8 +6,22 @@
 
 # A named entity is a “real-world object” that’s assigned a name – for example, a person, a country, a product or a book title. It is possible that a sentence contains zero named entities.
 
-import spacy 
-nlp = spacy.load('en_core_web_sm')
+# Besides the demo on the sentences below, the same analysis can be run over a large text file with one sentence per line, e.g.:
+#   python garden.py --corpus sentences.txt --output analysis.jsonl --batch-size 1000 --n-process 4
+# Adding --entity-index entities.db also records every entity found in an SQLite index, which can be queried later without parsing, e.g.:
+#   python garden.py --entity-index entities.db --find-text Amazon --find-label ORG
+#   python garden.py --entity-index entities.db --with-labels GPE DATE
+# Adding --columns token_columns also exports every token's attributes as columnar Parquet (see token_columns.py), for vectorised filtering afterwards.
+# Adding --cache-dir parse_cache keeps the parsed sentences on disk, so later runs over the same sentences skip spaCy's tagger, parser and NER.
+
+import argparse
+import json
+from collections import Counter
+
+import spacy
+
+from doc_cache import cached_pipe
+from entity_index import add_sentence, file_hash, find_mentions, open_entity_index, sentences_with_labels, start_source
 
 garden_path_sentences = [
     "The old man the boats.",
@@ -26,46 +40,261 @@ garden_path_sentences = [
     "The cotton clothing is made of grows in Mississippi."
 ]
 
-# Initialise a list variable, which will provide a reference glossary of the named entities found in the sample, at the end of the output. 
-explanatory_array = []
 
-# For each sentence in the list, feed it to the spaCy nlp model to make "doc", display tokens, stop words, and lemmas, using spaCy methods. 
-# Printed statements explain to the user what each method is doing
-# Perform named entity recognition, and append the entity codes found to the explanatory array which will form a glossary at the end of the output.
+def analyse_doc(doc: spacy.tokens.Doc) -> dict:
+    """
+    Extracts the tokens, stop words, lemmas and named entities of a sentence processed by spaCy.
+
+    Parameters:
+        - doc (spacy.tokens.Doc): The processed sentence.
+
+    Returns:
+        - dict: The sentence text, and lists of its tokens (ignoring spaces and punctuation), stop
+        words, lemmas of meaningful words, and named entities as [text, label, start_char,
+        end_char] lists.
+    """
+    return {
+        "text": doc.text,
+        "tokens": [token.orth_ for token in doc if not token.is_punct | token.is_space],
+        "stop_words": [token.orth_ for token in doc if token.is_stop],
+        "lemmas": [token.lemma_ for token in doc if not token.is_punct | token.is_space | token.is_stop],
+        "entities": [[entity.text, entity.label_, entity.start_char, entity.end_char] for entity in doc.ents],
+    }
+
+
+def print_analysis(analysis: dict) -> None:
+    """
+    Prints the analysis of a sentence from analyse_doc(), explaining to the user what each part is.
+
+    Parameters:
+        - analysis (dict): The analysis of one sentence.
+
+    Returns:
+        - No return value. This function outputs directly to the terminal.
+    """
+    print(f"Original: {analysis['text']}")
 
-for sentence in garden_path_sentences:
-    doc = nlp(sentence)
-    print(f"Original: {sentence}")
-    
     print("Tokenised view of the sentence, ignoring spaces and punctuation:")
-    print([token.orth_ for token in doc if not token.is_punct | token.is_space])
-    
+    print(analysis["tokens"])
+
     print("Stop words in original sentence, which will be ignored for the purpose of NLP:")
-    print([token.orth_ for token in doc if token.is_stop])
-    
+    print(analysis["stop_words"])
+
     print("Lemmas (root meaning) of each meaningful word in the sentence:")
-    print([token.lemma_ for token in doc if not token.is_punct | token.is_space | token.is_stop])
-    
+    print(analysis["lemmas"])
+
     print("Named entity recognition classifies real-world objects referenced in the sentence into categories:")
-    print([(entity, entity.label_) for entity in doc.ents])
-    
-    # Add entity label codes to eventually produce a glossary of what they represent
-    for entity in doc.ents:
-        explanatory_array.append(entity.label_)
-    
+    print([(text, label) for text, label, _, _ in analysis["entities"]])
+
     # Space out the results by printing a newline
     print()
 
 
-# Create the glossary by calling the spacy.explain() method on the entity codes found in the text
-# Use set to list conversion with sorted() to make the glossary alphabetical and non-repetitive
+def print_glossary(entity_counts: Counter) -> None:
+    """
+    Prints a glossary of the named entity codes found, by calling the spacy.explain() method on each
+    code, in alphabetical order.
+
+    Parameters:
+        - entity_counts (Counter): Number of entities found with each label code.
+
+    Returns:
+        - No return value. This function outputs directly to the terminal.
+    """
+    print(f"{'GLOSSARY: NAMED ENTITY CODE EXPLANATION':-^80}")
+    for entity_code in sorted(entity_counts):
+        named_entity_explanation = spacy.explain(entity_code) or ""
+        print(f"{entity_code:_<20}{named_entity_explanation:_>60}")
+        print()
+
+
+def read_corpus(corpus_path: str):
+    """
+    Streams the sentences of a corpus file, one per line, skipping blank lines, so the file never
+    has to be read into memory at once.
+
+    Parameters:
+        - corpus_path (str): Path of a text file with one sentence per line.
+
+    Yields:
+        - str: Each sentence, stripped of surrounding whitespace.
+    """
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        for line in f:
+            sentence = line.strip()
+            if sentence:
+                yield sentence
+
+
+def pipe_sentences(
+    sentences,
+    nlp: spacy.language.Language,
+    batch_size: int = 1000,
+    n_process: int = 1,
+    cache_dir: str | None = None,
+    cache_stats: dict | None = None,
+):
+    """
+    Processes sentences with nlp.pipe(), or through the parse cache of doc_cache.py if a cache
+    directory is given, so that sentences parsed on an earlier run are not parsed again.
 
-print(f"{'GLOSSARY: NAMED ENTITY CODE EXPLANATION':-^80}")
-for entity_code in sorted(list(set(explanatory_array))):
-    named_entity_explanation = spacy.explain(entity_code)
-    print(f"{entity_code:_<20}{named_entity_explanation:_>60}")
+    Parameters:
+        - sentences (Iterable[str]): The sentences to process.
+        - nlp (spacy.language.Language): Instance of nlp text-processing pipeline.
+        - batch_size (int): Number of sentences spaCy processes together in one batch.
+        - n_process (int): Number of processes spaCy spreads the batches across.
+        - cache_dir (str | None): Directory of the parse cache, or None to parse every sentence.
+        - cache_stats (dict | None): If given with a cache_dir, filled in with the cache hit rate
+        and time saved once all the sentences have been processed.
+
+    Yields:
+        - spacy.tokens.Doc: The Doc of each sentence, in order.
+    """
+    if cache_dir:
+        return cached_pipe(sentences, nlp, cache_dir, batch_size, n_process, stats=cache_stats)
+    return nlp.pipe(sentences, batch_size=batch_size, n_process=n_process)
+
+
+def print_cache_stats(cache_stats: dict) -> None:
+    """
+    Prints the cache hit rate and time saved reported by the parse cache.
+
+    Parameters:
+        - cache_stats (dict): Labelled statistics from doc_cache.cache_stats().
+
+    Returns:
+        - No return value. This function outputs directly to the terminal.
+    """
+    print(f"{'PARSE CACHE':-^80}")
+    for label, value in cache_stats.items():
+        print(f"{label:_<40}{value:_>40.3f}" if isinstance(value, float) else f"{label:_<40}{value:_>40}")
     print()
 
+
+def analyse_corpus(
+    sentences,
+    output_path: str,
+    nlp: spacy.language.Language,
+    batch_size: int = 1000,
+    n_process: int = 1,
+    cache_dir: str | None = None,
+    cache_stats: dict | None = None,
+    entity_index=None,
+    source_id: int | None = None,
+    columns_writer=None,
+) -> Counter:
+    """
+    Runs the token, stop word, lemma and entity analysis over a stream of sentences with nlp.pipe(),
+    writing each sentence's analysis as one line of a JSONL output file instead of printing it.
+
+    Parameters:
+        - sentences (Iterable[str]): The sentences to analyse, e.g. from read_corpus().
+        - output_path (str): Path of the JSONL file to write.
+        - nlp (spacy.language.Language): Instance of nlp text-processing pipeline.
+        - batch_size (int): Number of sentences spaCy processes together in one batch.
+        - n_process (int): Number of processes spaCy spreads the batches across. -1 uses all CPU
+        cores.
+        - cache_dir (str | None): Directory of the parse cache, or None to parse every sentence.
+        - cache_stats (dict | None): If given with a cache_dir, filled in with the cache hit rate
+        and time saved.
+        - entity_index (sqlite3.Connection | None): Entity index from
+        entity_index.open_entity_index() to add each sentence and its entities to, or None.
+        - source_id (int | None): Id of the corpus file in the entity index, from
+        entity_index.start_source(). Sentences are only added to the index if it is given.
+        - columns_writer (token_columns.TokenColumnsWriter | None): Writer to export each
+        sentence's token attributes with, or None.
+
+    Returns:
+        - Counter: Number of entities found with each label code, for the glossary.
+    """
+    entity_counts = Counter()
+    with open(output_path, "w", encoding="utf-8") as output:
+        docs = pipe_sentences(sentences, nlp, batch_size, n_process, cache_dir, cache_stats)
+        for position, doc in enumerate(docs):
+            analysis = analyse_doc(doc)
+            entity_counts.update(label for _, label, _, _ in analysis["entities"])
+            output.write(json.dumps(analysis) + "\n")
+            if entity_index is not None and source_id is not None:
+                add_sentence(entity_index, source_id, position, analysis)
+            if columns_writer is not None:
+                columns_writer.add(doc)
+    if entity_index is not None:
+        entity_index.commit()
+    return entity_counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tokens, stop words, lemmas and named entities of garden-path sentences, or of a corpus file.")
+    parser.add_argument("--corpus", help="Text file with one sentence per line, to analyse instead of the built-in sentences")
+    parser.add_argument("--output", default="analysis.jsonl", help="JSONL file to write the corpus analysis to")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Sentences per spaCy batch")
+    parser.add_argument("--n-process", type=int, default=1, help="Processes to run spaCy in, -1 for all CPU cores")
+    parser.add_argument("--cache-dir", help="Directory to cache parsed sentences in, so reruns don't parse them again")
+    parser.add_argument("--columns", help="Directory to export the corpus's token attributes to as Parquet")
+    parser.add_argument("--entity-index", help="SQLite database to record the entities of a corpus in, or to query")
+    parser.add_argument("--find-text", help="Query the entity index for mentions with this exact text")
+    parser.add_argument("--find-label", help="Query the entity index for mentions with this label code, e.g. ORG")
+    parser.add_argument("--with-labels", nargs="+", help="Query the entity index for sentences mentioning all of these label codes")
+    args = parser.parse_args()
+
+    entity_index = open_entity_index(args.entity_index) if args.entity_index else None
+
+    # Queries are answered from the index alone, without loading spaCy or parsing anything
+    if entity_index is not None and not args.corpus and (args.find_text or args.find_label or args.with_labels):
+        if args.with_labels:
+            for sentence in sentences_with_labels(entity_index, args.with_labels):
+                print(f"{sentence['source']}:{sentence['position']}: {sentence['text']}")
+        else:
+            for mention in find_mentions(entity_index, args.find_text, args.find_label):
+                print(f"{mention['source']}:{mention['position']}: {mention['text']} ({mention['label']}) [{mention['start_char']}:{mention['end_char']}] {mention['sentence']}")
+        return
+
+    nlp = spacy.load('en_core_web_sm')
+    cache_stats = {}
+
+    if args.corpus:
+        # Only new or changed corpus files are added to the entity index
+        source_id = start_source(entity_index, args.corpus, file_hash(args.corpus)) if entity_index is not None else None
+        columns_writer = None
+        if args.columns:
+            # Imported here as only the columnar export needs pyarrow
+            from token_columns import TokenColumnsWriter
+            columns_writer = TokenColumnsWriter(args.columns, args.batch_size)
+        entity_counts = analyse_corpus(
+            read_corpus(args.corpus), args.output, nlp, args.batch_size, args.n_process, args.cache_dir, cache_stats,
+            entity_index, source_id, columns_writer,
+        )
+        print(f"Wrote the analysis of {args.corpus} to {args.output}\n")
+        if columns_writer is not None:
+            column_counts = columns_writer.close()
+            print(f"Exported {column_counts['Tokens']} tokens of {column_counts['Docs']} sentences to {args.columns}\n")
+        if entity_index is not None:
+            print(f"Added the entities of {args.corpus} to {args.entity_index}\n" if source_id is not None else f"{args.corpus} is already in {args.entity_index}, unchanged\n")
+        print_glossary(entity_counts)
+        if cache_stats:
+            print_cache_stats(cache_stats)
+        return
+
+    # Count the entity label codes found, which will provide a reference glossary of the named entities found in the sample, at the end of the output.
+    entity_counts = Counter()
+
+    # For each sentence in the list, feed it to the spaCy nlp model to make "doc", display tokens, stop words, and lemmas, using spaCy methods. 
+    # Printed statements explain to the user what each method is doing
+    # Perform named entity recognition, and count the entity codes found, which will form a glossary at the end of the output.
+    for doc in pipe_sentences(garden_path_sentences, nlp, args.batch_size, args.n_process, args.cache_dir, cache_stats):
+        analysis = analyse_doc(doc)
+        print_analysis(analysis)
+        entity_counts.update(label for _, label, _, _ in analysis["entities"])
+
+    # Create the glossary of what the entity codes found represent
+    print_glossary(entity_counts)
+    if cache_stats:
+        print_cache_stats(cache_stats)
+
+
+if __name__ == "__main__":
+    main()
+
 # I purposefully used a couple of confounding terms in the sentences:
 # None of the following classifications made sense. Otherwise, spaCy did a good job of extracting named entities correctly. 
 # Amazon and Jaguar are classified as ORG - Companies, agencies, institutions etc, but in the sentences they instead mean the rainforest and the animal respectively.
@@ -0,0 +1,100 @@
+# Process-wide registry of spaCy pipelines. Each model is loaded lazily, the first time it is asked for, and the same
+# instance is then shared by every caller in the process, so importing a module that uses a model costs nothing until
+# the model is actually needed, and no model is ever loaded twice.
+# Also holds the helpers every on-disk store of model output shares (the catalog index of movie_index.py and the Doc
+# cache of doc_cache.py): the name and version of the model it came from, and a hash of each text it holds.
+
+import hashlib
+import threading
+import time
+
+import spacy
+
+from vector_table import attach_vector_table
+
+# Loaded pipelines, keyed by model name plus the components excluded when loading and any vector table attached
+_models = {}
+# Seconds taken by spacy.load() for each entry of _models
+_load_seconds = {}
+# Guards loading, so two threads asking for the same model at once don't both load it
+_lock = threading.Lock()
+
+
+def get_model(name: str, exclude: list[str] | None = None, vectors: str | None = None) -> spacy.language.Language:
+    """
+    Returns the shared instance of a spaCy pipeline, loading it on the first call.
+
+    Parameters:
+        - name (str): Name of the installed model package, e.g. "en_core_web_md".
+        - exclude (list[str] | None): Pipeline components not to load at all, e.g. every component
+        when only the tokeniser and word vectors are needed. Pipelines loaded with different
+        exclusions are cached separately.
+        - vectors (str | None): Directory of a table saved by vector_table.export_vector_table(),
+        to attach to the pipeline with attach_vector_table(). The pipeline is then a separate
+        instance from the one without the table, so callers of the plain model never see it.
+
+    Returns:
+        - spacy.language.Language: The loaded pipeline.
+
+    Example:
+        >>> nlp_md = get_model("en_core_web_md")
+        >>> nlp_md is get_model("en_core_web_md")
+        True
+    """
+    key = (name, tuple(sorted(exclude or ())), vectors)
+    if key not in _models:
+        with _lock:
+            # Another thread may have loaded the model while this one waited for the lock
+            if key not in _models:
+                started = time.perf_counter()
+                nlp = spacy.load(name, exclude=list(key[1]))
+                if vectors is not None:
+                    attach_vector_table(nlp, vectors)
+                _models[key] = nlp
+                _load_seconds[key] = time.perf_counter() - started
+    return _models[key]
+
+
+def load_times() -> dict:
+    """
+    Reports how long each model held by the registry took to load, i.e. its cold-start cost.
+
+    Returns:
+        - dict: Model names (with any excluded components and vector table in brackets) as keys,
+        and load times in seconds as values.
+    """
+    return {
+        name
+        + (f" (excluding {', '.join(exclude)})" if exclude else "")
+        + (f" (with vectors from {vectors})" if vectors else ""): seconds
+        for (name, exclude, vectors), seconds in _load_seconds.items()
+    }
+
+
+def model_name(nlp: spacy.language.Language) -> str:
+    """
+    Names the spaCy model a pipeline was loaded from, including its version, e.g.
+    "en_core_web_md-3.7.1". Vectors from different models must never be compared, so this is
+    stored with an index or cache and checked before it is reused.
+
+    Parameters:
+        - nlp (spacy.language.Language): A loaded spaCy pipeline.
+
+    Returns:
+        - str: The model name and version.
+    """
+    return f"{nlp.meta['lang']}_{nlp.meta['name']}-{nlp.meta['version']}"
+
+
+def content_hash(text: str) -> str:
+    """
+    Short hash of a text, such as a movie description in a catalog index or a sentence in a Doc
+    cache, so that a changed text can be spotted without processing it again.
+
+    Parameters:
+        - text (str): The text to hash.
+
+    Returns:
+        - str: A 16 character hexadecimal digest.
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
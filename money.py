@@ -0,0 +1,287 @@
+# Exact money mode for batch calculations. The calculators work in binary floats and only round when displaying, so a
+# total repayment and the sum of the monthly repayments shown for it can differ by a penny or more. Here amounts are
+# int64 pence in NumPy arrays, and every period's interest is rounded to a whole penny by an explicit rule, as a
+# lender's statement would be, so a schedule reconciles exactly: the repayments add up to the amount borrowed plus
+# the interest charged, to the penny, for every loan.
+# Periods still have to be worked through in order, because each one's rounding feeds the next, but every loan or
+# deposit of a batch is worked on at once, so the number of Python steps is the longest term, not the batch size.
+# Loans are dropped from the arrays as they are repaid, so later months only work on the loans left.
+# This is still far slower than the closed form of finance_arrays.py, which needs no loop at all: a schedule costs a
+# step per month of its term, so on a batch of 25-year mortgages the pence engine is a few hundred times slower than
+# mortgage_payment_array() (see benchmark_money()), and a batch with a term of 1000 years takes 12,000 steps.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from finance_arrays import interest_calculator_array, mortgage_payment_array
+
+# Rules for rounding a fraction of a penny: "half_up" rounds halves away from zero, "half_even" rounds them to the
+# even penny (banker's rounding), and "down" drops the fraction, rounding towards zero
+ROUNDING_RULES = ("half_up", "half_even", "down")
+
+
+def round_pence(values, rounding: str = "half_up") -> np.ndarray:
+    """
+    Rounds amounts in pence to whole pence.
+
+    Parameters:
+        - values (float | np.ndarray): Amounts in pence, with fractions of a penny.
+        - rounding (str): Rounding rule, one of ROUNDING_RULES.
+
+    Returns:
+        - np.ndarray: The amounts as int64 pence.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if rounding == "half_up":
+        rounded = np.sign(values) * np.floor(np.abs(values) + 0.5)
+    elif rounding == "half_even":
+        rounded = np.rint(values)
+    elif rounding == "down":
+        rounded = np.trunc(values)
+    else:
+        raise ValueError(f"rounding must be one of {', '.join(ROUNDING_RULES)}")
+    return rounded.astype(np.int64)
+
+
+def to_pence(pounds, rounding: str = "half_up") -> np.ndarray:
+    """
+    Converts amounts in pounds to int64 pence.
+
+    Parameters:
+        - pounds (float | np.ndarray): Amounts in pounds.
+        - rounding (str): Rounding rule for fractions of a penny, one of ROUNDING_RULES.
+
+    Returns:
+        - np.ndarray: The amounts in pence.
+
+    Example:
+        >>> to_pence([1.005, 2.5])
+        array([101, 250])
+    """
+    # Multiplying by 100 can land a hair below a half penny (1.005 * 100 is 100.49999...), so round to a millionth of
+    # a penny first
+    return round_pence(np.round(np.asarray(pounds, dtype=np.float64) * 100, 6), rounding)
+
+
+def to_pounds(pence) -> np.ndarray:
+    """
+    Converts int64 pence to pounds, for display.
+
+    Parameters:
+        - pence (int | np.ndarray): Amounts in pence.
+
+    Returns:
+        - np.ndarray: The amounts in pounds.
+    """
+    return np.asarray(pence) / 100
+
+
+def mortgage_payment_pence(
+    present_dwelling_value,
+    annual_interest=0,
+    monthly_interest=0,
+    years_repaying=0,
+    months_repaying=0,
+    rounding: str = "half_up",
+) -> pd.DataFrame:
+    """
+    Calculate the repayments of a batch of mortgages in whole pence, as a lender would charge them,
+    with arguments as for mortgage_payment_array(). The monthly repayment is mortgage_payment()'s,
+    rounded up to the next penny. Each month, interest is charged on the balance and rounded to a
+    whole penny by the rounding rule, and the repayment comes off the balance, with the last
+    repayment being whatever is left, so the loan is repaid exactly at the end of its term.
+
+    Parameters:
+        - present_dwelling_value (float | np.ndarray): The current values of the properties.
+        - annual_interest (float | np.ndarray): The annual interest rates, as percentages. Used
+        where no monthly interest rate is given.
+        - monthly_interest (float | np.ndarray): The monthly interest rates, as percentages. Take
+        precedence over the annual interest rates where non-zero.
+        - years_repaying (int | np.ndarray): The numbers of full years over which the loans are
+        repaid.
+        - months_repaying (int | np.ndarray): The additional months over which the loans are
+        repaid, on top of the full years.
+        - rounding (str): Rounding rule for each month's interest, one of ROUNDING_RULES.
+
+    Returns:
+        - pd.DataFrame: One row per mortgage with the amount borrowed, the number of repayments
+        (fewer than the term's months if rounding up repays the loan early), and in int64 pence,
+        the monthly repayment, the last repayment, the total interest and the total repayment.
+        The total repayment is always exactly the amount borrowed plus the total interest, and the
+        monthly repayments plus the last add up to it.
+
+    Example:
+        >>> mortgage_payment_pence(1000, 5, 0, 5)
+           Dwelling Value (p)  Repayments  Monthly Repayment (p)  Final Repayment (p)  Total Interest (p)  Total Repayment (p)
+        0              100000          60                   1888                 1828               13220               113220
+    """
+    loans = mortgage_payment_array(
+        present_dwelling_value, annual_interest, monthly_interest, years_repaying, months_repaying, as_frame=False
+    )
+    principal = to_pence(np.ravel(loans["Dwelling Value (£)"]))
+    rate = np.ravel(
+        np.where(loans["Monthly Interest (%)"] == 0, loans["Annual Interest (%)"] / 12, loans["Monthly Interest (%)"])
+    ) / 100
+    term = np.ravel(loans["Repayment Duration (years)"] * 12 + loans["Repayment Duration (additional months)"])
+    # Round up, so that rounding never leaves a balance to carry past the term. Rounded to a millionth of a penny
+    # first, so that a repayment that is a whole number of pence isn't pushed up by float error
+    payment = np.ceil(np.round(np.ravel(loans["Monthly Repayment (£)"]) * 100, 6)).astype(np.int64)
+
+    repayments = term.copy()
+    total_interest = np.zeros(len(principal), dtype=np.int64)
+    final_payment = np.zeros(len(principal), dtype=np.int64)
+    # State of the loans still being repaid, which are dropped as they are paid off. Loans with no term have nothing
+    # to repay
+    index = np.flatnonzero(term > 0)
+    loan_balance, loan_rate, loan_payment, loan_term = principal[index], rate[index], payment[index], term[index]
+    loan_interest = np.zeros(len(index), dtype=np.int64)
+    month = 0
+    while len(index):
+        month += 1
+        interest = round_pence(loan_balance * loan_rate, rounding)
+        owed = loan_balance + interest
+        # The last month, or a month where the repayment would take the balance below 0, pays off what's left
+        last = (month == loan_term) | (loan_payment >= owed)
+        paid = np.where(last, owed, loan_payment)
+        loan_interest += interest
+        loan_balance = owed - paid
+        if last.any():
+            # Loans paid off early by rounding up stop accruing
+            repaid = index[last]
+            final_payment[repaid] = paid[last]
+            total_interest[repaid] = loan_interest[last]
+            repayments[repaid] = month
+            keep = ~last
+            index, loan_balance, loan_rate, loan_payment, loan_term, loan_interest = (
+                array[keep] for array in (index, loan_balance, loan_rate, loan_payment, loan_term, loan_interest)
+            )
+
+    return pd.DataFrame(
+        {
+            "Dwelling Value (p)": principal,
+            "Repayments": np.where((term > 0) & (principal > 0), repayments, 0),
+            "Monthly Repayment (p)": payment,
+            "Final Repayment (p)": final_payment,
+            "Total Interest (p)": total_interest,
+            # As in mortgage_payment(), a loan with no term has no repayments
+            "Total Repayment (p)": np.where(term > 0, principal + total_interest, 0),
+        }
+    )
+
+
+def interest_calculator_pence(deposit, annual_interest, years, compound_simple, rounding: str = "half_up") -> pd.DataFrame:
+    """
+    Calculate the interest on a batch of deposits in whole pence, with arguments as for
+    interest_calculator_array(). Each year's interest is rounded to a whole penny by the rounding
+    rule, and compound interest is added to the balance a year at a time, as a bank would credit
+    it.
+
+    Parameters:
+        - deposit (float | np.ndarray): The principal amounts deposited.
+        - annual_interest (float | np.ndarray): The annual interest rates as percentages.
+        - years (int | np.ndarray): The numbers of years of interest accrual.
+        - compound_simple (str | np.ndarray): "s" for simple or "c" for compound interest, either for
+        every deposit or per deposit.
+        - rounding (str): Rounding rule for each year's interest, one of ROUNDING_RULES.
+
+    Returns:
+        - pd.DataFrame: One row per deposit with, in int64 pence, the deposit, the accrued interest
+        and the total including the deposit, which is always exactly their sum.
+
+    Example:
+        >>> interest_calculator_pence(1000.01, 5, 5, ["s", "c"])
+           Deposit (p)  Accrued Interest (p)  Total incl. Deposit and Interest (p)
+        0       100001                 25000                                125001
+        1       100001                 27629                                127630
+    """
+    quotes = interest_calculator_array(deposit, annual_interest, years, compound_simple, as_frame=False)
+    deposit = to_pence(np.ravel(quotes["Deposit (£)"]))
+    rate = np.ravel(quotes["Annual Interest (%)"]) / 100
+    years = np.ravel(quotes["Investment Duration (years)"])
+    compound = np.ravel(np.broadcast_to(np.asarray(compound_simple), quotes["Deposit (£)"].shape)) == "c"
+
+    # Simple interest is the same each year, on the deposit alone
+    balance = deposit.copy()
+    simple_interest = round_pence(deposit * rate, rounding)
+    for year in range(1, int(years.max(initial=0)) + 1):
+        active = year <= years
+        yearly_interest = np.where(compound, round_pence(balance * rate, rounding), simple_interest)
+        balance += np.where(active, yearly_interest, 0)
+
+    return pd.DataFrame(
+        {
+            "Deposit (p)": deposit,
+            "Accrued Interest (p)": balance - deposit,
+            "Total incl. Deposit and Interest (p)": balance,
+        }
+    )
+
+
+def benchmark_money(n_loans: int = 100_000, seed: int = 0) -> dict:
+    """
+    Times the pence mortgage engine against the float path it replaces, the closed-form
+    mortgage_payment_array() that finance_batch.py uses without --exact-pence, and checks that
+    every pence schedule reconciles exactly, where a float month-by-month schedule of the same
+    loans, rounded to pence only at the end, doesn't.
+
+    Parameters:
+        - n_loans (int): Number of random mortgages.
+        - seed (int): Seed of the random mortgages.
+
+    Returns:
+        - dict: Labelled results: the number of loans, how many pence schedules and how many float
+        schedules don't reconcile to the penny, the largest gap of a float schedule, the seconds
+        taken by each engine, and how many times slower the pence engine is.
+    """
+    rng = np.random.default_rng(seed)
+    value = np.round(rng.uniform(20_000, 1_000_000, n_loans), 2)
+    annual_interest = np.round(rng.uniform(0, 9, n_loans), 2)
+    years = rng.integers(1, 41, n_loans)
+
+    started = time.perf_counter()
+    pence = mortgage_payment_pence(value, annual_interest, 0, years)
+    pence_seconds = time.perf_counter() - started
+    repayments = pence["Monthly Repayment (p)"] * (pence["Repayments"] - 1) + pence["Final Repayment (p)"]
+    pence_mismatches = int(
+        np.sum(
+            (pence["Total Repayment (p)"] != pence["Dwelling Value (p)"] + pence["Total Interest (p)"])
+            | (repayments != pence["Total Repayment (p)"])
+        )
+    )
+
+    # The float path: the closed-form repayment, as calculated by the batch mode without --exact-pence
+    started = time.perf_counter()
+    floats = mortgage_payment_array(value, annual_interest, 0, years, as_frame=False)
+    float_seconds = time.perf_counter() - started
+
+    # Only for the reconciliation check, not timed: the month-by-month interest of the same loans in float64
+    balance = value.copy()
+    rate = annual_interest / 1200
+    interest = np.zeros(n_loans)
+    for month in range(1, int(years.max()) * 12 + 1):
+        active = month <= years * 12
+        monthly_interest = np.where(active, balance * rate, 0)
+        balance = balance + monthly_interest - np.where(active, floats["Monthly Repayment (£)"], 0)
+        interest += monthly_interest
+    # Shown to the penny: the total repayment, and the monthly repayment times the months
+    shown_total = np.round(floats["Total Repayment (£)"], 2)
+    shown_sum = np.round(floats["Monthly Repayment (£)"], 2) * years * 12
+    shown_interest = np.round(interest, 2)
+    float_gap = np.maximum(np.abs(shown_total - shown_sum), np.abs(shown_total - (value + shown_interest)))
+
+    return {
+        "Loans": n_loans,
+        "Pence schedules not reconciling": pence_mismatches,
+        "Float schedules not reconciling": int(np.sum(float_gap >= 0.005)),
+        "Largest float gap (£)": float(float_gap.max()),
+        "Pence engine (s)": pence_seconds,
+        "Float engine (s)": float_seconds,
+        "Slowdown (x)": pence_seconds / float_seconds,
+    }
+
+
+if __name__ == "__main__":
+    for label, value in benchmark_money().items():
+        print(f"{label}: {value}")
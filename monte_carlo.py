@@ -0,0 +1,221 @@
+# Monte Carlo projection of an investment whose return varies from year to year, for showing the range of outcomes an
+# investor could see, where interest_calculator() gives the single outcome of a fixed rate.
+# Each path draws one annual return per year from a chosen distribution, and its terminal value is the deposit times
+# the product of (1 + return) over the years. Paths are simulated in fixed-size blocks, so memory is bounded by the
+# block size whatever the number of paths, and blocks can be spread across a Pool of processes. Every block has its
+# own seed spawned from one SeedSequence, so a projection gives the same result for the same seed however many
+# processes run it.
+
+import time
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+# Distributions annual returns can be drawn from. All are set up to have the given mean and volatility
+DISTRIBUTIONS = ("normal", "lognormal", "t")
+# Percentiles of the terminal value reported by default
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def draw_returns(
+    rng: np.random.Generator,
+    size: tuple,
+    mean: float,
+    volatility: float,
+    distribution: str = "normal",
+    degrees_of_freedom: float = 5,
+) -> np.ndarray:
+    """
+    Draws annual returns, as fractions (0.05 for 5%).
+
+    Parameters:
+        - rng (np.random.Generator): Random generator to draw with.
+        - size (tuple): Shape of the array of returns, e.g. (paths, years).
+        - mean (float): Mean annual return, as a fraction.
+        - volatility (float): Standard deviation of the annual return, as a fraction.
+        - distribution (str): "normal" for normally distributed returns, "lognormal" for returns
+        whose growth factor 1 + return is lognormal (so never below -100%), or "t" for a Student's
+        t distribution with heavier tails than the normal.
+        - degrees_of_freedom (float): Degrees of freedom of the t distribution, above 2.
+
+    Returns:
+        - np.ndarray: The returns. Returns below -100% (possible with "normal" and "t") are
+        clipped to -100%, i.e. losing the whole investment.
+    """
+    if distribution == "normal":
+        returns = rng.normal(mean, volatility, size)
+    elif distribution == "lognormal":
+        # Parameters of log(1 + return) that give the growth factor the requested mean and standard deviation
+        sigma = np.sqrt(np.log1p((volatility / (1 + mean)) ** 2))
+        mu = np.log1p(mean) - sigma**2 / 2
+        returns = np.expm1(rng.normal(mu, sigma, size))
+    elif distribution == "t":
+        # A t variable has variance df / (df - 2), so scale it to unit variance first
+        scale = np.sqrt((degrees_of_freedom - 2) / degrees_of_freedom)
+        returns = mean + volatility * scale * rng.standard_t(degrees_of_freedom, size)
+    else:
+        raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+    return np.maximum(returns, -1)
+
+
+def block_terminal_values(block: tuple) -> np.ndarray:
+    """
+    Simulates one block of paths.
+
+    NOTE: This function is not meant to be run directly by the user, but is called by
+    simulate_terminal_values(), directly or in a worker process.
+
+    Parameters:
+        - block (tuple): The deposit, mean return and volatility (fractions), years, number of
+        paths, distribution, degrees of freedom, and the block's np.random.SeedSequence.
+
+    Returns:
+        - np.ndarray: The terminal value of each path of the block.
+    """
+    deposit, mean, volatility, years, paths, distribution, degrees_of_freedom, seed_sequence = block
+    rng = np.random.default_rng(seed_sequence)
+    returns = draw_returns(rng, (paths, years), mean, volatility, distribution, degrees_of_freedom)
+    # Growth of each path over all its years: the product of its yearly growth factors
+    return deposit * np.prod(1 + returns, axis=1)
+
+
+def simulate_terminal_values(
+    deposit: float,
+    annual_interest: float,
+    volatility: float,
+    years: int,
+    n_paths: int = 100_000,
+    distribution: str = "normal",
+    seed: int = 0,
+    block_size: int = 100_000,
+    n_processes: int = 1,
+    degrees_of_freedom: float = 5,
+) -> np.ndarray:
+    """
+    Simulates the value of a compounding investment at the end of its term, over many paths of
+    varying annual returns.
+
+    Parameters:
+        - deposit (float): The principal amount deposited.
+        - annual_interest (float): The mean annual return, as a percentage (e.g., 4 for 4%), as
+        for interest_calculator().
+        - volatility (float): The standard deviation of the annual return, as a percentage.
+        - years (int): The number of years invested.
+        - n_paths (int): Number of paths to simulate.
+        - distribution (str): Distribution of annual returns, one of DISTRIBUTIONS.
+        - seed (int): Seed of the simulation. The same seed gives the same values, whatever the
+        number of processes.
+        - block_size (int): Number of paths simulated at a time, which bounds the memory of each
+        process to about block_size * years values.
+        - n_processes (int): Number of worker processes to spread the blocks across. 1 simulates
+        everything in this process. 0 or less uses all CPU cores.
+        - degrees_of_freedom (float): Degrees of freedom of the "t" distribution.
+
+    Returns:
+        - np.ndarray: The terminal value of each path, in path order.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+
+    sizes = [min(block_size, n_paths - start) for start in range(0, n_paths, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    blocks = [
+        (deposit, annual_interest / 100, volatility / 100, years, size, distribution, degrees_of_freedom, block_seed)
+        for size, block_seed in zip(sizes, seeds)
+    ]
+    if not blocks:
+        return np.zeros(0)
+
+    if n_processes <= 0:
+        n_processes = cpu_count()
+    if n_processes == 1 or len(blocks) == 1:
+        return np.concatenate([block_terminal_values(block) for block in blocks])
+    with Pool(min(n_processes, len(blocks))) as pool:
+        return np.concatenate(pool.map(block_terminal_values, blocks))
+
+
+def projection_percentiles(
+    deposit: float,
+    annual_interest: float,
+    volatility: float,
+    years: int,
+    n_paths: int = 100_000,
+    distribution: str = "normal",
+    seed: int = 0,
+    percentiles: tuple = PERCENTILES,
+    n_processes: int = 1,
+) -> dict:
+    """
+    Summarises a Monte Carlo projection as percentile bands of the terminal value, ready to be
+    shown as the results of print_calculation_summary_table().
+
+    Parameters:
+        - deposit (float): The principal amount deposited.
+        - annual_interest (float): The mean annual return, as a percentage.
+        - volatility (float): The standard deviation of the annual return, as a percentage.
+        - years (int): The number of years invested.
+        - n_paths (int): Number of paths to simulate.
+        - distribution (str): Distribution of annual returns, one of DISTRIBUTIONS.
+        - seed (int): Seed of the simulation.
+        - percentiles (tuple): Percentiles of the terminal value to report.
+        - n_processes (int): Number of worker processes, as for simulate_terminal_values().
+
+    Returns:
+        - dict: Descriptive labels as keys: each percentile of the total including the deposit,
+        the mean total, and the chance of ending below the deposit.
+
+    Example:
+        >>> projection_percentiles(1000, 5, 10, 5)
+        {'5th Percentile Total (£)': 869.17..., ..., 'Mean Total (£)': 1276.19..., 'Chance of Loss (%)': 15.209}
+    """
+    values = simulate_terminal_values(
+        deposit, annual_interest, volatility, years, n_paths, distribution, seed, n_processes=n_processes
+    )
+    bands = np.percentile(values, percentiles)
+    results = {f"{_ordinal(p)} Percentile Total (£)": float(band) for p, band in zip(percentiles, bands)}
+    results["Mean Total (£)"] = float(values.mean())
+    results["Chance of Loss (%)"] = float(np.mean(values < deposit) * 100)
+    return results
+
+
+def _ordinal(number: int) -> str:
+    # 1st, 2nd, 3rd, 4th ... 11th, 12th, 13th ... 21st
+    if 10 <= number % 100 <= 20:
+        return f"{number}th"
+    return f"{number}{ {1: 'st', 2: 'nd', 3: 'rd'}.get(number % 10, 'th') }"
+
+
+def benchmark_projection(n_paths: int = 10_000_000, years: int = 30, n_processes: int = 0) -> dict:
+    """
+    Times a large projection in one process and in a Pool of processes, and checks that both give
+    the same values.
+
+    Parameters:
+        - n_paths (int): Number of paths to simulate.
+        - years (int): Number of years of each path.
+        - n_processes (int): Number of worker processes for the parallel run. 0 or less uses all
+        CPU cores.
+
+    Returns:
+        - dict: Labelled results: the seconds taken by each run, and whether their values are
+        identical.
+    """
+    started = time.perf_counter()
+    single = simulate_terminal_values(10_000, 5, 15, years, n_paths)
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parallel = simulate_terminal_values(10_000, 5, 15, years, n_paths, n_processes=n_processes)
+    parallel_seconds = time.perf_counter() - started
+
+    return {
+        "Paths": n_paths,
+        "One process (s)": single_seconds,
+        "Pool of processes (s)": parallel_seconds,
+        "Identical": bool(np.array_equal(single, parallel)),
+    }
+
+
+if __name__ == "__main__":
+    for label, value in benchmark_projection().items():
+        print(f"{label}: {value}")
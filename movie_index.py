@@ -0,0 +1,695 @@
+# Precomputed catalog index for the movie recommender in semantic.py
+# Movie descriptions are parsed by spaCy once, when the index is built, and stored on disk as a matrix of
+# L2-normalised vectors. A recommendation is then a single matrix-vector product against that matrix.
+# Titles can be added, updated and removed in place: new vectors are appended to the vector file and every change is
+# appended to a journal of titles, so only the changed descriptions are ever embedded again. Compaction rewrites both
+# files without the rows that have been replaced or removed.
+# To save memory, an index can also be loaded with its vectors held as float16, or as int8 with a scale per vector.
+
+import json
+import os
+import time
+
+import numpy as np
+import spacy
+
+from model_registry import content_hash, get_model, model_name
+from text_vectors import embed_texts, normalise_rows
+
+# spaCy model used when no pipeline is passed in, shared with the rest of the process through the model registry
+RECOMMENDER_MODEL = "en_core_web_md"
+
+# Files making up an index saved to disk
+VECTORS_FILENAME = "vectors.f32"
+CATALOG_FILENAME = "catalog.jsonl"
+# Compact copies of the vectors, see quantize_catalog_index(). The codes file is named after its precision
+CODES_FILENAME = "vectors.{precision}"
+SCALES_FILENAME = "scales.f32"
+
+# Precisions the recommenders can score against. float32 scores the full vectors directly; the others score a compact
+# copy, then re-rank the best candidates against the full vectors
+PRECISIONS = ("float32", "float16", "int8")
+
+
+def read_movie_data(movies_path: str) -> dict:
+    """
+    Reads a catalog of movies with one "Title :Description" line per movie.
+
+    Parameters:
+        - movies_path (str): Path of the catalog file, e.g. movies.txt.
+
+    Returns:
+        - dict: Movie titles as keys, and their descriptions as values.
+    """
+    movie_data = {}
+    with open(movies_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            title, desc = line.strip().split(":", 1)  # Split each line into title and description
+            movie_data[title] = desc
+    return movie_data
+
+
+def build_catalog_index(movie_data: dict, nlp: spacy.language.Language) -> dict:
+    """
+    Embeds every movie description once and stores the normalised vectors as rows of a matrix.
+
+    Parameters:
+        - movie_data (dict): Movie titles as keys, and their descriptions as values.
+        - nlp (spacy.language.Language): A loaded spaCy pipeline with word vectors, e.g.
+        en_core_web_md.
+
+    Returns:
+        - dict: The index, with keys:
+            - "model" (str): The model the vectors came from, see model_name().
+            - "vectors" (np.ndarray): One normalised description vector per row.
+            - "titles" (list): The title of each row, or None for rows that have been replaced or
+            removed since the index was last compacted.
+            - "live" (np.ndarray): Boolean mask of the rows that have a title.
+            - "rows" (dict): The row of each current title.
+            - "hashes" (dict): The content_hash() of each current title's description.
+            - "precision" (str): The precision scored against, one of PRECISIONS.
+            - "codes" (np.ndarray | None): The compact copy of "vectors" for float16 and int8.
+            - "scales" (np.ndarray | None): The scale of each row of "codes" for int8.
+    """
+    titles = list(movie_data)
+    vectors = embed_texts([movie_data[title] for title in titles], nlp)
+    return {
+        "model": model_name(nlp),
+        "vectors": normalise_rows(vectors),
+        "titles": titles,
+        "live": np.ones(len(titles), dtype=bool),
+        "rows": {title: row for row, title in enumerate(titles)},
+        "hashes": {title: content_hash(movie_data[title]) for title in titles},
+        "precision": "float32",
+        "codes": None,
+        "scales": None,
+    }
+
+
+def save_catalog_index(index: dict, index_dir: str) -> None:
+    """
+    Saves an index to a directory, keeping only its current titles. The vectors are written as a
+    raw float32 file that later updates append to, and the titles as a journal of JSON lines,
+    headed by the model name and vector width.
+
+    The new files are written next to the old ones and then swapped in, so this also serves to
+    compact an index that has built up replaced or removed rows.
+
+    Parameters:
+        - index (dict): An index returned by build_catalog_index() or load_catalog_index().
+        - index_dir (str): Directory to save to. Created if it does not exist.
+
+    Returns:
+        - No return value. The index files are written to index_dir.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    live_rows = np.flatnonzero(index["live"])
+    vectors_path = os.path.join(index_dir, VECTORS_FILENAME)
+    catalog_path = os.path.join(index_dir, CATALOG_FILENAME)
+
+    np.ascontiguousarray(index["vectors"][live_rows], dtype=np.float32).tofile(vectors_path + ".tmp")
+    with open(catalog_path + ".tmp", "w") as f:
+        f.write(json.dumps({"model": index["model"], "width": index["vectors"].shape[1]}) + "\n")
+        for new_row, row in enumerate(live_rows):
+            title = index["titles"][row]
+            f.write(json.dumps({"title": title, "hash": index["hashes"][title], "row": new_row}) + "\n")
+
+    os.replace(vectors_path + ".tmp", vectors_path)
+    os.replace(catalog_path + ".tmp", catalog_path)
+
+    # Compact copies of the old rows no longer line up with the new files, so they are made again when next needed
+    for precision in PRECISIONS[1:]:
+        _remove_if_exists(os.path.join(index_dir, CODES_FILENAME.format(precision=precision)))
+    _remove_if_exists(os.path.join(index_dir, SCALES_FILENAME))
+
+
+def _remove_if_exists(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def load_catalog_index(index_dir: str, precision: str = "float32") -> dict:
+    """
+    Loads an index saved by save_catalog_index() and updated by update_catalog_index() or
+    remove_from_catalog_index(), replaying its journal of titles. The vectors are memory-mapped
+    rather than read into memory, so loading them is immediate however large the catalog is.
+
+    Parameters:
+        - index_dir (str): Directory the index was saved to.
+        - precision (str): Precision to score against, one of PRECISIONS. For float16 and int8,
+        the compact copy of the vectors is loaded, and made first if the index doesn't have one.
+
+    Returns:
+        - dict: The index, in the same form as returned by build_catalog_index().
+    """
+    titles = []
+    rows = {}
+    hashes = {}
+    with open(os.path.join(index_dir, CATALOG_FILENAME), "r") as f:
+        header = json.loads(f.readline())
+        # Decoding the whole journal as one JSON array is much faster than decoding it line by line
+        entries = json.loads("[" + ",".join(f.read().splitlines()) + "]")
+
+    for entry in entries:
+        title = entry["title"]
+        # Whatever row held this title before is replaced or removed by this entry
+        if title in rows:
+            titles[rows.pop(title)] = None
+            del hashes[title]
+        if "row" in entry:
+            titles.extend([None] * (entry["row"] + 1 - len(titles)))
+            titles[entry["row"]] = title
+            rows[title] = entry["row"]
+            hashes[title] = entry["hash"]
+
+    vectors = _map_vectors(index_dir, header["width"])
+    titles.extend([None] * (len(vectors) - len(titles)))
+    index = {
+        "model": header["model"],
+        "vectors": vectors,
+        "titles": titles,
+        "live": np.array([title is not None for title in titles], dtype=bool),
+        "rows": rows,
+        "hashes": hashes,
+        "precision": "float32",
+        "codes": None,
+        "scales": None,
+    }
+
+    if precision != "float32":
+        index["precision"] = precision
+        _map_codes(index, index_dir)
+        if len(index["codes"]) != len(vectors):
+            quantize_catalog_index(index, index_dir, precision)
+    return index
+
+
+def _map_vectors(index_dir: str, width: int) -> np.ndarray:
+    # Memory-map the raw float32 vector file as a (rows, width) matrix
+    vectors_path = os.path.join(index_dir, VECTORS_FILENAME)
+    n_rows = os.path.getsize(vectors_path) // (4 * width)
+    if n_rows == 0:
+        return np.zeros((0, width), dtype=np.float32)
+    return np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(n_rows, width))
+
+
+def quantize_vectors(
+    vectors: np.ndarray, precision: str
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Converts normalised float32 vectors to a compact precision. float16 halves their size. int8
+    quarters it: each vector is divided by a scale of its largest absolute value over 127 and
+    rounded to integers, and the scales are kept to multiply the scores back up.
+
+    Parameters:
+        - vectors (np.ndarray): A float32 matrix with one vector per row.
+        - precision (str): "float16" or "int8".
+
+    Returns:
+        - tuple[np.ndarray, np.ndarray | None]: The compact vectors, and for int8 the float32
+        scale of each row (None for float16).
+    """
+    if precision == "float16":
+        return vectors.astype(np.float16), None
+    if precision == "int8":
+        scales = np.abs(vectors).max(axis=1, initial=0) / 127
+        # All-zero rows stay all zeros whatever their scale
+        scales[scales == 0] = 1
+        codes = np.rint(vectors / scales[:, np.newaxis]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unsupported precision {precision!r}, choose from {PRECISIONS[1:]}")
+
+
+def quantize_catalog_index(
+    index: dict, index_dir: str, precision: str, block_rows: int = 65536
+) -> None:
+    """
+    Writes a compact copy of every row of a saved index's vectors, and switches the index to
+    scoring against it. Rows are converted block_rows at a time, so the full float32 vectors never
+    have to be read into memory at once.
+
+    Parameters:
+        - index (dict): The index loaded from index_dir, which is updated to match.
+        - index_dir (str): Directory the index was saved to.
+        - precision (str): "float16" or "int8".
+        - block_rows (int): Number of rows converted at a time.
+
+    Returns:
+        - No return value. The compact files are written, and the index dict is updated.
+    """
+    codes_path = os.path.join(index_dir, CODES_FILENAME.format(precision=precision))
+    scales_path = os.path.join(index_dir, SCALES_FILENAME)
+    # Written to temporary files and then swapped in, so indexes already mapping the old files are unaffected
+    with open(codes_path + ".tmp", "wb") as codes_file, open(scales_path + ".tmp", "wb") as scales_file:
+        for start in range(0, len(index["vectors"]), block_rows):
+            codes, scales = quantize_vectors(
+                np.asarray(index["vectors"][start : start + block_rows]), precision
+            )
+            codes.tofile(codes_file)
+            if scales is not None:
+                scales.tofile(scales_file)
+
+    os.replace(codes_path + ".tmp", codes_path)
+    if precision == "int8":
+        os.replace(scales_path + ".tmp", scales_path)
+    else:
+        os.remove(scales_path + ".tmp")
+
+    index["precision"] = precision
+    _map_codes(index, index_dir)
+
+
+def _map_codes(index: dict, index_dir: str) -> None:
+    # Memory-map the compact copy of the vectors for the index's precision, and their scales for int8
+    dtype = np.dtype(index["precision"])
+    width = index["vectors"].shape[1]
+    codes_path = os.path.join(index_dir, CODES_FILENAME.format(precision=index["precision"]))
+    scales_path = os.path.join(index_dir, SCALES_FILENAME)
+
+    n_rows = os.path.getsize(codes_path) // (dtype.itemsize * width) if os.path.exists(codes_path) else 0
+    if n_rows == 0:
+        index["codes"] = np.zeros((0, width), dtype=dtype)
+    else:
+        index["codes"] = np.memmap(codes_path, dtype=dtype, mode="r", shape=(n_rows, width))
+
+    index["scales"] = None
+    if index["precision"] == "int8" and n_rows:
+        index["scales"] = np.memmap(scales_path, dtype=np.float32, mode="r", shape=(n_rows,))
+
+
+def update_catalog_index(
+    index: dict, index_dir: str, movie_data: dict, nlp: spacy.language.Language
+) -> None:
+    """
+    Adds new titles to a saved index, or replaces the descriptions of existing ones, in place.
+    Only the given descriptions are embedded. Their vectors are appended to the end of the vector
+    file and their titles to the journal; any previous rows of the same titles are left in the
+    file as dead rows until the index is compacted.
+
+    Parameters:
+        - index (dict): The index loaded from index_dir, which is updated to match.
+        - index_dir (str): Directory the index was saved to.
+        - movie_data (dict): Titles to add or update as keys, and their descriptions as values.
+        - nlp (spacy.language.Language): The spaCy pipeline the index was built with.
+
+    Returns:
+        - No return value. The index files and the index dict are updated.
+    """
+    if not movie_data:
+        return
+
+    titles = list(movie_data)
+    vectors = normalise_rows(embed_texts([movie_data[title] for title in titles], nlp))
+    first_row = len(index["titles"])
+
+    with open(os.path.join(index_dir, VECTORS_FILENAME), "ab") as f:
+        vectors.tofile(f)
+    with open(os.path.join(index_dir, CATALOG_FILENAME), "a") as f:
+        for row, title in enumerate(titles, start=first_row):
+            description_hash = content_hash(movie_data[title])
+            f.write(json.dumps({"title": title, "hash": description_hash, "row": row}) + "\n")
+
+            if title in index["rows"]:
+                index["titles"][index["rows"][title]] = None
+            index["titles"].append(title)
+            index["rows"][title] = row
+            index["hashes"][title] = description_hash
+
+    index["vectors"] = _map_vectors(index_dir, vectors.shape[1])
+    index["live"] = np.array([title is not None for title in index["titles"]], dtype=bool)
+
+    # Keep the compact copy in step with the full vectors
+    if index["precision"] != "float32":
+        codes, scales = quantize_vectors(vectors, index["precision"])
+        with open(os.path.join(index_dir, CODES_FILENAME.format(precision=index["precision"])), "ab") as f:
+            codes.tofile(f)
+        if scales is not None:
+            with open(os.path.join(index_dir, SCALES_FILENAME), "ab") as f:
+                scales.tofile(f)
+        _map_codes(index, index_dir)
+
+
+def remove_from_catalog_index(index: dict, index_dir: str, titles: list[str]) -> None:
+    """
+    Removes titles from a saved index by appending tombstones for them to its journal. Their
+    vectors stay in the vector file as dead rows until the index is compacted.
+
+    Parameters:
+        - index (dict): The index loaded from index_dir, which is updated to match.
+        - index_dir (str): Directory the index was saved to.
+        - titles (list[str]): Titles to remove. Titles not in the index are ignored.
+
+    Returns:
+        - No return value. The index files and the index dict are updated.
+    """
+    titles = [title for title in titles if title in index["rows"]]
+    with open(os.path.join(index_dir, CATALOG_FILENAME), "a") as f:
+        for title in titles:
+            f.write(json.dumps({"title": title}) + "\n")
+            row = index["rows"].pop(title)
+            del index["hashes"][title]
+            index["titles"][row] = None
+            index["live"][row] = False
+
+
+def compact_catalog_index(index: dict, index_dir: str) -> dict:
+    """
+    Rewrites a saved index without its dead rows, reclaiming the space taken by replaced and
+    removed titles.
+
+    Parameters:
+        - index (dict): The index loaded from index_dir.
+        - index_dir (str): Directory the index was saved to.
+
+    Returns:
+        - dict: The compacted index, reloaded from index_dir.
+    """
+    # Read the live rows into memory first, as the file they are mapped from is about to be replaced
+    index = dict(index, vectors=np.asarray(index["vectors"][index["live"]]))
+    index["titles"] = [title for title in index["titles"] if title is not None]
+    index["live"] = np.ones(len(index["titles"]), dtype=bool)
+    save_catalog_index(index, index_dir)
+    return load_catalog_index(index_dir, index["precision"])
+
+
+def refresh_catalog_index(
+    index: dict,
+    index_dir: str,
+    movies_path: str,
+    nlp: spacy.language.Language,
+    compact_above: float = 0.5,
+) -> dict:
+    """
+    Brings a saved index up to date with the catalog file. Catalog lines are compared with the
+    index by content hash, so only new or changed descriptions are embedded, and titles no longer
+    in the file are tombstoned. A long-running process holding the index in memory can call this
+    after a few edits to the catalog for the cost of reading and hashing the file.
+
+    Parameters:
+        - index (dict): The index loaded from index_dir, which is updated to match.
+        - index_dir (str): Directory the index was saved to.
+        - movies_path (str): Path of the catalog file, e.g. movies.txt.
+        - nlp (spacy.language.Language): The spaCy pipeline the index was built with.
+        - compact_above (float): Compact the index once more than this fraction of its rows are
+        dead.
+
+    Returns:
+        - dict: The updated index. This is a new dict if the index was compacted.
+    """
+    movie_data = read_movie_data(movies_path)
+    changed = {
+        title: desc
+        for title, desc in movie_data.items()
+        if index["hashes"].get(title) != content_hash(desc)
+    }
+    removed = [title for title in index["rows"] if title not in movie_data]
+
+    update_catalog_index(index, index_dir, changed, nlp)
+    remove_from_catalog_index(index, index_dir, removed)
+    # Touch the journal so that an unchanged catalog file is not read again by load_or_build_catalog_index()
+    os.utime(os.path.join(index_dir, CATALOG_FILENAME))
+
+    if len(index["titles"]) and 1 - index["live"].mean() > compact_above:
+        index = compact_catalog_index(index, index_dir)
+    return index
+
+
+def load_or_build_catalog_index(
+    movies_path: str,
+    index_dir: str,
+    nlp: spacy.language.Language | None = None,
+) -> dict:
+    """
+    Loads the index saved in index_dir, bringing it up to date with refresh_catalog_index() if the
+    catalog file has been modified since the index was last written. Builds and saves a new index
+    if there is no saved index or it was built with a different model.
+
+    Parameters:
+        - movies_path (str): Path of the catalog file, e.g. movies.txt.
+        - index_dir (str): Directory the index is saved to.
+        - nlp (spacy.language.Language | None): A loaded spaCy pipeline with word vectors. Defaults
+        to the shared RECOMMENDER_MODEL pipeline from the model registry.
+
+    Returns:
+        - dict: The index, in the same form as returned by build_catalog_index().
+    """
+    if nlp is None:
+        nlp = get_model(RECOMMENDER_MODEL)
+
+    catalog_path = os.path.join(index_dir, CATALOG_FILENAME)
+    if os.path.exists(catalog_path):
+        index = load_catalog_index(index_dir)
+        if index["model"] == model_name(nlp):
+            if os.path.getmtime(catalog_path) >= os.path.getmtime(movies_path):
+                return index
+            return refresh_catalog_index(index, index_dir, movies_path, nlp)
+
+    index = build_catalog_index(read_movie_data(movies_path), nlp)
+    save_catalog_index(index, index_dir)
+    return load_catalog_index(index_dir)
+
+
+def score_catalog(index: dict, queries: np.ndarray, block_rows: int = 65536) -> np.ndarray:
+    """
+    Scores normalised query vectors against every row of an index, at the index's precision. For
+    float16 and int8, the compact copy is converted to float32 block_rows rows at a time for the
+    matrix product, so the full float32 matrix is never rebuilt in memory; int8 scores are then
+    multiplied by each row's scale.
+
+    Parameters:
+        - index (dict): A catalog index.
+        - queries (np.ndarray): A float32 matrix of normalised query vectors, one per row.
+        - block_rows (int): Number of catalog rows converted at a time.
+
+    Returns:
+        - np.ndarray: A float32 matrix of shape (len(queries), rows in index) of similarities,
+        exact for float32 and approximate otherwise. Dead rows are not masked.
+    """
+    if index["precision"] == "float32":
+        return queries @ index["vectors"].T
+
+    codes = index["codes"]
+    scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+    for start in range(0, len(codes), block_rows):
+        block_scores = queries @ codes[start : start + block_rows].astype(np.float32).T
+        if index["scales"] is not None:
+            block_scores *= index["scales"][start : start + block_rows]
+        scores[:, start : start + block_rows] = block_scores
+    return scores
+
+
+def _top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    # argpartition finds the k best columns of each row without sorting the whole catalog,
+    # then only those k are sorted
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def top_k_rows(
+    index: dict,
+    queries: np.ndarray,
+    k: int,
+    exclude: list | None = None,
+    rerank: int = 4,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the k best rows of an index for each normalised query vector. At float16 and int8, the
+    k * rerank best rows by approximate score are re-scored against the full float32 vectors, and
+    the k best of those by exact score are returned, so the scores returned are always exact.
+
+    Parameters:
+        - index (dict): A catalog index.
+        - queries (np.ndarray): A float32 matrix of normalised query vectors, one per row.
+        - k (int): Number of rows to find per query. Must be between 1 and the number of live rows.
+        - exclude (list | None): Optional list aligned with queries of rows never to return.
+        - rerank (int): How many times k candidates to re-score exactly at reduced precision.
+
+    Returns:
+        - tuple[np.ndarray, np.ndarray]: Two arrays of shape (len(queries), k): the best rows for
+        each query, most similar first, and their exact similarities. Rows that could not be
+        filled, because too many were excluded, have a similarity of -inf.
+    """
+    scores = score_catalog(index, queries)
+    # Rows replaced or removed since the index was last compacted can never be recommended
+    scores[:, ~index["live"]] = -np.inf
+    if exclude is not None:
+        for i, rows in enumerate(exclude):
+            scores[i, list(rows)] = -np.inf
+
+    if index["precision"] == "float32":
+        return _top_k(scores, k)
+
+    candidates, approximate_scores = _top_k(scores, min(k * rerank, int(index["live"].sum())))
+    # Only the candidates' rows of the full vectors are read from disk
+    exact_scores = np.einsum(
+        "qcd,qd->qc", np.asarray(index["vectors"][candidates]), queries
+    )
+    exact_scores[approximate_scores == -np.inf] = -np.inf
+    rows, top_scores = _top_k(exact_scores, k)
+    return np.take_along_axis(candidates, rows, axis=1), top_scores
+
+
+def recommend_movie(
+    description: str,
+    index: dict,
+    nlp: spacy.language.Language | None = None,
+    rerank: int = 4,
+) -> str | None:
+    """
+    Recommends a movie based on word vector similarity to the provided description.
+
+    Only the description is parsed by spaCy; it is compared with every catalog title at once by
+    multiplying its normalised vector with the index's matrix of normalised vectors, which gives
+    the same cosine similarities as Doc.similarity().
+
+    Parameters:
+        - description (str): The description of the movie the user has watched.
+        - index (dict): A catalog index from build_catalog_index() or load_catalog_index().
+        - nlp (spacy.language.Language | None): The spaCy pipeline the index was built with.
+        Defaults to the shared RECOMMENDER_MODEL pipeline from the model registry.
+        - rerank (int): For float16 and int8 indexes, how many candidates to re-score exactly.
+
+    Returns:
+        - str | None: The title of the most similar movie, or None if no movie has a similarity
+        above zero.
+    """
+    if nlp is None:
+        nlp = get_model(RECOMMENDER_MODEL)
+    if not index["live"].any():
+        return None
+
+    query = normalise_rows(embed_texts([description], nlp))
+    rows, scores = top_k_rows(index, query, 1, rerank=rerank)
+
+    if scores[0, 0] <= 0:
+        return None
+    return index["titles"][rows[0, 0]]
+
+
+def recommend_movies_batch(
+    descriptions: list[str],
+    index: dict,
+    nlp: spacy.language.Language | None = None,
+    k: int = 5,
+    seen: list | None = None,
+    block_size: int = 1024,
+    rerank: int = 4,
+) -> list[list[tuple[str, float]]]:
+    """
+    Recommends the top k movies for each of many descriptions, e.g. every entry of a watch-history
+    export. Descriptions are embedded with nlp.pipe() and scored against the whole catalog as one
+    query-by-catalog matrix product per block of block_size descriptions, so memory use is capped
+    at block_size * catalog size scores however many descriptions there are.
+
+    Parameters:
+        - descriptions (list[str]): Descriptions of the movies the viewers have watched.
+        - index (dict): A catalog index from build_catalog_index() or load_catalog_index().
+        - nlp (spacy.language.Language | None): The spaCy pipeline the index was built with.
+        Defaults to the shared RECOMMENDER_MODEL pipeline from the model registry.
+        - k (int): Number of recommendations to return per description.
+        - seen (list | None): Optional list aligned with descriptions, where seen[i] is an
+        iterable of titles already watched by viewer i, which will not be recommended to them.
+        - block_size (int): Number of descriptions scored together in one matrix product.
+        - rerank (int): For float16 and int8 indexes, how many times k candidates to re-score
+        exactly.
+
+    Returns:
+        - list[list[tuple[str, float]]]: For each description, up to k (title, similarity) pairs,
+        most similar first.
+
+    Example:
+        >>> recommend_movies_batch(["A hero saves the world"], index, nlp, k=2)
+        [[('Movie C ', 0.83), ('Movie A ', 0.79)]]
+    """
+    if nlp is None:
+        nlp = get_model(RECOMMENDER_MODEL)
+
+    titles = index["titles"]
+    k = min(k, int(index["live"].sum()))
+    if k == 0:
+        return [[] for _ in descriptions]
+
+    recommendations = []
+    for start in range(0, len(descriptions), block_size):
+        queries = normalise_rows(embed_texts(descriptions[start : start + block_size], nlp))
+
+        # Titles a viewer has already seen can never make their top k
+        exclude = None
+        if seen is not None:
+            exclude = [
+                [index["rows"][title] for title in seen_titles if title in index["rows"]]
+                for seen_titles in seen[start : start + block_size]
+            ]
+
+        top, top_scores = top_k_rows(index, queries, k, exclude, rerank)
+
+        for rows, row_scores in zip(top, top_scores):
+            recommendations.append(
+                [
+                    (titles[row], float(score))
+                    for row, score in zip(rows, row_scores)
+                    if score != -np.inf
+                ]
+            )
+
+    return recommendations
+
+
+def compare_precisions(
+    index_dir: str,
+    descriptions: list[str],
+    nlp: spacy.language.Language | None = None,
+    k: int = 10,
+    rerank: int = 4,
+) -> dict:
+    """
+    Reports the recall and latency of recommendations from a saved index at each of PRECISIONS,
+    against exact float32 recommendations for the same descriptions.
+
+    Parameters:
+        - index_dir (str): Directory the index was saved to.
+        - descriptions (list[str]): Query descriptions to evaluate with.
+        - nlp (spacy.language.Language | None): The spaCy pipeline the index was built with.
+        Defaults to the shared RECOMMENDER_MODEL pipeline from the model registry.
+        - k (int): Number of recommendations per query; recall@k is the fraction of the exact
+        float32 top k that each precision also returns.
+        - rerank (int): How many times k candidates to re-score exactly at reduced precision.
+
+    Returns:
+        - dict: Precisions as keys, and as values dicts of recall@k (NaN if the index has no live
+        titles), mean latency of a single query in milliseconds (scoring only, excluding embedding
+        the query), and the bytes held in memory per title for scoring.
+    """
+    if nlp is None:
+        nlp = get_model(RECOMMENDER_MODEL)
+
+    queries = normalise_rows(embed_texts(descriptions, nlp))
+    report = {}
+    for precision in PRECISIONS:
+        index = load_catalog_index(index_dir, precision)
+        k = min(k, int(index["live"].sum()))
+
+        started = time.perf_counter()
+        results = [top_k_rows(index, query[np.newaxis], k, rerank=rerank)[0][0] for query in queries]
+        latency = (time.perf_counter() - started) / max(len(queries), 1)
+
+        if precision == "float32":
+            exact_results = results
+        # With no live titles (or no queries) there is nothing to recall
+        recall = (
+            np.mean([len(set(result) & set(exact)) / k for result, exact in zip(results, exact_results)])
+            if k and len(queries)
+            else np.nan
+        )
+        scored = index["vectors"] if precision == "float32" else index["codes"]
+        report[precision] = {
+            f"Recall@{k}": float(recall),
+            "Latency per query (ms)": latency * 1000,
+            "Bytes per title": scored.dtype.itemsize * scored.shape[1]
+            + (4 if index["scales"] is not None else 0),
+        }
+    return report
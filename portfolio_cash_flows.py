@@ -0,0 +1,194 @@
+# Expected monthly cash inflows of a whole book of mortgages, for risk reporting.
+# A repayment mortgage pays the same amount every month of its term, so each loan adds its payment to a run of
+# consecutive calendar months. Rather than expanding every loan into its schedule, the payment is added where the run
+# starts and subtracted where it ends, in one np.bincount over all the loans, and a cumulative sum over the calendar
+# then gives the total paid in each month. The cost grows with the number of loans plus the number of months, not
+# their product. Large books are split into chunks whose cash-flow vectors are computed in a Pool of processes and
+# added together.
+
+import time
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+import pandas as pd
+
+from amortization import amortization_schedule
+from finance_arrays import mortgage_payment_array
+
+# Columns of the cash-flow table returned by portfolio_cash_flows()
+CASH_FLOW_COLUMNS = ["Month", "Expected Inflow (£)"]
+
+
+def chunk_cash_flow_worker(chunk: tuple) -> np.ndarray:
+    """
+    Adds up the monthly payments of a chunk of loans into a vector over the book's calendar.
+
+    NOTE: This function is not meant to be run directly by the user, but is called by
+    portfolio_cash_flows(), directly or in a worker process.
+
+    Parameters:
+        - chunk (tuple): Arrays of the chunk's principals, annual interest rates (percentages),
+        start months and terms in months, then the book's first month and its number of months.
+
+    Returns:
+        - np.ndarray: Total payments due in each month of the book's calendar, from this chunk.
+    """
+    principal, annual_interest, start_month, term_months, first_month, horizon = chunk
+    payment = mortgage_payment_array(principal, annual_interest, 0, 0, term_months, as_frame=False)[
+        "Monthly Repayment (£)"
+    ]
+
+    # +payment in the first month of each loan and -payment in the month after its last, so that the running total
+    # over the calendar is the sum of the payments of the loans live in each month
+    start = start_month - first_month
+    differences = np.bincount(start, weights=payment, minlength=horizon + 1)
+    differences -= np.bincount(start + term_months, weights=payment, minlength=horizon + 1)
+    return np.cumsum(differences[:horizon])
+
+
+def portfolio_cash_flows(
+    principal,
+    annual_interest,
+    start_month,
+    term_months,
+    n_processes: int = 1,
+    chunk_size: int = 5_000_000,
+) -> pd.DataFrame:
+    """
+    Calculate the total expected monthly inflows from a book of repayment mortgages, by calendar
+    month. Each loan's monthly payment is calculated as by mortgage_payment(), and paid in each of
+    the term_months months from its start month on.
+
+    Parameters:
+        - principal (np.ndarray): The amount borrowed on each loan.
+        - annual_interest (np.ndarray): The annual interest rate of each loan, as a percentage.
+        - start_month (np.ndarray): The calendar month of each loan's first payment, as a whole
+        number of months from any fixed point, e.g. months since January 2000.
+        - term_months (np.ndarray): The number of monthly payments of each loan.
+        - n_processes (int): Number of worker processes to split the loans between. 1 computes
+        everything in this process. 0 or less uses all CPU cores.
+        - chunk_size (int): Number of loans each worker is given at a time.
+
+    Returns:
+        - pd.DataFrame: One row per calendar month from the first payment of any loan to the last,
+        with the month and the total of the payments due in it.
+
+    Example:
+        >>> portfolio_cash_flows([1000, 1000], [0, 0], [0, 1], [2, 2])
+           Month  Expected Inflow (£)
+        0      0                500.0
+        1      1               1000.0
+        2      2                500.0
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    annual_interest = np.asarray(annual_interest, dtype=np.float64)
+    start_month = np.asarray(start_month, dtype=np.int64)
+    term_months = np.asarray(term_months, dtype=np.int64)
+    if not len(principal):
+        return pd.DataFrame(columns=CASH_FLOW_COLUMNS)
+
+    first_month = int(start_month.min())
+    horizon = int((start_month + term_months).max()) - first_month
+
+    chunks = [
+        (
+            principal[i : i + chunk_size],
+            annual_interest[i : i + chunk_size],
+            start_month[i : i + chunk_size],
+            term_months[i : i + chunk_size],
+            first_month,
+            horizon,
+        )
+        for i in range(0, len(principal), chunk_size)
+    ]
+
+    if n_processes <= 0:
+        n_processes = cpu_count()
+    if n_processes == 1 or len(chunks) == 1:
+        cash_flows = sum(chunk_cash_flow_worker(chunk) for chunk in chunks)
+    else:
+        with Pool(min(n_processes, len(chunks))) as pool:
+            cash_flows = sum(pool.imap_unordered(chunk_cash_flow_worker, chunks))
+
+    return pd.DataFrame(
+        {"Month": np.arange(first_month, first_month + horizon), "Expected Inflow (£)": cash_flows},
+        columns=CASH_FLOW_COLUMNS,
+    )
+
+
+def random_book(n_loans: int, seed: int = 0) -> dict:
+    """
+    Generates a random book of mortgages, for checks and benchmarks.
+
+    Parameters:
+        - n_loans (int): Number of loans.
+        - seed (int): Seed of the random generator.
+
+    Returns:
+        - dict: Arrays of the arguments of portfolio_cash_flows(), keyed by argument name.
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        "principal": np.round(rng.uniform(20_000, 1_000_000, n_loans), 2),
+        "annual_interest": np.round(rng.uniform(0, 9, n_loans), 2),
+        "start_month": rng.integers(0, 240, n_loans),
+        "term_months": rng.integers(1, 41, n_loans) * 12,
+    }
+
+
+def check_against_schedules(n_loans: int = 2000, seed: int = 0) -> float:
+    """
+    Compares portfolio_cash_flows() with the sum of every loan's full amortisation schedule.
+
+    Parameters:
+        - n_loans (int): Number of random loans to compare on.
+        - seed (int): Seed of the random loans.
+
+    Returns:
+        - float: The largest absolute difference between the two, in £, over all months.
+    """
+    book = random_book(n_loans, seed)
+    cash_flows = portfolio_cash_flows(**book)
+
+    schedule = amortization_schedule(book["principal"], book["annual_interest"], 0, 0, book["term_months"])
+    calendar_month = book["start_month"][schedule["Loan"]] + schedule["Month"] - 1
+    expected = schedule["Payment (£)"].groupby(calendar_month).sum()
+    expected = expected.reindex(cash_flows["Month"], fill_value=0).to_numpy()
+    return float(np.abs(cash_flows["Expected Inflow (£)"].to_numpy() - expected).max())
+
+
+def benchmark_portfolio(n_loans: int = 10_000_000, n_processes: int = 0, seed: int = 0) -> dict:
+    """
+    Times portfolio_cash_flows() on a random book, in one process and in several.
+
+    Parameters:
+        - n_loans (int): Number of loans in the book.
+        - n_processes (int): Number of worker processes for the parallel run. 0 or less uses all
+        CPU cores.
+        - seed (int): Seed of the random book.
+
+    Returns:
+        - dict: Labelled results: the number of loans and months, and the seconds taken by each run.
+    """
+    book = random_book(n_loans, seed)
+
+    started = time.perf_counter()
+    cash_flows = portfolio_cash_flows(**book)
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    portfolio_cash_flows(**book, n_processes=n_processes, chunk_size=max(n_loans // (4 * cpu_count()), 1))
+    parallel_seconds = time.perf_counter() - started
+
+    return {
+        "Loans": n_loans,
+        "Months": len(cash_flows),
+        "One process (s)": single_seconds,
+        "Pool of processes (s)": parallel_seconds,
+    }
+
+
+if __name__ == "__main__":
+    print(f"Largest difference from full schedules (£): {check_against_schedules()}")
+    for label, value in benchmark_portfolio().items():
+        print(f"{label}: {value}")
@@ -0,0 +1,168 @@
+# Batch export of receipts, for producing a receipt for every calculation in a file at once, e.g.:
+#   python receipt_batch.py requests.csv receipts/ --format webpage
+# Requests are read and calculated a chunk at a time as in finance_batch.py, and each valid request's receipt is
+# rendered by render_receipt() from its inputs and results, on a console of its own, in a Pool of processes. Nothing is
+# opened in a browser, and no process keeps the receipts it has rendered, so memory stays flat however many there are.
+
+import argparse
+import os
+import time
+from multiprocessing import Pool, cpu_count
+
+import pandas as pd
+
+from capstone_finance_calculators import RECEIPT_EXTENSIONS, render_receipt
+from finance_batch import calculate_requests, read_requests
+
+
+def receipt_arguments(request: pd.Series) -> tuple:
+    """
+    Turns a calculated request from calculate_requests() into the calculation choice, inputs and
+    results a receipt is rendered from, labelled as in the interactive calculators.
+
+    Parameters:
+        - request (pd.Series): A valid request, with its results.
+
+    Returns:
+        - tuple: The calc_choice ("si", "ci" or "m"), the inputs dict, and the results dict.
+    """
+    if request["type"] == "m":
+        monthly_interest = request["monthly_interest"]
+        annual_interest = request["annual_interest"]
+        # Fill in whichever rate wasn't given from the other, as gather_user_input_values() does
+        if monthly_interest == 0:
+            monthly_interest = annual_interest / 12
+        else:
+            annual_interest = monthly_interest * 12
+        inputs = {
+            "Dwelling Value (£)": request["amount"],
+            "Annual Interest (%)": annual_interest,
+            "Monthly Interest (%)": monthly_interest,
+            "Repayment Duration (years)": int(request["years"]),
+            "Repayment Duration (additional months)": int(request["months"]),
+        }
+        results = {label: request[label] for label in ("Monthly Repayment (£)", "Total Repayment (£)")}
+        return "m", inputs, results
+
+    inputs = {
+        "Deposit (£)": request["amount"],
+        "Annual Interest (%)": request["annual_interest"],
+        "Investment Duration (years)": int(request["years"]),
+    }
+    results = {
+        label: request[label] for label in ("Accrued Interest (£)", "Total incl. Deposit and Interest (£)")
+    }
+    return request["type"] + "i", inputs, results
+
+
+def render_receipts_worker(receipts: list) -> int:
+    """
+    Renders a batch of receipts.
+
+    NOTE: This function is not meant to be run directly by the user, but is called by
+    export_receipts(), directly or in a worker process.
+
+    Parameters:
+        - receipts (list): Tuples of the arguments of render_receipt(), then a dict of its options.
+
+    Returns:
+        - int: The number of receipts written.
+    """
+    for *arguments, options in receipts:
+        render_receipt(*arguments, **options)
+    return len(receipts)
+
+
+def export_receipts(
+    input_path: str,
+    output_dir: str,
+    export_format: str = "text",
+    n_processes: int = 1,
+    chunksize: int = 10_000,
+    receipts_per_task: int = 100,
+    sensitivity: bool = False,
+    width: int = 100,
+) -> dict:
+    """
+    Writes a receipt for every valid request in a file of requests, across a Pool of processes.
+
+    Parameters:
+        - input_path (str): Path of a CSV or JSONL file of requests, as read by finance_batch.py.
+        - output_dir (str): Directory to write the receipts to, created if needed. Each receipt is
+        named after the request's row in the file, counting from 0, e.g. "receipt-000042.txt".
+        - export_format (str): "image" (SVG), "webpage" (HTML) or "text".
+        - n_processes (int): Number of worker processes. 1 renders everything in this process, and
+        -1 uses all CPU cores, as for --n-process in garden.py.
+        - chunksize (int): Number of requests read and calculated at a time.
+        - receipts_per_task (int): Number of receipts sent to a worker at a time.
+        - sensitivity (bool): Whether to include the sensitivity grid on each receipt.
+        - width (int): Width of the receipts in characters.
+
+    Returns:
+        - dict: Labelled counts of the requests read, the receipts written and the invalid requests
+        skipped, and the seconds taken.
+    """
+    if export_format not in RECEIPT_EXTENSIONS:
+        raise ValueError(f"export_format must be one of {', '.join(RECEIPT_EXTENSIONS)}")
+    if n_processes == 0 or n_processes < -1:
+        raise ValueError("n_processes must be 1 or more, or -1 for all CPU cores")
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    if n_processes == -1:
+        n_processes = cpu_count()
+    pool = Pool(n_processes) if n_processes > 1 else None
+
+    rows = 0
+    written = 0
+    options = {"width": width, "sensitivity": sensitivity}
+    try:
+        for chunk in read_requests(input_path, chunksize):
+            results = calculate_requests(chunk)
+            receipts = [
+                (
+                    export_format,
+                    os.path.join(output_dir, f"receipt-{rows + position:06d}{RECEIPT_EXTENSIONS[export_format]}"),
+                    *receipt_arguments(request),
+                    options,
+                )
+                for position, (_, request) in enumerate(results.iterrows())
+                if request["Error"] == ""
+            ]
+            tasks = [receipts[i : i + receipts_per_task] for i in range(0, len(receipts), receipts_per_task)]
+            if pool is None:
+                written += sum(render_receipts_worker(task) for task in tasks)
+            else:
+                written += sum(pool.imap_unordered(render_receipts_worker, tasks))
+            rows += len(results)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return {
+        "Requests": rows,
+        "Receipts": written,
+        "Invalid": rows - written,
+        "Seconds": time.perf_counter() - started,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a receipt for every request in a file, without opening them.")
+    parser.add_argument("input", help="CSV or JSONL file of requests, as for finance_batch.py")
+    parser.add_argument("output_dir", help="Directory to write the receipts to")
+    parser.add_argument("--format", choices=list(RECEIPT_EXTENSIONS), default="text", help="Receipt format")
+    parser.add_argument("--n-process", type=int, default=-1, help="Worker processes, -1 for all CPU cores")
+    parser.add_argument("--chunksize", type=int, default=10_000, help="Requests read and calculated at a time")
+    parser.add_argument("--sensitivity", action="store_true", help="Include the grid of rates and terms on each receipt")
+    args = parser.parse_args()
+
+    results = export_receipts(
+        args.input, args.output_dir, args.format, args.n_process, args.chunksize, sensitivity=args.sensitivity
+    )
+    for label, value in results.items():
+        print(f"{label}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,111 +3,158 @@
 
 # Practical Task 1 - NLP Semantic Similarity Basics
 
-import os
-import spacy
+import time
 
-nlp_md = spacy.load('en_core_web_md')
+_import_started = time.perf_counter()
 
-word1 = nlp_md("cat")
-word2 = nlp_md("monkey")
-word3 = nlp_md("banana")
+import os
 
-print(f"Similarity between cat and monkey: {word1.similarity(word2)}") # 0.5929930274321619
-print(f"Similarity between banana and monkey: {word3.similarity(word2)}") # 0.4041501317354622
-print(f"Similarity between banana and cat: {word3.similarity(word1)}") # 0.22358827466989753
+from model_registry import get_model, load_times
+from movie_index import load_or_build_catalog_index, read_movie_data, recommend_movie
+from text_vectors import compare_embedding_modes, embed_texts, similarity_matrix, vector_similarity
+from vector_table import export_vector_table
 
-print("\nObservation: The model captures logical connections - cats and monkeys are both mammals and share many features. Monkeys eat bananas so they are often words that appear in the same sentence, and they are therefore similar, but other than a dietary relationship they share very little in common. Cats don't even eat bananas so there is a low similarity between those words.")
+# Importing this module is cheap: models are loaded lazily from the shared model registry the first time a demo (or a caller of movie_index) needs them, and nothing is run until main()
+_import_seconds = time.perf_counter() - _import_started
 
+# Assuming movies.txt is in the same directory as this script
+MOVIES_PATH = os.path.join(os.path.dirname(__file__), "movies.txt")
+MOVIES_INDEX_DIR = os.path.join(os.path.dirname(__file__), "movies_index")
+# en_core_web_md's word vectors, exported once as memory-mapped files that can be attached to en_core_web_sm
+VECTOR_TABLE_DIR = os.path.join(os.path.dirname(__file__), "md_vectors")
 
-# Vectors - two for loops to compare between all the words
 
-tokens = nlp_md('cat apple monkey banana ')
+def word_similarity_demo() -> None:
+    """
+    Compares word and sentence vectors from en_core_web_md, printing the similarity scores.
 
-print("\nVectors - comparing words pairwise \n")
-for token1 in tokens:
-    for token2 in tokens:
-        print(token1.text, token2.text, token1.similarity(token2))
+    Returns:
+        - No return value. This function outputs directly to the terminal.
+    """
+    nlp_md = get_model("en_core_web_md")
 
-# Comparing sentence vectors
+    # Similarity only needs the averaged word vectors, so embed_texts() skips the tagger, parser, NER etc. and reads the vectors directly. The scores agree with Doc.similarity() on full Doc objects to float32 rounding.
+    word1, word2, word3 = embed_texts(["cat", "monkey", "banana"], nlp_md)
 
-sentence_to_compare = "Why is my cat on the car"
+    print(f"Similarity between cat and monkey: {vector_similarity(word1, word2)}") # 0.5929930274321619
+    print(f"Similarity between banana and monkey: {vector_similarity(word3, word2)}") # 0.4041501317354622
+    print(f"Similarity between banana and cat: {vector_similarity(word3, word1)}") # 0.22358827466989753
 
-sentences = ["where did my dog go",
-"Hello, there is my car",
-"I've lost my car in my car",
-"I'd like my boat back",
-"I will name my dog Diana"]
+    print("\nObservation: The model captures logical connections - cats and monkeys are both mammals and share many features. Monkeys eat bananas so they are often words that appear in the same sentence, and they are therefore similar, but other than a dietary relationship they share very little in common. Cats don't even eat bananas so there is a low similarity between those words.")
 
-model_sentence = nlp_md(sentence_to_compare)
 
-print(f"\nThe sentence to compare is: {sentence_to_compare}\n")
+    # Vectors - one matrix of similarities between all the words, then two for loops to print every pair
 
-for sentence in sentences:
-    similarity = nlp_md(sentence).similarity(model_sentence)
-    print(f"{sentence} - {similarity}")
+    tokens = ['cat', 'apple', 'monkey', 'banana']
+    token_similarities = similarity_matrix(tokens, nlp_md)
 
+    print("\nVectors - comparing words pairwise \n")
+    for i, token1 in enumerate(tokens):
+        for j, token2 in enumerate(tokens):
+            print(token1, token2, token_similarities[i, j])
 
-# Using the simpler model 'en_core_web_sm'
+    # Comparing sentence vectors
 
-nlp_sm = spacy.load('en_core_web_sm')
+    sentence_to_compare = "Why is my cat on the car"
 
-word1_sm = nlp_sm("cat")
-word2_sm = nlp_sm("monkey")
-word3_sm = nlp_sm("banana")
+    sentences = ["where did my dog go",
+    "Hello, there is my car",
+    "I've lost my car in my car",
+    "I'd like my boat back",
+    "I will name my dog Diana"]
 
-print(f"Smaller model: Similarity between cat and monkey: {word1_sm.similarity(word2_sm)}") # 0.6770566055016188
-print(f"Smaller model: Similarity between banana and monkey: {word3_sm.similarity(word2_sm)}") # 0.7276309976205778
-print(f"Smaller model: Similarity between banana and cat: {word3_sm.similarity(word1_sm)}") # 0.6806929905901463
+    # The first row of the matrix holds the similarity of the sentence to compare with each of the others
+    sentence_similarities = similarity_matrix([sentence_to_compare] + sentences, nlp_md)[0, 1:]
 
-# The above give the user warning: UserWarning: [W007] The model you're using has no word vectors loaded, so the result of the Doc.similarity method will be based on the tagger, parser and NER, which may not give useful similarity judgements. This may happen if you're using one of the small models, e.g. `en_core_web_sm`, which don't ship with word vectors and only use context-sensitive tensors. You can always add your own word vectors, or use one of the larger models instead if available.
+    print(f"\nThe sentence to compare is: {sentence_to_compare}\n")
 
-# The strangest thing about this smaller model is the very high similarity between bananas and cats... it seems that the small model is much worse at figuring out similar concepts. It may be to do with the lack of word vectors as spacy warns you above. 
+    for sentence, similarity in zip(sentences, sentence_similarities):
+        print(f"{sentence} - {similarity}")
 
 
-# Practical Task 2 - Movie Recommendation System
+def small_model_demo() -> None:
+    """
+    Repeats the word comparison with en_core_web_sm, which has no word vectors, printing the
+    similarity scores.
 
-def recommend_movie(description, movie_data):
+    Returns:
+        - No return value. This function outputs directly to the terminal.
     """
-    Recommends a movie based on word vector similarity to the provided description.
+    # Using the simpler model 'en_core_web_sm'
+
+    nlp_sm = get_model("en_core_web_sm")
+
+    word1_sm = nlp_sm("cat")
+    word2_sm = nlp_sm("monkey")
+    word3_sm = nlp_sm("banana")
+
+    print(f"Smaller model: Similarity between cat and monkey: {word1_sm.similarity(word2_sm)}") # 0.6770566055016188
+    print(f"Smaller model: Similarity between banana and monkey: {word3_sm.similarity(word2_sm)}") # 0.7276309976205778
+    print(f"Smaller model: Similarity between banana and cat: {word3_sm.similarity(word1_sm)}") # 0.6806929905901463
+
+    # The above give the user warning: UserWarning: [W007] The model you're using has no word vectors loaded, so the result of the Doc.similarity method will be based on the tagger, parser and NER, which may not give useful similarity judgements. This may happen if you're using one of the small models, e.g. `en_core_web_sm`, which don't ship with word vectors and only use context-sensitive tensors. You can always add your own word vectors, or use one of the larger models instead if available.
 
-    Args:
-        description (str): The description of the movie the user has watched.
-        movie_data (dict): A dictionary where keys are movie titles and values are their descriptions.
+    # The strangest thing about this smaller model is the very high similarity between bananas and cats... it seems that the small model is much worse at figuring out similar concepts. It may be to do with the lack of word vectors as spacy warns you above.
+
+    # Giving the small model real word vectors: attach en_core_web_md's vectors as a memory-mapped table. Exporting the table needs the medium model once; after that, attaching it is near instant and shared between processes, and the similarities match the medium model's
+    if not os.path.exists(VECTOR_TABLE_DIR):
+        export_vector_table(get_model("en_core_web_md"), VECTOR_TABLE_DIR)
+
+    # The registry keeps en_core_web_sm with the table as an instance of its own, so the shared en_core_web_sm above is left without vectors
+    started = time.perf_counter()
+    nlp_sm = get_model("en_core_web_sm", vectors=VECTOR_TABLE_DIR)
+    print(f"\nLoaded en_core_web_sm with the memory-mapped en_core_web_md vector table attached in {time.perf_counter() - started:.3f}s")
+
+    word1_sm = nlp_sm("cat")
+    word2_sm = nlp_sm("monkey")
+    word3_sm = nlp_sm("banana")
+
+    print(f"Smaller model with vector table: Similarity between cat and monkey: {word1_sm.similarity(word2_sm)}")
+    print(f"Smaller model with vector table: Similarity between banana and monkey: {word3_sm.similarity(word2_sm)}")
+    print(f"Smaller model with vector table: Similarity between banana and cat: {word3_sm.similarity(word1_sm)}")
+
+
+def movie_recommendation_demo() -> None:
+    """
+    Recommends a movie from movies.txt to watch after Planet Hulk, and measures the speedup of the
+    vectors-only embedding on the catalog descriptions.
 
     Returns:
-        The title of the most similar movie (str).
+        - No return value. This function outputs directly to the terminal.
     """
-    descriptions = {}
-    for title, desc in movie_data.items():
-        descriptions[title] = nlp_md(desc)  # Create doc objects for descriptions
+    # Practical Task 2 - Movie Recommendation System
 
-    # Get the doc object for the user-provided description
-    user_movie = nlp_md(description)
+    # Movie descriptions are parsed once into a catalog index of vectors (see movie_index.py), which is saved next to this script and only rebuilt when movies.txt changes
+    movie_index = load_or_build_catalog_index(MOVIES_PATH, MOVIES_INDEX_DIR)
 
-    max_similarity = 0
-    recommended_movie = None
-    for title, movie_doc in descriptions.items():
-        similarity = user_movie.similarity(movie_doc)
-        if similarity > max_similarity:
-            max_similarity = similarity
-            recommended_movie = title
+    # The description is of Planet Hulk, and movie_index is built from movies.txt
+    recommended_movie = recommend_movie(
+        "Will he save their world or destroy it? When the Hulk becomes too dangerous for the Earth, the Illuminati trick Hulk into a shuttle and launch him into space to a planet where the Hulk can live in peace. Unfortunately, Hulk lands on the planet Sakaar where he is sold into slavery and trained as a gladiator.",
+        movie_index,
+    )
 
-    return recommended_movie
+    print(f"\nPractical Task 2")
+    print(f"\nRecommended movie to watch after Planet Hulk: {recommended_movie}")
+
+    # Measure the speedup of the vectors-only embedding over running the full pipeline, on the catalog descriptions
+    movie_descriptions = list(read_movie_data(MOVIES_PATH).values())
+    print("\nEmbedding the movie descriptions, full pipeline vs vectors only:")
+    for label, value in compare_embedding_modes(movie_descriptions, get_model("en_core_web_md")).items():
+        print(f"{label}: {value:.6f}")
+
+
+def main() -> None:
+    word_similarity_demo()
+    small_model_demo()
+    movie_recommendation_demo()
+
+    # Cold-start cost: importing this module loads nothing, so nearly all of it is the first use of each model
+    print("\nCold-start times:")
+    print(f"Importing semantic.py: {_import_seconds:.3f}s")
+    for model, seconds in load_times().items():
+        print(f"Loading {model}: {seconds:.3f}s")
 
-# Assuming movies.txt is in the same directory as this script
-with open(os.path.join(os.path.dirname(__file__), "movies.txt"), "r") as f:
-    movie_data = {}  # Create an empty dictionary
-    
-    for line in f.readlines():
-        title, desc = line.strip().split(":", 1) # Split each line into title and description
-        movie_data[title] = desc # Set the keys and values per movie
-
-# The description is of Planet Hulk, and movie_data is read from movies.txt
-recommended_movie = recommend_movie(
-    "Will he save their world or destroy it? When the Hulk becomes too dangerous for the Earth, the Illuminati trick Hulk into a shuttle and launch him into space to a planet where the Hulk can live in peace. Unfortunately, Hulk lands on the planet Sakaar where he is sold into slavery and trained as a gladiator.",
-    movie_data,
-)
-
-print(f"\nPractical Task 2")
-print(f"\nRecommended movie to watch after Planet Hulk: {recommended_movie}")
 
+# The demos only run when this file is run as a script, so the functions and the models they share can be imported elsewhere without paying for either
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+# Helpers for turning texts into matrices of spaCy document vectors, shared by the movie recommender and the semantic similarity demos
+
+import time
+from typing import Iterator
+
+import numpy as np
+import spacy
+from spacy.attrs import ORTH
+
+from vector_table import EXTERNAL_VECTORS, table_doc_vector
+
+
+def embed_texts(
+    texts: list[str],
+    nlp: spacy.language.Language,
+    batch_size: int = 256,
+    vectors_only: bool = True,
+) -> np.ndarray:
+    """
+    Embeds each text as its spaCy document vector (the average of its word vectors), stacking
+    the results as the rows of one matrix.
+
+    Doc.similarity() only needs these averaged static word vectors, so by default (vectors_only)
+    the texts are only tokenised, with every pipeline component (tok2vec, tagger, parser,
+    attribute_ruler, lemmatizer, NER) skipped, and the rows of nlp.vocab.vectors for the tokens
+    are averaged directly. The tokens are the same as for Doc.vector, so the resulting vectors
+    agree with those from the full pipeline to float32 rounding.
+    Pipelines without word vectors (e.g. en_core_web_sm) fall back to running the full pipeline,
+    as their Doc.vector comes from the component tensors instead, unless an external table of
+    word vectors has been attached to them with vector_table.attach_vector_table(), in which case
+    that table is averaged in the same way.
+
+    Parameters:
+        - texts (list[str]): The texts to embed.
+        - nlp (spacy.language.Language): A loaded spaCy pipeline with word vectors, e.g.
+        en_core_web_md.
+        - batch_size (int): Number of texts spaCy processes together in one batch.
+        - vectors_only (bool): Whether to skip the pipeline components and read the word vectors
+        directly. Defaults to True.
+
+    Returns:
+        - np.ndarray: A float32 matrix of shape (len(texts), vector width), where row i is
+        nlp(texts[i]).vector.
+    """
+    if nlp.has_pipe(EXTERNAL_VECTORS):
+        # A table attached with attach_vector_table() replaces the pipeline's own vectors
+        table = nlp.get_pipe(EXTERNAL_VECTORS).table
+        vectors = np.zeros((len(texts), table["vectors"].shape[1]), dtype=np.float32)
+        for i, doc in enumerate(nlp.tokenizer.pipe(texts, batch_size=batch_size)):
+            vectors[i] = table_doc_vector(table, doc.to_array(ORTH))
+        return vectors
+
+    table = nlp.vocab.vectors
+    if not vectors_only or table.size == 0:
+        # Pipelines without word vectors get their Doc.vector from the component tensors, whose
+        # width isn't known until the first doc is processed
+        doc_vectors = [doc.vector for doc in nlp.pipe(texts, batch_size=batch_size)]
+        if not doc_vectors:
+            return np.zeros((0, nlp.vocab.vectors_length), dtype=np.float32)
+        return np.stack(doc_vectors).astype(np.float32)
+
+    vectors = np.zeros((len(texts), nlp.vocab.vectors_length), dtype=np.float32)
+    for i, doc in enumerate(nlp.tokenizer.pipe(texts, batch_size=batch_size)):
+        if not len(doc):
+            continue
+        # Rows of the vector table for each token, -1 for tokens without a vector, which count
+        # as zero vectors in the average just as they do in Doc.vector
+        rows = table.find(keys=doc.to_array(table.attr))
+        rows = rows[rows >= 0]
+        if len(rows):
+            # Summing along axis 0 adds the rows one after the other, in token order, like
+            # Doc.vector's sum(t.vector for t in doc)
+            vectors[i] = table.data[rows].sum(axis=0) / len(doc)
+    return vectors
+
+
+def vector_norms(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2 norm of every row of a matrix, computed as Doc.vector_norm is: float32 squares accumulated
+    in double precision.
+
+    Parameters:
+        - vectors (np.ndarray): A 2D float32 matrix with one vector per row.
+
+    Returns:
+        - np.ndarray: A float64 array with the norm of each row.
+    """
+    return np.sqrt(np.square(vectors).astype(np.float64).sum(axis=1))
+
+
+def normalise_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scales every row of a matrix to unit L2 length, so that the dot product of two rows is their
+    cosine similarity. Rows of all zeros (texts with no known words) are left as zeros, which gives
+    them a similarity of 0 with everything, as Doc.similarity() does.
+
+    Parameters:
+        - vectors (np.ndarray): A 2D matrix with one vector per row.
+
+    Returns:
+        - np.ndarray: A float32 matrix of the same shape with unit-length rows.
+    """
+    norms = vector_norms(vectors)[:, np.newaxis]
+    # Avoid dividing by zero for empty vectors, which stay all zeros
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32)
+
+
+def vector_similarity(vector1: np.ndarray, vector2: np.ndarray) -> float:
+    """
+    Cosine similarity of two document vectors, computed the same way as Doc.similarity(): a
+    float32 dot product divided by the product of the two double precision norms, or 0 if either
+    vector is all zeros. For vectors from embed_texts() the result agrees with Doc.similarity() to
+    float32 rounding, except that Doc.similarity() returns exactly 1.0 for two texts with identical
+    tokens.
+
+    Parameters:
+        - vector1 (np.ndarray): The first vector, e.g. a row returned by embed_texts().
+        - vector2 (np.ndarray): The second vector.
+
+    Returns:
+        - float: Similarity score, 1 for vectors pointing the same way.
+    """
+    norm1, norm2 = vector_norms(np.stack([vector1, vector2])).tolist()
+    if norm1 == 0 or norm2 == 0:
+        return 0.0
+    return (np.dot(vector1, vector2) / (norm1 * norm2)).item()
+
+
+def similarity_matrix(texts: list[str], nlp: spacy.language.Language) -> np.ndarray:
+    """
+    Cosine similarity of every pair of texts, as one matrix. Each text is embedded once, and the
+    whole matrix is a single product of the normalised vector matrix with its transpose, instead of
+    calling Doc.similarity() for each of the n * n pairs. Scores agree with Doc.similarity() to
+    float32 rounding, and the diagonal is exactly 1, as Doc.similarity() gives for identical texts.
+
+    For thousands of texts, where an n * n matrix would not fit in memory, use
+    iter_similarity_blocks() or top_k_similar() instead.
+
+    Parameters:
+        - texts (list[str]): Words or sentences to compare.
+        - nlp (spacy.language.Language): A loaded spaCy pipeline with word vectors.
+
+    Returns:
+        - np.ndarray: A float32 matrix of shape (len(texts), len(texts)), where entry [i, j] is the
+        similarity of texts[i] and texts[j].
+
+    Example:
+        >>> similarity_matrix(["cat", "monkey"], nlp_md)
+        array([[1.       , 0.5929930],
+               [0.5929930, 1.       ]], dtype=float32)
+    """
+    vectors = normalise_rows(embed_texts(texts, nlp))
+    matrix = vectors @ vectors.T
+    np.fill_diagonal(matrix, 1)
+    return matrix
+
+
+def iter_similarity_blocks(
+    texts: list[str], nlp: spacy.language.Language, block_size: int = 1024
+) -> Iterator[tuple[int, np.ndarray]]:
+    """
+    Yields the similarity matrix of similarity_matrix() a block of rows at a time, so only
+    block_size * len(texts) scores are held in memory at once however many texts there are. The
+    texts are still embedded only once.
+
+    Parameters:
+        - texts (list[str]): Words or sentences to compare.
+        - nlp (spacy.language.Language): A loaded spaCy pipeline with word vectors.
+        - block_size (int): Number of rows of the matrix in each block.
+
+    Yields:
+        - tuple[int, np.ndarray]: The index of the first row in the block, and a float32 block of
+        shape (rows in block, len(texts)).
+    """
+    vectors = normalise_rows(embed_texts(texts, nlp))
+    for start in range(0, len(vectors), block_size):
+        block = vectors[start : start + block_size] @ vectors.T
+        # Each text's similarity with itself falls on a diagonal offset by the block's first row
+        rows = np.arange(len(block))
+        block[rows, start + rows] = 1
+        yield start, block
+
+
+def top_k_similar(
+    texts: list[str],
+    nlp: spacy.language.Language,
+    k: int = 5,
+    block_size: int = 1024,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Finds, for each text, the k other texts most similar to it, without ever holding the full
+    similarity matrix. Each block from iter_similarity_blocks() is reduced to its top k columns per
+    row with argpartition, so only those k are sorted.
+
+    Parameters:
+        - texts (list[str]): Words or sentences to compare, e.g. thousands of product terms.
+        - nlp (spacy.language.Language): A loaded spaCy pipeline with word vectors.
+        - k (int): Number of most similar texts to find for each text. A text is never counted as
+        similar to itself.
+        - block_size (int): Number of rows of the similarity matrix computed at a time.
+
+    Returns:
+        - tuple[np.ndarray, np.ndarray]: Two arrays of shape (len(texts), k): the indices into
+        texts of the most similar texts for each text, most similar first, and their similarities.
+    """
+    k = min(k, len(texts) - 1)
+    indices = np.zeros((len(texts), max(k, 0)), dtype=np.int64)
+    scores = np.zeros((len(texts), max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return indices, scores
+
+    for start, block in iter_similarity_blocks(texts, nlp, block_size):
+        rows = np.arange(len(block))
+        block[rows, start + rows] = -np.inf
+
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        indices[start : start + len(block)] = np.take_along_axis(top, order, axis=1)
+        scores[start : start + len(block)] = np.take_along_axis(top_scores, order, axis=1)
+
+    return indices, scores
+
+
+def compare_embedding_modes(
+    texts: list[str], nlp: spacy.language.Language, repeat: int = 3
+) -> dict:
+    """
+    Times embed_texts() with and without the vectors-only fast path on the same texts, and checks
+    that both give the same vectors.
+
+    Parameters:
+        - texts (list[str]): The texts to embed.
+        - nlp (spacy.language.Language): A loaded spaCy pipeline with word vectors.
+        - repeat (int): Number of timed runs of each mode; the fastest run is reported.
+
+    Returns:
+        - dict: The best time of each mode in seconds, the speedup of the vectors-only mode, and
+        the largest absolute difference between the vectors from the two modes.
+    """
+    timings = {}
+    results = {}
+    for vectors_only in (False, True):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results[vectors_only] = embed_texts(texts, nlp, vectors_only=vectors_only)
+            best = min(best, time.perf_counter() - started)
+        timings[vectors_only] = best
+
+    return {
+        "Full pipeline (s)": timings[False],
+        "Vectors only (s)": timings[True],
+        "Speedup (x)": timings[False] / timings[True],
+        "Max abs difference": float(np.abs(results[False] - results[True]).max(initial=0)),
+    }
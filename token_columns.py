@@ -0,0 +1,203 @@
+# Columnar export of spaCy token attributes, for analysing a corpus with vectorised filters instead of Python loops.
+# Each Doc's attributes are extracted with one doc.to_array() call, and written to a Parquet file with one row per
+# token. Strings (the text and lemma of each token) are stored as their 64-bit spaCy hash ids, with a separate string
+# table to turn the ids back into text, so every column is a plain integer or boolean array.
+
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import spacy
+from spacy.attrs import ENT_IOB, IS_PUNCT, IS_SPACE, IS_STOP, LEMMA, ORTH, POS
+
+# Files making up an export
+TOKENS_FILENAME = "tokens.parquet"
+STRINGS_FILENAME = "strings.parquet"
+
+# Token attributes extracted from each Doc, in the order of doc.to_array()'s columns, with the column name and type
+# each is stored as. pos holds spaCy's id of the part of speech (e.g. nlp.vocab.strings[pos] is "NOUN"), and ent_iob
+# is 0 for no entity tag, 1 inside an entity, 2 outside any entity and 3 at the beginning of an entity
+ATTRIBUTES = [ORTH, LEMMA, IS_STOP, IS_PUNCT, IS_SPACE, POS, ENT_IOB]
+SCHEMA = pa.schema([
+    ("doc_id", pa.int64()),
+    ("token", pa.int32()),
+    ("orth", pa.uint64()),
+    ("lemma", pa.uint64()),
+    ("is_stop", pa.bool_()),
+    ("is_punct", pa.bool_()),
+    ("is_space", pa.bool_()),
+    ("pos", pa.uint16()),
+    ("ent_iob", pa.uint8()),
+])
+STRINGS_SCHEMA = pa.schema([("hash", pa.uint64()), ("text", pa.string())])
+
+
+def doc_columns(docs: list[spacy.tokens.Doc], first_doc_id: int = 0) -> dict:
+    """
+    Extracts the token attributes of a batch of Docs as columns, with one doc.to_array() call per
+    Doc rather than one Token object per token.
+
+    Parameters:
+        - docs (list[spacy.tokens.Doc]): The processed Docs.
+        - first_doc_id (int): Id of the first Doc; the rest are numbered on from it.
+
+    Returns:
+        - dict: Column names of SCHEMA as keys, and equally long arrays as values, with one entry
+        per token of every Doc, in order.
+    """
+    arrays = [doc.to_array(ATTRIBUTES) for doc in docs]
+    lengths = np.array([len(doc) for doc in docs], dtype=np.int64)
+    if arrays:
+        values = np.concatenate(arrays).reshape(-1, len(ATTRIBUTES))
+    else:
+        values = np.zeros((0, len(ATTRIBUTES)), dtype=np.uint64)
+
+    # Position of each token in its Doc: a running count that restarts at the start of each Doc
+    starts = np.cumsum(lengths) - lengths
+    token = np.arange(len(values)) - np.repeat(starts, lengths)
+
+    return {
+        "doc_id": np.repeat(np.arange(first_doc_id, first_doc_id + len(docs)), lengths),
+        "token": token.astype(np.int32),
+        "orth": values[:, 0],
+        "lemma": values[:, 1],
+        "is_stop": values[:, 2].astype(bool),
+        "is_punct": values[:, 3].astype(bool),
+        "is_space": values[:, 4].astype(bool),
+        "pos": values[:, 5].astype(np.uint16),
+        "ent_iob": values[:, 6].astype(np.uint8),
+    }
+
+
+class TokenColumnsWriter:
+    """
+    Writes the token attributes of a stream of Docs to TOKENS_FILENAME in a directory, a batch of
+    Docs per Parquet row group, and on closing writes the string table of every text and lemma
+    seen to STRINGS_FILENAME.
+
+    Example:
+        >>> with TokenColumnsWriter("columns") as writer:
+        ...     for doc in nlp.pipe(sentences):
+        ...         writer.add(doc)
+    """
+
+    def __init__(self, columns_dir: str, batch_docs: int = 1000):
+        os.makedirs(columns_dir, exist_ok=True)
+        self.columns_dir = columns_dir
+        self.batch_docs = batch_docs
+        self.writer = pq.ParquetWriter(os.path.join(columns_dir, TOKENS_FILENAME), SCHEMA)
+        self.pending = []
+        self.docs = 0
+        self.tokens = 0
+        # Hash ids of the strings seen, with the vocab able to turn them back into text
+        self.hashes = set()
+        self.vocab = None
+
+    def add(self, doc: spacy.tokens.Doc) -> None:
+        self.pending.append(doc)
+        self.vocab = doc.vocab
+        if len(self.pending) >= self.batch_docs:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        columns = doc_columns(self.pending, self.docs)
+        self.writer.write_table(pa.table(columns, schema=SCHEMA))
+        self.hashes.update(np.unique(np.concatenate([columns["orth"], columns["lemma"]])).tolist())
+        self.docs += len(self.pending)
+        self.tokens += len(columns["token"])
+        self.pending = []
+
+    def close(self) -> dict:
+        """
+        Writes any Docs still pending and the string table, and closes the files.
+
+        Returns:
+            - dict: Labelled counts of the Docs, tokens and distinct strings written.
+        """
+        self.flush()
+        self.writer.close()
+
+        hashes = np.array(sorted(self.hashes), dtype=np.uint64)
+        texts = [self.vocab.strings[h] if self.vocab is not None else "" for h in hashes.tolist()]
+        pq.write_table(
+            pa.table({"hash": hashes, "text": texts}, schema=STRINGS_SCHEMA),
+            os.path.join(self.columns_dir, STRINGS_FILENAME),
+        )
+        return {"Docs": self.docs, "Tokens": self.tokens, "Strings": len(hashes)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_token_columns(docs, columns_dir: str, batch_docs: int = 1000) -> dict:
+    """
+    Exports the token attributes of a stream of Docs, e.g. from nlp.pipe(), to a directory.
+
+    Parameters:
+        - docs (Iterable[spacy.tokens.Doc]): The processed Docs.
+        - columns_dir (str): Directory to write TOKENS_FILENAME and STRINGS_FILENAME to. Created
+        if it does not exist.
+        - batch_docs (int): Number of Docs extracted and written together, as one row group.
+
+    Returns:
+        - dict: Labelled counts of the Docs, tokens and distinct strings written.
+    """
+    writer = TokenColumnsWriter(columns_dir, batch_docs)
+    for doc in docs:
+        writer.add(doc)
+    return writer.close()
+
+
+def read_token_columns(columns_dir: str, columns: list[str] | None = None) -> dict:
+    """
+    Reads an export back as NumPy arrays, ready for vectorised filtering.
+
+    Parameters:
+        - columns_dir (str): Directory the export was written to.
+        - columns (list[str] | None): Names of the columns to read, or None for all of them.
+
+    Returns:
+        - dict: Column names as keys, and arrays with one entry per token as values.
+    """
+    table = pq.read_table(os.path.join(columns_dir, TOKENS_FILENAME), columns=columns)
+    return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+def read_string_table(columns_dir: str) -> dict:
+    """
+    Reads the string table of an export.
+
+    Parameters:
+        - columns_dir (str): Directory the export was written to.
+
+    Returns:
+        - dict: Hash ids as keys, and the strings they stand for as values.
+    """
+    table = pq.read_table(os.path.join(columns_dir, STRINGS_FILENAME))
+    return dict(zip(table.column("hash").to_numpy().tolist(), table.column("text").to_pylist()))
+
+
+def lemma_counts(columns_dir: str) -> dict:
+    """
+    Counts the lemmas of the meaningful words of an export, i.e. ignoring stop words, spaces and
+    punctuation as garden.py does, with one vectorised mask and np.unique instead of a loop over
+    tokens.
+
+    Parameters:
+        - columns_dir (str): Directory the export was written to.
+
+    Returns:
+        - dict: Lemmas as keys, and their number of occurrences as values, most common first.
+    """
+    columns = read_token_columns(columns_dir, ["lemma", "is_stop", "is_punct", "is_space"])
+    meaningful = ~(columns["is_stop"] | columns["is_punct"] | columns["is_space"])
+    lemmas, counts = np.unique(columns["lemma"][meaningful], return_counts=True)
+    strings = read_string_table(columns_dir)
+    order = np.argsort(-counts, kind="stable")
+    return {strings[lemma]: count for lemma, count in zip(lemmas[order].tolist(), counts[order].tolist())}
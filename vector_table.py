@@ -0,0 +1,168 @@
+# Word-vector tables stored outside spaCy, as memory-mapped .npy files, which can be attached to a pipeline that has no
+# vectors of its own (e.g. en_core_web_sm) to give it real similarity scores.
+# Because the files are memory-mapped, loading a table is near instant and every process using the same table shares
+# one copy of it through the operating system's page cache, instead of each holding its own like a loaded
+# en_core_web_md does.
+
+import os
+
+import numpy as np
+import spacy
+from spacy.attrs import ORTH
+from spacy.language import Language
+
+# Files making up a table saved to disk
+VECTORS_FILENAME = "vectors.npy"
+KEYS_FILENAME = "keys.npy"
+ROWS_FILENAME = "rows.npy"
+
+# Name of the pipeline component added by attach_vector_table()
+EXTERNAL_VECTORS = "external_vectors"
+
+
+def export_vector_table(nlp: spacy.language.Language, table_dir: str) -> None:
+    """
+    Saves the word vectors of a pipeline (e.g. en_core_web_md) as a table that can be attached to
+    other pipelines. The table is the float32 vector matrix, plus a string-to-row index made of two
+    aligned arrays: the sorted 64-bit hashes of the strings, which spaCy computes the same way in
+    every pipeline, and the row of each.
+
+    Parameters:
+        - nlp (spacy.language.Language): A loaded spaCy pipeline with word vectors.
+        - table_dir (str): Directory to save to. Created if it does not exist.
+
+    Returns:
+        - No return value. The table files are written to table_dir.
+    """
+    vectors = nlp.vocab.vectors
+    keys = np.fromiter(vectors.key2row.keys(), dtype=np.uint64, count=len(vectors.key2row))
+    rows = np.fromiter(vectors.key2row.values(), dtype=np.int64, count=len(vectors.key2row))
+    order = np.argsort(keys)
+
+    os.makedirs(table_dir, exist_ok=True)
+    np.save(os.path.join(table_dir, VECTORS_FILENAME), np.asarray(vectors.data, dtype=np.float32))
+    np.save(os.path.join(table_dir, KEYS_FILENAME), keys[order])
+    np.save(os.path.join(table_dir, ROWS_FILENAME), rows[order])
+
+
+def load_vector_table(table_dir: str) -> dict:
+    """
+    Memory-maps a table saved by export_vector_table(). Nothing is read until it is looked up.
+
+    Parameters:
+        - table_dir (str): Directory the table was saved to.
+
+    Returns:
+        - dict: The table, with keys "vectors" (matrix of float32 vectors), "keys" (sorted string
+        hashes) and "rows" (the row of "vectors" for each of "keys").
+    """
+    return {
+        "vectors": np.load(os.path.join(table_dir, VECTORS_FILENAME), mmap_mode="r"),
+        "keys": np.load(os.path.join(table_dir, KEYS_FILENAME), mmap_mode="r"),
+        "rows": np.load(os.path.join(table_dir, ROWS_FILENAME), mmap_mode="r"),
+    }
+
+
+def lookup_rows(table: dict, keys: np.ndarray) -> np.ndarray:
+    """
+    Finds the rows of a table's vectors for many string hashes at once, by binary search of the
+    table's sorted keys.
+
+    Parameters:
+        - table (dict): A table from load_vector_table().
+        - keys (np.ndarray): String hashes, e.g. doc.to_array(ORTH).
+
+    Returns:
+        - np.ndarray: The row of each key, or -1 for keys without a vector.
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    if not len(table["keys"]):
+        return np.full(len(keys), -1, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(table["keys"], keys), len(table["keys"]) - 1)
+    found = table["keys"][positions] == keys
+    return np.where(found, table["rows"][positions], -1)
+
+
+def table_doc_vector(table: dict, keys: np.ndarray) -> np.ndarray:
+    """
+    Averages the table's vectors for a sequence of tokens, counting tokens without a vector as
+    zeros, as Doc.vector does.
+
+    Parameters:
+        - table (dict): A table from load_vector_table().
+        - keys (np.ndarray): String hashes of the tokens, e.g. doc.to_array(ORTH).
+
+    Returns:
+        - np.ndarray: The float32 average vector, all zeros for no tokens.
+    """
+    vector = np.zeros(table["vectors"].shape[1], dtype=np.float32)
+    if len(keys):
+        rows = lookup_rows(table, keys)
+        rows = rows[rows >= 0]
+        if len(rows):
+            vector = table["vectors"][rows].sum(axis=0) / len(keys)
+    return vector
+
+
+def _cosine(vector1: np.ndarray, vector2: np.ndarray) -> float:
+    # Doc.similarity()'s formula: float32 dot product over double precision norms, 0 for empty vectors
+    norm1 = np.sqrt(np.square(vector1).astype(np.float64).sum()).item()
+    norm2 = np.sqrt(np.square(vector2).astype(np.float64).sum()).item()
+    if norm1 == 0 or norm2 == 0:
+        return 0.0
+    return (np.dot(vector1, vector2) / (norm1 * norm2)).item()
+
+
+class ExternalVectors:
+    """
+    Pipeline component which gives every Doc, Span and Token it processes vectors and similarity
+    from an external table, through spaCy's user hooks, in place of the pipeline's own.
+    """
+
+    def __init__(self, table_dir: str):
+        self.table = load_vector_table(table_dir)
+
+    def __call__(self, doc):
+        table = self.table
+        doc.user_hooks["vector"] = lambda doc: table_doc_vector(table, doc.to_array(ORTH))
+        doc.user_hooks["similarity"] = lambda doc, other: _cosine(doc.vector, other.vector)
+        doc.user_span_hooks["vector"] = lambda span: table_doc_vector(
+            table, span.doc.to_array(ORTH)[span.start : span.end]
+        )
+        doc.user_span_hooks["similarity"] = lambda span, other: _cosine(span.vector, other.vector)
+        doc.user_token_hooks["vector"] = lambda token: table_doc_vector(
+            table, np.array([token.orth], dtype=np.uint64)
+        )
+        doc.user_token_hooks["similarity"] = lambda token, other: _cosine(token.vector, other.vector)
+        return doc
+
+
+# table_dir has no default, so adding the component without a table is rejected by spaCy's config validation
+@Language.factory(EXTERNAL_VECTORS)
+def make_external_vectors(nlp: Language, name: str, table_dir: str) -> ExternalVectors:
+    return ExternalVectors(table_dir)
+
+
+def attach_vector_table(nlp: spacy.language.Language, table_dir: str) -> None:
+    """
+    Attaches a table saved by export_vector_table() to a pipeline, by adding an external_vectors
+    component to the end of it. Docs it processes from then on use the table for .vector and
+    .similarity(), and embed_texts() uses it for its vectors-only path.
+
+    Parameters:
+        - nlp (spacy.language.Language): A loaded spaCy pipeline, e.g. en_core_web_sm.
+        - table_dir (str): Directory the table was saved to.
+
+    Returns:
+        - No return value. The pipeline is modified in place.
+
+    Example:
+        >>> export_vector_table(spacy.load("en_core_web_md"), "md_vectors")
+        >>> nlp_sm = spacy.load("en_core_web_sm")
+        >>> attach_vector_table(nlp_sm, "md_vectors")
+        >>> nlp_sm("cat").similarity(nlp_sm("monkey"))
+        0.5929930274321619
+    """
+    if nlp.has_pipe(EXTERNAL_VECTORS):
+        nlp.remove_pipe(EXTERNAL_VECTORS)
+    nlp.add_pipe(EXTERNAL_VECTORS, config={"table_dir": table_dir}, last=True)